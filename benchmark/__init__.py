@@ -0,0 +1,9 @@
+# Benchmarks for the tweet hashtag graph (run from the top directory, e.g.,
+# python -m benchmark.run). Modules in src/ are imported directly, as in
+# src/average_degree.py.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
@@ -0,0 +1,60 @@
+# Benchmark to compare the speed of the pure Python backend of
+# TimeWindowGraph with the optional C extension (src/_accel.c, built with
+# "python setup.py build_ext --inplace") on the same stream. Both backends are
+# checked for equivalence in tests/test_accel.py.
+#
+# Usage: python benchmark/bench_accel.py [num_tweets]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+import graph
+from graph import TimeWindowGraph
+from bench_expiry import make_stream
+
+def run(stream, accelerated, window_size=60):
+    """
+    Feed the stream into the graph with the given backend.
+    Input:
+        stream (list): (timestamp, hashtags) for all tweets
+        accelerated (bool): True for the C extension, False for pure Python
+        window_size (int): size of the time window
+    Output:
+        elapsed (float): elapsed time in seconds
+        degrees (list of float): average degree after each tweet
+        gr (TimeWindowGraph): graph after the stream
+    """
+    saved = graph.ACCELERATED
+    graph.ACCELERATED = accelerated
+    try:
+        gr = TimeWindowGraph(window_size=window_size, expiry='heap')
+    finally:
+        graph.ACCELERATED = saved
+    degrees = []
+    start = time.time()
+    for timestamp, hashtags in stream:
+        gr.add_tweet(timestamp, hashtags)
+        degrees.append(gr.average_degree())
+    return time.time() - start, degrees, gr
+
+def main():
+    num_tweets = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    if not graph.ACCELERATED:
+        print "The C extension is not built " \
+            "(python setup.py build_ext --inplace)."
+        return
+    stream = make_stream(num_tweets, 500)
+    results = {}
+    for name, accelerated in [('python', False), ('c', True)]:
+        elapsed, degrees, _ = run(stream, accelerated)
+        results[name] = degrees
+        print "%-6s %8.3f s %10.0f tweets/s" % (name, elapsed,
+                                                num_tweets / elapsed)
+    if results['c'] != results['python']:
+        print "Average degrees are different!"
+
+if __name__ == "__main__":
+    main()
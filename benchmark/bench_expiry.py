@@ -0,0 +1,71 @@
+# Benchmark to compare data structures for expiring old links in
+# TimeWindowGraph ('heap' for indexedMinPQ, 'wheel' for TimeWheel and 'log'
+# for ExpiryLog).
+# A random stream of hashtag pairs (many tweets per second) is fed into the
+# graph directly, so that only link maintenance is measured.
+#
+# Usage: python benchmark/bench_expiry.py [num_tweets] [tweets_per_second]
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from graph import TimeWindowGraph, EXPIRY_STRUCTURES
+
+def make_stream(num_tweets, tweets_per_second, num_hashtags=5000, seed=0):
+    """
+    Make a random stream of tweets.
+    Input:
+        num_tweets (int): number of tweets
+        tweets_per_second (int): number of tweets for each second
+        num_hashtags (int): number of distinct hashtags
+        seed (int): seed for the random number generator
+    Output:
+        (list): (timestamp, hashtags) for all tweets
+    """
+    rand = random.Random(seed)
+    stream = []
+    for i in xrange(num_tweets):
+        timestamp = 1446699939 + i / tweets_per_second
+        hashtags = [str(rand.randint(0, num_hashtags))
+                    for _ in range(rand.randint(2, 6))]
+        stream.append((timestamp, hashtags))
+    return stream
+
+def run(stream, expiry):
+    """
+    Feed the stream into the graph, and return elapsed time and degrees.
+    Input:
+        stream (list): (timestamp, hashtags) for all tweets
+        expiry (str): data structure to expire old links ('heap', 'wheel' or
+                      'log')
+    Output:
+        elapsed (float): elapsed time in seconds
+        degrees (list of float): average degree after each tweet
+    """
+    gr = TimeWindowGraph(window_size=60, expiry=expiry)
+    degrees = []
+    start = time.time()
+    for timestamp, hashtags in stream:
+        gr.add_tweet(timestamp, hashtags)
+        degrees.append(gr.average_degree())
+    return time.time() - start, degrees
+
+def main():
+    num_tweets = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tweets_per_second = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    stream = make_stream(num_tweets, tweets_per_second)
+    results = {}
+    for expiry in EXPIRY_STRUCTURES:
+        elapsed, degrees = run(stream, expiry)
+        results[expiry] = degrees
+        print "%-6s %8.3f s %10.0f tweets/s" % (expiry, elapsed,
+                                                num_tweets / elapsed)
+    if any(results[expiry] != results['heap'] for expiry in results):
+        print "Average degrees are different!"
+
+if __name__ == "__main__":
+    main()
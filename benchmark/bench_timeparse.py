@@ -0,0 +1,45 @@
+# Benchmark to compare parse_created_at (timeparse.py) with the previous
+# approach (time.strptime and time.mktime) for 'created_at' fields of tweets.
+# Timestamps advance by one second every few tweets as in real streams.
+#
+# Usage: python benchmark/bench_timeparse.py [num_tweets] [tweets_per_second]
+
+import os
+import sys
+import time
+import calendar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from timeparse import parse_created_at
+
+def strptime_mktime(str_time):
+    """
+    Previous approach (local time, so it depends on the timezone).
+    """
+    return int(time.mktime(time.strptime(str_time,
+               "%a %b %d %H:%M:%S +0000 %Y")) + 0.5)
+
+def main():
+    num_tweets = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    tweets_per_second = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    begin = calendar.timegm((2015, 12, 31, 23, 0, 0))   # over a year boundary
+    str_times = [time.strftime("%a %b %d %H:%M:%S +0000 %Y",
+                               time.gmtime(begin + i / tweets_per_second))
+                 for i in xrange(num_tweets)]
+    for name, parse in [('strptime', strptime_mktime),
+                        ('timeparse', parse_created_at)]:
+        start = time.time()
+        for str_time in str_times:
+            parse(str_time)
+        elapsed = time.time() - start
+        print "%-10s %8.3f s %10.0f tweets/s" % (name, elapsed,
+                                                 num_tweets / elapsed)
+    # Differences between timestamps have to be the same.
+    first = strptime_mktime(str_times[0]) - parse_created_at(str_times[0])
+    for str_time in str_times[::997]:
+        if strptime_mktime(str_time) - parse_created_at(str_time) != first:
+            print "Different result:", str_time
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# Deterministic generator of synthetic tweets (json lines in the format of the
+# Twitter streaming API), so that benchmarks can be run on streams of any size
+# and shape. The same parameters (and seed) always give the same stream.
+# (1) Tweets per second: timestamps advance by one second every
+#     'tweets_per_second' tweets.
+# (2) Number of hashtags in a tweet: drawn from the given distribution
+#     (weights for 0, 1, 2, ... hashtags).
+# (3) Popularity of hashtags: Zipf's law (the k-th popular hashtag is drawn
+#     with the probability proportional to 1 / k^s).
+# (4) Out-of-order tweets: with the given ratio, a tweet is delayed (its
+#     timestamp is earlier than the current second by 1 to 'max_lateness'
+#     seconds).
+# (5) Control messages: with the given rate, a rate-limit message
+#     ({"limit": ...}) is put between tweets.
+# (6) Gaps in the feed: every 'gap_every' seconds of the stream, timestamps
+#     jump forward by 'gap_length' seconds (no tweet during the gap).
+#
+# Usage: python -m benchmark.generator [options] output_file
+
+import json
+import time
+import random
+import bisect
+import calendar
+import argparse
+from collections import OrderedDict
+
+# Default distribution of the number of hashtags in a tweet (0 to 6).
+HASHTAG_COUNTS = [0.55, 0.2, 0.12, 0.06, 0.04, 0.02, 0.01]
+
+_SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'ta', 'vi', 'so', 'de', 'ba',
+              'po', 'xe', 'qu', 'an', 'el', 'is', 'un', 'or']
+_MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep',
+           'Oct', 'Nov', 'Dec']
+_DAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+class TweetGenerator:
+    """
+    Class for the generator of synthetic tweets.
+    (1) Hashtags are made of syllables (with a few capitalized or non-ASCII
+        ones), and popular hashtags come first in self.hashtags.
+    (2) Records ((timestamp, hashtags), as parsed by average_degree.py) and
+        json lines are generated from the same random stream.
+    """
+    def __init__(self, tweets_per_second=100, num_hashtags=10000, zipf_s=1.1,
+                 hashtag_counts=HASHTAG_COUNTS, out_of_order=0.0,
+                 max_lateness=10, control_rate=0.0, gap_every=0, gap_length=0,
+                 start_time=calendar.timegm((2015, 11, 5, 5, 5, 39)), seed=0):
+        """
+        Constructor
+        Input:
+            tweets_per_second (float): number of tweets for each second
+            num_hashtags (int): number of distinct hashtags
+            zipf_s (float): exponent of Zipf's law for popularity of hashtags
+            hashtag_counts (list of float): weights for the number of hashtags
+                                            in a tweet (index: number)
+            out_of_order (float): ratio of tweets delayed (0 to 1)
+            max_lateness (int): maximum delay of a tweet (seconds)
+            control_rate (float): ratio of control messages to tweets
+            gap_every (int): seconds of the stream between gaps (0: no gap)
+            gap_length (int): length of a gap (seconds)
+            start_time (int): timestamp of the first tweet (epoch seconds)
+            seed (int): seed for the random number generator
+        """
+        self.tweets_per_second = tweets_per_second
+        self.out_of_order = out_of_order
+        self.max_lateness = max_lateness
+        self.control_rate = control_rate
+        self.gap_every = gap_every
+        self.gap_length = gap_length
+        self.start_time = start_time
+        self.seed = seed
+        rand = random.Random(seed)
+        self.hashtags = _make_hashtags(num_hashtags, rand)
+        self._popularity = _cumulative([1.0 / (k ** zipf_s)
+                                        for k in range(1, num_hashtags + 1)])
+        self._counts = _cumulative(hashtag_counts)
+
+    def records(self, num_tweets):
+        """
+        Generate records of tweets (no json, no control message).
+        Input:
+            num_tweets (int): number of tweets
+        Output:
+            (generator): (timestamp, hashtags) for every tweet
+        """
+        for _, timestamp, hashtags in self._tweets(num_tweets):
+            yield timestamp, hashtags
+
+    def lines(self, num_tweets):
+        """
+        Generate json lines of tweets (and control messages).
+        Input:
+            num_tweets (int): number of tweets (control messages are not
+                              counted)
+        Output:
+            (generator): json lines (with the newline)
+        """
+        rand = random.Random(self.seed + 1)
+        for tweet_id, timestamp, hashtags in self._tweets(num_tweets):
+            while rand.random() < self.control_rate:
+                yield _control_line(rand, timestamp)
+            yield _tweet_line(rand, tweet_id, timestamp, hashtags)
+
+    def write(self, filename, num_tweets):
+        """
+        Write json lines of tweets to a file.
+        Input:
+            filename (str): name of the file
+            num_tweets (int): number of tweets
+        """
+        with open(filename, 'w') as f_out:
+            for line in self.lines(num_tweets):
+                f_out.write(line)
+
+    # ==== private methods from here on =====================
+    def _tweets(self, num_tweets):
+        """
+        Generate (id, timestamp, hashtags) of tweets.
+        Input:
+            num_tweets (int): number of tweets
+        """
+        rand = random.Random(self.seed)
+        popularity = self._popularity
+        hashtags = self.hashtags
+        for i in xrange(num_tweets):
+            second = int(i / self.tweets_per_second)
+            timestamp = self.start_time + second
+            if self.gap_every > 0:
+                timestamp += second // self.gap_every * self.gap_length
+            if self.out_of_order > 0 and rand.random() < self.out_of_order:
+                timestamp -= rand.randint(1, self.max_lateness)
+            count = bisect.bisect(self._counts, rand.random())
+            tweet_hashtags = [hashtags[bisect.bisect(popularity,
+                                                     rand.random())]
+                              for _ in xrange(count)]
+            yield 662133652566835202 + i, timestamp, tweet_hashtags
+
+
+def _cumulative(weights):
+    """
+    Make a list of cumulative probabilities (the last one is slightly less than
+    1, so bisect never returns len(weights)).
+    Input:
+        weights (list of float): weights
+    Output:
+        (list of float): cumulative probabilities
+    """
+    total = float(sum(weights))
+    cumulative = []
+    acc = 0.0
+    for weight in weights:
+        acc += weight
+        cumulative.append(acc / total)
+    cumulative[-1] = 1.0 - 1e-12
+    return cumulative
+
+def _make_hashtags(num_hashtags, rand):
+    """
+    Make distinct hashtags.
+    Input:
+        num_hashtags (int): number of hashtags
+        rand (Random): random number generator
+    Output:
+        (list of unicode): hashtags
+    """
+    hashtags = []
+    seen = set()
+    while len(hashtags) < num_hashtags:
+        hashtag = u''.join(rand.choice(_SYLLABLES)
+                           for _ in range(rand.randint(2, 5)))
+        if rand.random() < 0.2:
+            hashtag = hashtag.capitalize()
+        if rand.random() < 0.02:
+            hashtag += u'\xe9'
+        if hashtag in seen:
+            hashtag += unicode(len(hashtags))
+        seen.add(hashtag)
+        hashtags.append(hashtag)
+    return hashtags
+
+def _created_at(timestamp):
+    """
+    Format a timestamp as 'created_at'
+    (e.g., "Thu Nov 05 05:05:39 +0000 2015").
+    """
+    t = time.gmtime(timestamp)
+    return "%s %s %02d %02d:%02d:%02d +0000 %d" % (
+        _DAYS[t.tm_wday], _MONTHS[t.tm_mon - 1], t.tm_mday, t.tm_hour,
+        t.tm_min, t.tm_sec, t.tm_year)
+
+def _tweet_line(rand, tweet_id, timestamp, hashtags):
+    """
+    Make a json line of a tweet (fields in the order of the streaming API).
+    """
+    words = [u'#' + hashtag for hashtag in hashtags]
+    words.extend(rand.choice(_SYLLABLES) * rand.randint(1, 3)
+                 for _ in range(rand.randint(3, 12)))
+    rand.shuffle(words)
+    text = u' '.join(words)
+    entities = []
+    for hashtag in hashtags:
+        start = text.find(u'#' + hashtag)
+        entities.append(OrderedDict([('text', hashtag),
+                                     ('indices', [start,
+                                                  start + len(hashtag) + 1])]))
+    user_id = rand.randint(10000, 4000000000)
+    tweet = OrderedDict([
+        ('created_at', _created_at(timestamp)),
+        ('id', tweet_id),
+        ('id_str', str(tweet_id)),
+        ('text', text),
+        ('source', '<a href="http://twitter.com" rel="nofollow">'
+                   'Twitter Web Client</a>'),
+        ('truncated', False),
+        ('in_reply_to_status_id', None),
+        ('user', OrderedDict([
+            ('id', user_id),
+            ('id_str', str(user_id)),
+            ('name', u' '.join(rand.choice(_SYLLABLES) * 2
+                               for _ in range(2))),
+            ('followers_count', rand.randint(0, 100000)),
+            ('created_at', _created_at(timestamp - rand.randint(0, 10 ** 8))),
+            ('lang', 'en')])),
+        ('geo', None),
+        ('retweet_count', 0),
+        ('entities', OrderedDict([('hashtags', entities), ('urls', []),
+                                  ('user_mentions', []), ('symbols', [])])),
+        ('favorited', False),
+        ('lang', 'en'),
+        ('timestamp_ms', str(timestamp * 1000))])
+    return json.dumps(tweet, separators=(',', ':')) + '\n'
+
+def _control_line(rand, timestamp):
+    """
+    Make a json line of a control message (rate limit).
+    """
+    return json.dumps(OrderedDict([
+        ('limit', OrderedDict([('track', rand.randint(1, 500)),
+                               ('timestamp_ms', str(timestamp * 1000))]))]),
+        separators=(',', ':')) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        usage="python -m benchmark.generator [options] output_file")
+    parser.add_argument('output_filename')
+    parser.add_argument('--tweets', type=int, default=100000,
+                        help="number of tweets (default: 100000)")
+    parser.add_argument('--rate', type=float, default=100,
+                        help="tweets per second (default: 100)")
+    parser.add_argument('--hashtags', type=int, default=10000,
+                        help="number of distinct hashtags (default: 10000)")
+    parser.add_argument('--zipf', type=float, default=1.1,
+                        help="exponent of Zipf's law (default: 1.1)")
+    parser.add_argument('--counts', default='',
+                        help="comma-separated weights for 0, 1, 2, ... "
+                             "hashtags in a tweet")
+    parser.add_argument('--out-of-order', type=float, default=0.0,
+                        help="ratio of delayed tweets (default: 0)")
+    parser.add_argument('--max-lateness', type=int, default=10,
+                        help="maximum delay in seconds (default: 10)")
+    parser.add_argument('--control-rate', type=float, default=0.0,
+                        help="ratio of control messages (default: 0)")
+    parser.add_argument('--gap-every', type=int, default=0,
+                        help="seconds of the stream between gaps (default: "
+                             "0, no gap)")
+    parser.add_argument('--gap-length', type=int, default=0,
+                        help="length of a gap in seconds (default: 0)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    counts = [float(weight) for weight in args.counts.split(',') if weight]
+    generator = TweetGenerator(
+        tweets_per_second=args.rate, num_hashtags=args.hashtags,
+        zipf_s=args.zipf, hashtag_counts=counts or HASHTAG_COUNTS,
+        out_of_order=args.out_of_order, max_lateness=args.max_lateness,
+        control_rate=args.control_rate, gap_every=args.gap_every,
+        gap_length=args.gap_length, seed=args.seed)
+    generator.write(args.output_filename, args.tweets)
+
+if __name__ == "__main__":
+    main()
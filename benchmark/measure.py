@@ -0,0 +1,156 @@
+# Functions to measure benchmarks: throughput, latency percentiles (and
+# histograms) and peak memory (RSS). Every benchmark runs in its own process,
+# so that the peak RSS of one benchmark is not hidden by (or added to) others.
+
+import sys
+import math
+import time
+import resource
+import multiprocessing
+
+PERCENTILES = [50, 90, 99, 99.9, 100]   # Percentiles of latencies reported
+                                        # (100: the maximum).
+
+timer = time.time   # Wall-clock timer for benchmarks.
+
+def percentile(sorted_samples, p):
+    """
+    Return the p-th percentile (nearest rank) of sorted samples.
+    Input:
+        sorted_samples (list of float): samples (sorted)
+        p (float): 0 < p <= 100
+    Output:
+        (float): percentile (None if there is no sample)
+    """
+    if not sorted_samples:
+        return None
+    rank = int(p / 100.0 * len(sorted_samples) + 0.999999)
+    return sorted_samples[min(max(rank, 1), len(sorted_samples)) - 1]
+
+def histogram(samples):
+    """
+    Count samples in buckets of powers of two (microseconds), so that the
+    tail of latencies can be seen.
+    Input:
+        samples (list of float): samples (seconds)
+    Output:
+        (list): (upper bound (microseconds), count) for buckets from the
+                first non-empty one to the last one
+    """
+    counts = {}
+    for sample in samples:
+        exponent = math.frexp(max(sample * 1e6, 1.0))[1]
+        counts[exponent] = counts.get(exponent, 0) + 1
+    if not counts:
+        return []
+    return [(1 << exponent, counts.get(exponent, 0))
+            for exponent in xrange(min(counts), max(counts) + 1)]
+
+def peak_rss():
+    """
+    Return the peak RSS of this process plus the largest peak RSS of its
+    finished child processes (e.g., worker processes) (MB).
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + \
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    if sys.platform == 'darwin':
+        return usage / (1024.0 * 1024.0)    # bytes
+    return usage / 1024.0   # kilobytes
+
+class Result:
+    """
+    Result of a benchmark.
+    (1) Throughput is the number of items (e.g., tweets) per second.
+    (2) Latencies are elapsed times of single items (seconds), if measured.
+    """
+    def __init__(self, name, num_items, elapsed, latencies=None, rss=None):
+        """
+        Constructor
+        Input:
+            name (str): name of the benchmark
+            num_items (int): number of items processed
+            elapsed (float): total elapsed time (seconds)
+            latencies (list of float): latencies of items (seconds)
+            rss (float): peak RSS (MB)
+        """
+        self.name = name
+        self.num_items = num_items
+        self.elapsed = elapsed
+        self.latencies = sorted(latencies) if latencies else []
+        self.rss = rss
+
+    def throughput(self):
+        if self.elapsed <= 0:
+            return 0
+        return self.num_items / self.elapsed
+
+    def row(self):
+        """
+        Return the result as a line of the report.
+        """
+        values = ["%-36s %9d %8.3f %10.0f" % (self.name, self.num_items,
+                                               self.elapsed,
+                                               self.throughput())]
+        for p in PERCENTILES:
+            value = percentile(self.latencies, p)
+            values.append("%8s" % ("-" if value is None
+                                   else "%.1f" % (value * 1e6)))
+        values.append("%8.1f" % self.rss if self.rss is not None
+                      else "%8s" % "-")
+        return " ".join(values)
+
+    def histogram(self, width=40):
+        """
+        Return the histogram of latencies as lines of the report (a bar is
+        shown for every non-empty bucket).
+        Input:
+            width (int): length of the longest bar
+        Output:
+            (list of str): lines
+        """
+        buckets = histogram(self.latencies)
+        if not buckets:
+            return []
+        largest = max(count for upper, count in buckets)
+        lines = [self.name]
+        for upper, count in buckets:
+            bar = '#' * (max(1, count * width // largest) if count else 0)
+            lines.append("%12s us %9d %s" % ("< %d" % upper, count, bar))
+        return lines
+
+
+def header():
+    """
+    Return the header of the report (latencies in microseconds).
+    """
+    return " ".join(["%-36s %9s %8s %10s" % ("benchmark", "items", "seconds",
+                                             "items/s")] +
+                    ["%8s" % ("p%g us" % p) for p in PERCENTILES] +
+                    ["%8s" % "RSS MB"])
+
+def run_isolated(function, *args):
+    """
+    Run a benchmark function in a new process, and fill in its peak RSS.
+    Input:
+        function: function that returns Result (module-level, so that it can
+                  be run in another process)
+        args: arguments of the function
+    Output:
+        (Result): result with the peak RSS of that process
+    """
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_run_child,
+                                      args=(child_connection, function, args))
+    process.start()
+    result = connection.recv()
+    process.join()
+    return result
+
+def _run_child(connection, function, args):
+    """
+    Run a benchmark function and send the result back (in a child process).
+    """
+    result = function(*args)
+    result.rss = peak_rss()
+    connection.send(result)
+    connection.close()
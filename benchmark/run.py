@@ -0,0 +1,203 @@
+# Benchmark suite: indexedMinPQ (link upserts and expiry), TimeWindowGraph and
+# CompactGraph (add_tweet and average_degree), and the end-to-end
+# average_degree.main on a json file, all on the same synthetic stream
+# (benchmark/generator.py).
+# Throughput, latency percentiles (per tweet) and peak RSS are reported for
+# each benchmark, which runs in its own process.
+# The 'stall' group runs TimeWindowGraph and BudgetedGraph on the stream with
+# gaps in the feed, and shows histograms of latencies (the tweet after a gap
+# expires the whole window at once without the budget).
+#
+# Usage: python -m benchmark.run [options]
+
+import os
+import shutil
+import argparse
+import tempfile
+
+from benchmark.generator import TweetGenerator, HASHTAG_COUNTS
+from benchmark.measure import Result, header, run_isolated, timer
+from minpq import indexedMinPQ
+from graph import TimeWindowGraph, EXPIRY_STRUCTURES
+from compactgraph import CompactGraph
+from budgetedgraph import BudgetedGraph
+import average_degree
+
+BENCHMARKS = ['minpq', 'graph', 'main', 'stall']
+                                        # Names of groups of benchmarks.
+
+def bench_minpq(generator, num_tweets, window_size=60):
+    """
+    Upserts of links (pairs of hashtags in a tweet) and expiry of old links in
+    indexedMinPQ (as in TimeWindowGraph, without the graph structure).
+    Input:
+        generator (TweetGenerator): generator of the stream
+        num_tweets (int): number of tweets
+        window_size (int): size of the window
+    Output:
+        (Result): result (latency per tweet)
+    """
+    # Links are made in advance, so that only the priority queue is measured.
+    node_ids = {}
+    stream = []
+    for timestamp, hashtags in generator.records(num_tweets):
+        ids = sorted(set([node_ids.setdefault(hashtag, len(node_ids))
+                          for hashtag in hashtags]))
+        stream.append((timestamp, [(id1 << 32) | id2
+                                   for i, id1 in enumerate(ids)
+                                   for id2 in ids[i+1:]]))
+    pq = indexedMinPQ(dtype='int')
+    current_time = 0
+    latencies = []
+    start = timer()
+    for timestamp, links in stream:
+        before = timer()
+        if timestamp > current_time:
+            current_time = timestamp
+            pq.pop_min_until(current_time - window_size)
+        if timestamp > current_time - window_size:
+            for link in links:
+                link_time = pq.value(link)
+                if link_time is None:
+                    pq.add(link, timestamp)
+                elif link_time < timestamp:
+                    pq.update(link, timestamp)
+        latencies.append(timer() - before)
+    return Result('minpq', num_tweets, timer() - start, latencies)
+
+def bench_graph(generator, num_tweets, expiry='heap', compact=False,
+                expiry_budget=None):
+    """
+    TimeWindowGraph (or CompactGraph, BudgetedGraph) add_tweet and
+    average_degree for every tweet.
+    Input:
+        generator (TweetGenerator): generator of the stream
+        num_tweets (int): number of tweets
+        expiry (str): data structure to expire old links ('heap', 'wheel' or
+                      'log')
+        compact (bool): if True, CompactGraph is used (expiry is ignored)
+        expiry_budget (int): if not None, BudgetedGraph is used with this
+                             budget
+    Output:
+        (Result): result (latency per tweet)
+    """
+    stream = list(generator.records(num_tweets))
+    if compact:
+        gr = CompactGraph(window_size=60)
+    elif expiry_budget is not None:
+        gr = BudgetedGraph(window_size=60, expiry=expiry,
+                           budget=expiry_budget)
+    else:
+        gr = TimeWindowGraph(window_size=60, expiry=expiry)
+    latencies = []
+    start = timer()
+    for timestamp, hashtags in stream:
+        before = timer()
+        if gr.add_tweet(timestamp, hashtags):
+            gr.average_degree()
+        latencies.append(timer() - before)
+    name = 'graph compact' if compact else 'graph expiry=%s' % expiry
+    if expiry_budget is not None:
+        name += ' budget=%d' % expiry_budget
+    return Result(name, num_tweets, timer() - start, latencies)
+
+def bench_main(generator, num_tweets, options):
+    """
+    average_degree.main on a json file (written before measuring).
+    Input:
+        generator (TweetGenerator): generator of the stream
+        num_tweets (int): number of tweets
+        options (dict): keyword arguments of average_degree.main
+    Output:
+        (Result): result (no latency)
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        input_filename = os.path.join(directory, 'tweets.txt')
+        output_filename = os.path.join(directory, 'output.txt')
+        generator.write(input_filename, num_tweets)
+        start = timer()
+        average_degree.main(input_filename, output_filename, **options)
+        elapsed = timer() - start
+    finally:
+        shutil.rmtree(directory)
+    name = 'main ' + ' '.join(["%s=%s" % item
+                               for item in sorted(options.items())])
+    return Result(name.strip(), num_tweets, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(usage="python -m benchmark.run [options]")
+    parser.add_argument('--tweets', type=int, default=100000,
+                        help="number of tweets (default: 100000)")
+    parser.add_argument('--rate', type=float, default=100,
+                        help="tweets per second (default: 100)")
+    parser.add_argument('--hashtags', type=int, default=10000,
+                        help="number of distinct hashtags (default: 10000)")
+    parser.add_argument('--zipf', type=float, default=1.1,
+                        help="exponent of Zipf's law (default: 1.1)")
+    parser.add_argument('--counts', default='',
+                        help="comma-separated weights for 0, 1, 2, ... "
+                             "hashtags in a tweet")
+    parser.add_argument('--out-of-order', type=float, default=0.0,
+                        help="ratio of delayed tweets (default: 0)")
+    parser.add_argument('--control-rate', type=float, default=0.0,
+                        help="ratio of control messages (default: 0)")
+    parser.add_argument('--gap-every', type=int, default=100,
+                        help="seconds of the stream between gaps, for the "
+                             "'stall' group (default: 100)")
+    parser.add_argument('--gap-length', type=int, default=120,
+                        help="length of a gap in seconds, for the 'stall' "
+                             "group (default: 120)")
+    parser.add_argument('--expiry-budget', type=int, default=20,
+                        help="budget of BudgetedGraph, for the 'stall' group "
+                             "(default: 20)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help="comma-separated groups of benchmarks (%s)" %
+                             ",".join(BENCHMARKS))
+    args = parser.parse_args()
+    only = [name for name in args.only.split(',') if name]
+    for name in only:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark: %s" % name)
+    counts = [float(weight) for weight in args.counts.split(',') if weight]
+    generator = TweetGenerator(
+        tweets_per_second=args.rate, num_hashtags=args.hashtags,
+        zipf_s=args.zipf, hashtag_counts=counts or HASHTAG_COUNTS,
+        out_of_order=args.out_of_order, control_rate=args.control_rate,
+        seed=args.seed)
+
+    print header()
+    if 'minpq' in only:
+        print run_isolated(bench_minpq, generator, args.tweets).row()
+    if 'graph' in only:
+        for expiry in EXPIRY_STRUCTURES:
+            print run_isolated(bench_graph, generator, args.tweets,
+                               expiry).row()
+        print run_isolated(bench_graph, generator, args.tweets, 'heap',
+                           True).row()
+    if 'main' in only:
+        for options in [{}, {'selective': True},
+                        {'selective': True, 'expiry': 'wheel'},
+                        {'selective': True, 'expiry': 'log'},
+                        {'selective': True, 'compact': True},
+                        {'selective': True, 'workers': 2},
+                        {'selective': True, 'parts': 2},
+                        {'selective': True, 'normalize': True}]:
+            print run_isolated(bench_main, generator, args.tweets,
+                               options).row()
+    if 'stall' in only:
+        generator.gap_every = args.gap_every
+        generator.gap_length = args.gap_length
+        results = [run_isolated(bench_graph, generator, args.tweets, 'heap',
+                                False, budget)
+                   for budget in [None, args.expiry_budget]]
+        for result in results:
+            print result.row()
+        for result in results:
+            print
+            print "\n".join(result.histogram())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# Build script for the optional C extension (src/_accel.c), which speeds up
+# the hot path of TimeWindowGraph. Everything works without it (pure Python).
+#
+# Usage: python setup.py build_ext --inplace   (puts _accel.so into src/)
+
+from distutils.core import setup, Extension
+
+setup(name='tweet-hashtag-graph',
+      ext_modules=[Extension('src._accel', ['src/_accel.c'],
+                             extra_compile_args=['-O2'])])
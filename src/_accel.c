@@ -0,0 +1,780 @@
+/*
+ * Optional C extension for the hot path of TimeWindowGraph (built with
+ * "python setup.py build_ext --inplace"; src/graph.py falls back to pure
+ * Python if it is not built).
+ * (1) IntMinPQ: indexedMinPQ(dtype='int') for integer keys (packed links),
+ *     with the same interface and the same algorithm (ids interned for keys,
+ *     a binary heap of ids, positions and values in arrays indexed by ids,
+ *     ids of removed keys recycled last-in first-out), so ties are broken in
+ *     the same way. Keys are interned in a hash table with open addressing
+ *     and linear probing instead of a dictionary.
+ * (2) upsert_links: the loop of TimeWindowGraph.add_tweet over all pairs of
+ *     hashtags (links are added, or their time values are updated).
+ * (3) expire_links: the loop of TimeWindowGraph._remove_old_links (old links
+ *     are removed from the heap and from the graph structure).
+ */
+
+#include <Python.h>
+#include <structmember.h>
+
+typedef struct {
+    PyObject_HEAD
+    long *heap;             /* ids for the heap (index 0 is not used) */
+    Py_ssize_t heap_size;   /* Number of datapoints stored. */
+    long *position;         /* index: id, value: index of the heap */
+    long long *values;      /* index: id, value: value of the datapoint */
+    long long *keys;        /* index: id, value: key of the datapoint */
+    Py_ssize_t num_ids;     /* Number of ids (including free ones). */
+    Py_ssize_t capacity;    /* Capacity of arrays indexed by ids (and heap). */
+    long *free_ids;         /* ids of removed datapoints (to be recycled) */
+    Py_ssize_t num_free;
+    long *table;            /* Hash table (id + 1, or 0 if empty). */
+    int table_bits;         /* Size of the table is (1 << table_bits). */
+} IntMinPQ;
+
+static PyTypeObject IntMinPQType;
+
+/* ==== conversion ======================================================== */
+
+static int
+as_long_long(PyObject *obj, long long *result)
+{
+    if (PyInt_Check(obj)) {
+        *result = PyInt_AS_LONG(obj);
+        return 0;
+    }
+    *result = PyLong_AsLongLong(obj);
+    if (*result == -1 && PyErr_Occurred())
+        return -1;
+    return 0;
+}
+
+static PyObject *
+from_long_long(long long value)
+{
+    if (value >= LONG_MIN && value <= LONG_MAX)
+        return PyInt_FromLong((long)value);
+    return PyLong_FromLongLong(value);
+}
+
+/* ==== hash table of keys ================================================ */
+
+static Py_ssize_t
+table_hash(IntMinPQ *self, long long key)
+{
+    return (Py_ssize_t)(((unsigned long long)key * 0x9E3779B97F4A7C15ULL) >>
+                        (64 - self->table_bits));
+}
+
+/* Slot of the key in the table, or -1 if the key does not exist. */
+static Py_ssize_t
+table_find(IntMinPQ *self, long long key)
+{
+    Py_ssize_t mask = ((Py_ssize_t)1 << self->table_bits) - 1;
+    Py_ssize_t slot = table_hash(self, key);
+    long entry;
+    while ((entry = self->table[slot]) != 0) {
+        if (self->keys[entry - 1] == key)
+            return slot;
+        slot = (slot + 1) & mask;
+    }
+    return -1;
+}
+
+static void
+table_put(IntMinPQ *self, long key_id)
+{
+    Py_ssize_t mask = ((Py_ssize_t)1 << self->table_bits) - 1;
+    Py_ssize_t slot = table_hash(self, self->keys[key_id]);
+    while (self->table[slot] != 0)
+        slot = (slot + 1) & mask;
+    self->table[slot] = key_id + 1;
+}
+
+/* Empty a slot, and move later entries of the same run back into it
+   (backward-shift deletion, so no tombstone is needed). */
+static void
+table_delete(IntMinPQ *self, Py_ssize_t slot)
+{
+    Py_ssize_t mask = ((Py_ssize_t)1 << self->table_bits) - 1;
+    Py_ssize_t next = slot;
+    for (;;) {
+        long entry;
+        Py_ssize_t home;
+        next = (next + 1) & mask;
+        entry = self->table[next];
+        if (entry == 0)
+            break;
+        home = table_hash(self, self->keys[entry - 1]);
+        /* The entry can move back if its home is not in (slot, next]. */
+        if (slot <= next ? (home <= slot || home > next)
+                         : (home <= slot && home > next)) {
+            self->table[slot] = entry;
+            slot = next;
+        }
+    }
+    self->table[slot] = 0;
+}
+
+/* Make room for one more datapoint (arrays and the table). */
+static int
+reserve(IntMinPQ *self)
+{
+    if (self->num_free == 0 && self->num_ids == self->capacity) {
+        Py_ssize_t capacity = self->capacity ? self->capacity * 2 : 16;
+        long *heap = PyMem_Realloc(self->heap, (capacity + 1) * sizeof(long));
+        long *position, *free_ids;
+        long long *values, *keys;
+        if (heap == NULL)
+            return -1;
+        self->heap = heap;
+        position = PyMem_Realloc(self->position, capacity * sizeof(long));
+        if (position == NULL)
+            return -1;
+        self->position = position;
+        values = PyMem_Realloc(self->values, capacity * sizeof(long long));
+        if (values == NULL)
+            return -1;
+        self->values = values;
+        keys = PyMem_Realloc(self->keys, capacity * sizeof(long long));
+        if (keys == NULL)
+            return -1;
+        self->keys = keys;
+        free_ids = PyMem_Realloc(self->free_ids, capacity * sizeof(long));
+        if (free_ids == NULL)
+            return -1;
+        self->free_ids = free_ids;
+        self->capacity = capacity;
+    }
+    if ((self->heap_size + 1) * 2 > ((Py_ssize_t)1 << self->table_bits)) {
+        int bits = self->table_bits + 1;
+        long *table = PyMem_Malloc(((size_t)1 << bits) * sizeof(long));
+        Py_ssize_t i;
+        if (table == NULL)
+            return -1;
+        memset(table, 0, ((size_t)1 << bits) * sizeof(long));
+        PyMem_Free(self->table);
+        self->table = table;
+        self->table_bits = bits;
+        for (i = 1; i <= self->heap_size; i++)
+            table_put(self, self->heap[i]);
+    }
+    return 0;
+}
+
+/* ==== heap (same as indexedMinPQ) ======================================= */
+
+static void
+bubble_up(IntMinPQ *self, Py_ssize_t index)
+{
+    long *heap = self->heap;
+    long key_id = heap[index];
+    long long value = self->values[key_id];
+    while (index > 1) {
+        Py_ssize_t parent = index >> 1;
+        long parent_id = heap[parent];
+        if (self->values[parent_id] <= value)
+            break;
+        heap[index] = parent_id;
+        self->position[parent_id] = index;
+        index = parent;
+    }
+    heap[index] = key_id;
+    self->position[key_id] = index;
+}
+
+static void
+bubble_down(IntMinPQ *self, Py_ssize_t index)
+{
+    long *heap = self->heap;
+    long long *values = self->values;
+    Py_ssize_t heap_size = self->heap_size;
+    long key_id = heap[index];
+    long long value = values[key_id];
+    Py_ssize_t child = index << 1;
+    while (child <= heap_size) {
+        long child_id = heap[child];
+        long long child_value = values[child_id];
+        if (child < heap_size) {
+            long right_id = heap[child + 1];
+            if (values[right_id] < child_value) {
+                child += 1;
+                child_id = right_id;
+                child_value = values[right_id];
+            }
+        }
+        if (child_value >= value)
+            break;
+        heap[index] = child_id;
+        self->position[child_id] = index;
+        index = child;
+        child = index << 1;
+    }
+    heap[index] = key_id;
+    self->position[key_id] = index;
+}
+
+/* Add a new key (it must not exist). */
+static int
+pq_add(IntMinPQ *self, long long key, long long value)
+{
+    long key_id;
+    if (reserve(self) < 0) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    if (self->num_free > 0) {
+        key_id = self->free_ids[--self->num_free];
+    }
+    else {
+        key_id = (long)self->num_ids++;
+    }
+    self->keys[key_id] = key;
+    self->values[key_id] = value;
+    table_put(self, key_id);
+    self->heap_size += 1;
+    self->heap[self->heap_size] = key_id;
+    bubble_up(self, self->heap_size);
+    return 0;
+}
+
+/* Remove the key in the given slot of the table. */
+static void
+pq_remove_slot(IntMinPQ *self, Py_ssize_t slot)
+{
+    long key_id = self->table[slot] - 1;
+    Py_ssize_t index = self->position[key_id];
+    long last_id;
+    table_delete(self, slot);
+    self->free_ids[self->num_free++] = key_id;
+    last_id = self->heap[self->heap_size];
+    self->heap_size -= 1;
+    if (index <= self->heap_size) {
+        self->heap[index] = last_id;
+        self->position[last_id] = index;
+        if (index > 1 && self->values[last_id] <
+                self->values[self->heap[index >> 1]])
+            bubble_up(self, index);
+        else
+            bubble_down(self, index);
+    }
+}
+
+static void
+pq_update_id(IntMinPQ *self, long key_id, long long value)
+{
+    long long old_value = self->values[key_id];
+    self->values[key_id] = value;
+    if (value < old_value)
+        bubble_up(self, self->position[key_id]);
+    else if (value > old_value)
+        bubble_down(self, self->position[key_id]);
+}
+
+/* ==== IntMinPQ type ===================================================== */
+
+static int
+IntMinPQ_init(IntMinPQ *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"dtype", NULL};
+    const char *dtype = "int";
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|s", kwlist, &dtype))
+        return -1;
+    if (strcmp(dtype, "int") != 0) {
+        PyErr_SetString(PyExc_ValueError,
+                        "IntMinPQ only supports dtype='int'");
+        return -1;
+    }
+    self->table_bits = 4;
+    self->table = PyMem_Malloc(((size_t)1 << self->table_bits) *
+                               sizeof(long));
+    self->heap = PyMem_Malloc(sizeof(long));
+    if (self->table == NULL || self->heap == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    memset(self->table, 0, ((size_t)1 << self->table_bits) * sizeof(long));
+    self->heap[0] = 0;
+    return 0;
+}
+
+static void
+IntMinPQ_dealloc(IntMinPQ *self)
+{
+    PyMem_Free(self->heap);
+    PyMem_Free(self->position);
+    PyMem_Free(self->values);
+    PyMem_Free(self->keys);
+    PyMem_Free(self->free_ids);
+    PyMem_Free(self->table);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+static PyObject *
+IntMinPQ_add(IntMinPQ *self, PyObject *args)
+{
+    PyObject *key_obj, *value_obj;
+    long long key, value;
+    if (!PyArg_ParseTuple(args, "OO:add", &key_obj, &value_obj) ||
+            as_long_long(key_obj, &key) < 0 ||
+            as_long_long(value_obj, &value) < 0)
+        return NULL;
+    if (table_find(self, key) >= 0)
+        Py_RETURN_FALSE;
+    if (pq_add(self, key, value) < 0)
+        return NULL;
+    Py_RETURN_TRUE;
+}
+
+static PyObject *
+IntMinPQ_remove(IntMinPQ *self, PyObject *key_obj)
+{
+    long long key;
+    Py_ssize_t slot;
+    if (as_long_long(key_obj, &key) < 0)
+        return NULL;
+    slot = table_find(self, key);
+    if (slot < 0)
+        Py_RETURN_FALSE;
+    pq_remove_slot(self, slot);
+    Py_RETURN_TRUE;
+}
+
+static PyObject *
+IntMinPQ_update(IntMinPQ *self, PyObject *args)
+{
+    PyObject *key_obj, *value_obj;
+    long long key, value;
+    Py_ssize_t slot;
+    if (!PyArg_ParseTuple(args, "OO:update", &key_obj, &value_obj) ||
+            as_long_long(key_obj, &key) < 0 ||
+            as_long_long(value_obj, &value) < 0)
+        return NULL;
+    slot = table_find(self, key);
+    if (slot < 0)
+        Py_RETURN_FALSE;
+    pq_update_id(self, self->table[slot] - 1, value);
+    Py_RETURN_TRUE;
+}
+
+static PyObject *
+IntMinPQ_value(IntMinPQ *self, PyObject *key_obj)
+{
+    long long key;
+    Py_ssize_t slot;
+    if (as_long_long(key_obj, &key) < 0) {
+        /* Keys that are not integers do not exist. */
+        PyErr_Clear();
+        Py_RETURN_NONE;
+    }
+    slot = table_find(self, key);
+    if (slot < 0)
+        Py_RETURN_NONE;
+    return from_long_long(self->values[self->table[slot] - 1]);
+}
+
+static PyObject *
+pair(long long key, long long value)
+{
+    PyObject *key_obj = from_long_long(key);
+    PyObject *value_obj = from_long_long(value);
+    PyObject *result = NULL;
+    if (key_obj != NULL && value_obj != NULL)
+        result = PyTuple_Pack(2, key_obj, value_obj);
+    Py_XDECREF(key_obj);
+    Py_XDECREF(value_obj);
+    return result;
+}
+
+static PyObject *
+IntMinPQ_peek_min(IntMinPQ *self)
+{
+    long key_id;
+    if (self->heap_size == 0)
+        return Py_BuildValue("(OO)", Py_None, Py_None);
+    key_id = self->heap[1];
+    return pair(self->keys[key_id], self->values[key_id]);
+}
+
+static PyObject *
+IntMinPQ_pop_min(IntMinPQ *self)
+{
+    long key_id;
+    PyObject *result;
+    if (self->heap_size == 0)
+        return Py_BuildValue("(OO)", Py_None, Py_None);
+    key_id = self->heap[1];
+    result = pair(self->keys[key_id], self->values[key_id]);
+    if (result != NULL)
+        pq_remove_slot(self, table_find(self, self->keys[key_id]));
+    return result;
+}
+
+/* Limit from a Python object (None: no limit, returned as -1). */
+static int
+as_limit(PyObject *limit_obj, Py_ssize_t *limit)
+{
+    if (limit_obj == NULL || limit_obj == Py_None) {
+        *limit = -1;
+        return 0;
+    }
+    *limit = PyNumber_AsSsize_t(limit_obj, PyExc_OverflowError);
+    if (*limit == -1 && PyErr_Occurred())
+        return -1;
+    return 0;
+}
+
+static PyObject *
+IntMinPQ_pop_min_until(IntMinPQ *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"threshold", "limit", NULL};
+    PyObject *threshold_obj, *limit_obj = NULL, *removed, *item;
+    long long threshold;
+    Py_ssize_t limit;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|O:pop_min_until", kwlist,
+                                     &threshold_obj, &limit_obj) ||
+            as_long_long(threshold_obj, &threshold) < 0 ||
+            as_limit(limit_obj, &limit) < 0)
+        return NULL;
+    removed = PyList_New(0);
+    if (removed == NULL)
+        return NULL;
+    while (self->heap_size > 0 &&
+           self->values[self->heap[1]] <= threshold &&
+           PyList_GET_SIZE(removed) != limit) {
+        item = IntMinPQ_pop_min(self);
+        if (item == NULL || PyList_Append(removed, item) < 0) {
+            Py_XDECREF(item);
+            Py_DECREF(removed);
+            return NULL;
+        }
+        Py_DECREF(item);
+    }
+    return removed;
+}
+
+static PyObject *
+IntMinPQ_items(IntMinPQ *self)
+{
+    PyObject *result = PyList_New(self->heap_size);
+    Py_ssize_t i;
+    if (result == NULL)
+        return NULL;
+    for (i = 1; i <= self->heap_size; i++) {
+        long key_id = self->heap[i];
+        PyObject *item = pair(self->keys[key_id], self->values[key_id]);
+        if (item == NULL) {
+            Py_DECREF(result);
+            return NULL;
+        }
+        PyList_SET_ITEM(result, i - 1, item);
+    }
+    return result;
+}
+
+/* Values for sorting ids in load (ties keep the order of ids, as the stable
+   sort of indexedMinPQ.load). */
+static long long *sort_values;
+
+static int
+compare_ids(const void *a, const void *b)
+{
+    long id1 = *(const long *)a, id2 = *(const long *)b;
+    if (sort_values[id1] != sort_values[id2])
+        return sort_values[id1] < sort_values[id2] ? -1 : 1;
+    return id1 < id2 ? -1 : (id1 > id2);
+}
+
+static PyObject *
+IntMinPQ_load(IntMinPQ *self, PyObject *args)
+{
+    PyObject *keys_obj, *values_obj, *keys_seq = NULL, *values_seq = NULL;
+    Py_ssize_t num_keys, i;
+    int is_sorted = 1;
+    if (!PyArg_ParseTuple(args, "OO:load", &keys_obj, &values_obj))
+        return NULL;
+    if (self->heap_size > 0 || self->num_free > 0)
+        Py_RETURN_FALSE;
+    keys_seq = PySequence_Fast(keys_obj, "keys have to be a sequence");
+    if (keys_seq == NULL)
+        return NULL;
+    values_seq = PySequence_Fast(values_obj, "values have to be a sequence");
+    if (values_seq == NULL)
+        goto error;
+    num_keys = PySequence_Fast_GET_SIZE(keys_seq);
+    if (PySequence_Fast_GET_SIZE(values_seq) != num_keys) {
+        PyErr_SetString(PyExc_ValueError,
+                        "keys and values have different lengths");
+        goto error;
+    }
+    for (i = 0; i < num_keys; i++) {
+        if (reserve(self) < 0) {
+            PyErr_NoMemory();
+            goto error;
+        }
+        if (as_long_long(PySequence_Fast_GET_ITEM(keys_seq, i),
+                         &self->keys[i]) < 0 ||
+                as_long_long(PySequence_Fast_GET_ITEM(values_seq, i),
+                             &self->values[i]) < 0)
+            goto error;
+        if (i > 0 && self->values[i - 1] > self->values[i])
+            is_sorted = 0;
+        self->heap[i + 1] = (long)i;
+        self->num_ids = i + 1;
+        self->heap_size = i + 1;
+        table_put(self, (long)i);
+    }
+    /* A sorted array is a valid binary heap. */
+    if (!is_sorted) {
+        sort_values = self->values;
+        qsort(self->heap + 1, num_keys, sizeof(long), compare_ids);
+    }
+    for (i = 1; i <= num_keys; i++)
+        self->position[self->heap[i]] = i;
+    Py_DECREF(keys_seq);
+    Py_DECREF(values_seq);
+    Py_RETURN_TRUE;
+
+error:
+    Py_XDECREF(keys_seq);
+    Py_XDECREF(values_seq);
+    return NULL;
+}
+
+static PyObject *
+IntMinPQ_size(IntMinPQ *self)
+{
+    return PyInt_FromSsize_t(self->heap_size);
+}
+
+static PyObject *
+IntMinPQ_write(IntMinPQ *self)
+{
+    PyObject *f_out = PySys_GetObject("stdout");
+    Py_ssize_t i;
+    char line[80];
+    for (i = 1; i <= self->heap_size; i++) {
+        long key_id = self->heap[i];
+        PyOS_snprintf(line, sizeof(line), "%ld %lld %lld\n", (long)i,
+                      self->values[key_id], self->keys[key_id]);
+        if (f_out == NULL || PyFile_WriteString(line, f_out) < 0)
+            return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef IntMinPQ_methods[] = {
+    {"add", (PyCFunction)IntMinPQ_add, METH_VARARGS,
+     "Add a new (key, value) pair (False if key exists already)."},
+    {"remove", (PyCFunction)IntMinPQ_remove, METH_O,
+     "Remove (key, value) pair based on key."},
+    {"update", (PyCFunction)IntMinPQ_update, METH_VARARGS,
+     "Update the value of the given key."},
+    {"value", (PyCFunction)IntMinPQ_value, METH_O,
+     "Return the value of the given key (None if it does not exist)."},
+    {"peek_min", (PyCFunction)IntMinPQ_peek_min, METH_NOARGS,
+     "Peek the minimum value and return (key, value) pair."},
+    {"pop_min", (PyCFunction)IntMinPQ_pop_min, METH_NOARGS,
+     "Remove the datapoint with the minimum value, and return it."},
+    {"pop_min_until", (PyCFunction)IntMinPQ_pop_min_until,
+     METH_VARARGS | METH_KEYWORDS,
+     "Remove datapoints whose values are less than or equal to threshold."},
+    {"items", (PyCFunction)IntMinPQ_items, METH_NOARGS,
+     "Return all (key, value) pairs (in the order of the heap)."},
+    {"load", (PyCFunction)IntMinPQ_load, METH_VARARGS,
+     "Load (key, value) pairs into an empty priority queue at once."},
+    {"size", (PyCFunction)IntMinPQ_size, METH_NOARGS,
+     "Return the number of (key, value) pairs."},
+    {"write", (PyCFunction)IntMinPQ_write, METH_NOARGS,
+     "Write the stored data to the standard output."},
+    {NULL}
+};
+
+static PyTypeObject IntMinPQType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "_accel.IntMinPQ",              /* tp_name */
+    sizeof(IntMinPQ),               /* tp_basicsize */
+    0,                              /* tp_itemsize */
+    (destructor)IntMinPQ_dealloc,   /* tp_dealloc */
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    Py_TPFLAGS_DEFAULT,             /* tp_flags */
+    "Indexed minimum priority queue for integer keys and values.",
+    0, 0, 0, 0, 0, 0,
+    IntMinPQ_methods,               /* tp_methods */
+    0, 0, 0, 0, 0, 0, 0,
+    (initproc)IntMinPQ_init,        /* tp_init */
+    0,                              /* tp_alloc */
+    PyType_GenericNew,              /* tp_new */
+};
+
+/* ==== graph kernels ===================================================== */
+
+/* Set of ids of neighbors of a node (borrowed), or NULL with an exception. */
+static PyObject *
+links_of(PyObject *graph_structure, long node_id)
+{
+    PyObject *links_info;
+    if (node_id < 0 || node_id >= PyList_GET_SIZE(graph_structure)) {
+        PyErr_SetString(PyExc_IndexError, "node id out of range");
+        return NULL;
+    }
+    links_info = PyList_GET_ITEM(graph_structure, node_id);
+    if (!PySet_Check(links_info)) {
+        PyErr_SetString(PyExc_TypeError, "node id is not used");
+        return NULL;
+    }
+    return links_info;
+}
+
+static PyObject *
+upsert_links(PyObject *module, PyObject *args)
+{
+    PyObject *node_ids, *graph_structure;
+    IntMinPQ *pq;
+    PyObject *timestamp_obj;
+    long long timestamp;
+    Py_ssize_t num_ids, i, j;
+    long num_added = 0;
+    if (!PyArg_ParseTuple(args, "O!O!O!O:upsert_links", &PyList_Type,
+                          &node_ids, &PyList_Type, &graph_structure,
+                          &IntMinPQType, &pq, &timestamp_obj) ||
+            as_long_long(timestamp_obj, &timestamp) < 0)
+        return NULL;
+    num_ids = PyList_GET_SIZE(node_ids);
+    for (i = 0; i < num_ids; i++) {
+        PyObject *id1_obj = PyList_GET_ITEM(node_ids, i);
+        long id1 = PyInt_AsLong(id1_obj);
+        PyObject *links_info;
+        if (id1 == -1 && PyErr_Occurred())
+            return NULL;
+        links_info = links_of(graph_structure, id1);
+        if (links_info == NULL)
+            return NULL;
+        for (j = i + 1; j < num_ids; j++) {
+            PyObject *id2_obj = PyList_GET_ITEM(node_ids, j);
+            long id2 = PyInt_AsLong(id2_obj);
+            long long link = ((long long)id1 << 32) | id2;
+            PyObject *links_info2 = links_of(graph_structure, id2);
+            int found;
+            if (links_info2 == NULL)
+                return NULL;
+            found = PySet_Contains(links_info, id2_obj);
+            if (found < 0)
+                return NULL;
+            if (found) {
+                Py_ssize_t slot = table_find(pq, link);
+                if (slot >= 0 && pq->values[pq->table[slot] - 1] < timestamp)
+                    pq_update_id(pq, pq->table[slot] - 1, timestamp);
+            }
+            else {
+                if (pq_add(pq, link, timestamp) < 0 ||
+                        PySet_Add(links_info, id2_obj) < 0 ||
+                        PySet_Add(links_info2, id1_obj) < 0)
+                    return NULL;
+                num_added += 1;
+            }
+        }
+    }
+    return PyInt_FromLong(num_added);
+}
+
+/* Remove node_id2 from neighbors of node_id1, and return the number of
+   neighbors left (-1 with an exception). */
+static Py_ssize_t
+discard_id(PyObject *graph_structure, long node_id1, long node_id2)
+{
+    PyObject *links_info = links_of(graph_structure, node_id1);
+    PyObject *node_id_obj;
+    int result;
+    if (links_info == NULL)
+        return -1;
+    node_id_obj = PyInt_FromLong(node_id2);
+    if (node_id_obj == NULL)
+        return -1;
+    result = PySet_Discard(links_info, node_id_obj);
+    Py_DECREF(node_id_obj);
+    return result < 0 ? -1 : PySet_GET_SIZE(links_info);
+}
+
+static PyObject *
+expire_links(PyObject *module, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"linkheap", "graph_structure", "threshold",
+                             "limit", NULL};
+    IntMinPQ *pq;
+    PyObject *graph_structure, *threshold_obj, *limit_obj = NULL;
+    PyObject *isolated, *result;
+    long long threshold;
+    Py_ssize_t limit;
+    long num_removed = 0;
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O!O!O|O:expire_links",
+                                     kwlist, &IntMinPQType, &pq,
+                                     &PyList_Type, &graph_structure,
+                                     &threshold_obj, &limit_obj) ||
+            as_long_long(threshold_obj, &threshold) < 0 ||
+            as_limit(limit_obj, &limit) < 0)
+        return NULL;
+    isolated = PyList_New(0);
+    if (isolated == NULL)
+        return NULL;
+    while (pq->heap_size > 0 && pq->values[pq->heap[1]] <= threshold &&
+           num_removed != limit) {
+        long long link = pq->keys[pq->heap[1]];
+        long ids[2];
+        Py_ssize_t degrees[2];
+        int k;
+        ids[0] = (long)(link >> 32);
+        ids[1] = (long)(link & 0xFFFFFFFF);
+        pq_remove_slot(pq, table_find(pq, link));
+        num_removed += 1;
+        degrees[0] = discard_id(graph_structure, ids[0], ids[1]);
+        degrees[1] = discard_id(graph_structure, ids[1], ids[0]);
+        if (degrees[0] < 0 || degrees[1] < 0)
+            goto error;
+        for (k = 0; k < 2; k++) {
+            if (degrees[k] == 0) {
+                PyObject *node_id_obj = PyInt_FromLong(ids[k]);
+                if (node_id_obj == NULL ||
+                        PyList_Append(isolated, node_id_obj) < 0) {
+                    Py_XDECREF(node_id_obj);
+                    goto error;
+                }
+                Py_DECREF(node_id_obj);
+            }
+        }
+    }
+    result = Py_BuildValue("(lO)", num_removed, isolated);
+    Py_DECREF(isolated);
+    return result;
+
+error:
+    Py_DECREF(isolated);
+    return NULL;
+}
+
+static PyMethodDef module_methods[] = {
+    {"upsert_links", (PyCFunction)upsert_links, METH_VARARGS,
+     "upsert_links(node_ids, graph_structure, linkheap, timestamp)\n"
+     "Add links for all pairs of node ids (sorted), or update their time "
+     "values, and return the number of links added."},
+    {"expire_links", (PyCFunction)expire_links, METH_VARARGS | METH_KEYWORDS,
+     "expire_links(linkheap, graph_structure, threshold, limit=None)\n"
+     "Remove links whose time values are less than or equal to threshold, "
+     "and return (number of links removed, ids of nodes with no link)."},
+    {NULL}
+};
+
+PyMODINIT_FUNC
+init_accel(void)
+{
+    PyObject *module;
+    if (PyType_Ready(&IntMinPQType) < 0)
+        return;
+    module = Py_InitModule3("_accel", module_methods,
+                            "C extension for the hot path of "
+                            "TimeWindowGraph.");
+    if (module == NULL)
+        return;
+    Py_INCREF(&IntMinPQType);
+    PyModule_AddObject(module, "IntMinPQ", (PyObject *)&IntMinPQType);
+}
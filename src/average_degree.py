@@ -1,10 +1,31 @@
 # Python codes to run this average degree problem.
 
+import os
 import sys
 import json
-import time
+import bisect
+import shutil
+import argparse
+import itertools
+import functools
+import multiprocessing
 
-from graph import TimeWindowGraph
+from graph import TimeWindowGraph, EXPIRY_STRUCTURES
+from multiwindow import MultiWindowGraph
+from timeparse import parse_created_at
+from tweetscan import scan_tweet, scan_timestamp
+from reader import MappedFile
+from sinks import FORMATS, make_sink, is_binary
+from degreehist import STATS
+from reorder import ReorderBuffer, reorder_records
+from checkpoint import save_checkpoint, load_checkpoint
+from shardedgraph import ShardedGraph
+from compactgraph import CompactGraph
+from budgetedgraph import BudgetedGraph
+from offline import average_degree_series
+from normalize import HashtagNormalizer, normalize_records
+from instrument import Stats, InstrumentedGraph, TimedSink, timed_function, \
+    timed_iter, timer
 
 def extract_data(json_data):
     """
@@ -16,10 +37,8 @@ def extract_data(json_data):
         hashtags (list of str): a list of hashtags (sorted)
     """
     try:
-        str_time = json_data['created_at']
-        timestamp = int(time.mktime(time.strptime(str_time, \
-                    "%a %b %d %H:%M:%S +0000 %Y")) + 0.5)
-                # 0.5 is added to make sure it has the correct integer value.
+        # UTC epoch seconds (e.g., "Thu Nov 05 05:05:39 +0000 2015").
+        timestamp = parse_created_at(json_data['created_at'])
     except KeyError:
         # If 'created_at' field does not exist, set timestamp as 0.
         #print "KeyError for the key, created_at : timestamp will be 0."
@@ -35,69 +54,703 @@ def extract_data(json_data):
 
     return timestamp, hashtags
 
-def main(input_filename, output_filename):
+def parse_line(line, selective=False):
+    """
+    To parse a line (a tweet in json format) into timestamp and hashtags.
+    Input:
+        line (str): a line from the input file
+        selective (bool): if True, try to extract only the needed fields
+                          without decoding the whole json first (scan_tweet)
+    Output:
+        (tuple): (timestamp, hashtags) from extract_data, or None if the line
+                 is control data.
+    """
+    if selective:
+        record = scan_tweet(line)
+        if record is not None:
+            return record
+    # Decoding the whole json (also when scan_tweet cannot handle the line).
+    json_data = json.loads(line) # dict representing tweet
+
+    # Checking for control data (if there is less than 3 fields).
+    # In those cases, we will skip the data.
+    if len(json_data) < 3:
+        return None
+
+    # Extract timestamp (int) and a list of hashtags (str, case sensitive)
+    return extract_data(json_data)
+
+def parse_lines(lines, selective=False):
+    """
+    To parse a chunk of lines (used by worker processes).
+    Input:
+        lines (list of str): lines from the input file
+        selective (bool): same as parse_line
+    Output:
+        (list): results of parse_line for all lines (in the same order)
+    """
+    return [parse_line(line, selective) for line in lines]
+
+def read_records(lines, workers=1, chunk_size=1000, selective=False):
+    """
+    To read (timestamp, hashtags) records from lines of the input file in
+    order. If there are more than one worker, lines are parsed by a pool of
+    worker processes in chunks, and records are still returned in input order.
+    Input:
+        lines (iterable of str): lines of the input file (tweets), e.g., a
+                                 file object
+        workers (int): number of worker processes (1: no worker process)
+        chunk_size (int): number of lines sent to a worker at a time
+        selective (bool): same as parse_line
+    Output:
+        (generator): (timestamp, hashtags) for every tweet (control data is
+                     skipped)
+    """
+    if workers <= 1:
+        for line in lines:
+            record = parse_line(line, selective)
+            if record is not None:
+                yield record
+        return
+
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+    pool = multiprocessing.Pool(workers)
+    try:
+        # imap keeps the order of chunks, and a few chunks are parsed ahead
+        # while records are consumed here.
+        for records in pool.imap(functools.partial(parse_lines,
+                                                   selective=selective),
+                                 chunks):
+            for record in records:
+                if record is not None:
+                    yield record
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+def read_records_timed(lines, instrumentation, selective=False):
+    """
+    Same as read_records in this process, but time spent for decoding json
+    (or scanning) and extract_data is added to instrumentation
+    ('parse.decode' and 'parse.extract').
+    Input:
+        lines (iterable of str): lines of the input file (tweets)
+        instrumentation (instrument.Stats): counters
+        selective (bool): same as parse_line
+    Output:
+        (generator): (timestamp, hashtags) for every tweet (control data is
+                     skipped)
+    """
+    for line in lines:
+        start = timer()
+        record = scan_tweet(line) if selective else None
+        if record is None:
+            json_data = json.loads(line)
+            middle = timer()
+            instrumentation.add_time('parse.decode', middle - start)
+            if len(json_data) < 3:
+                continue    # Control data
+            record = extract_data(json_data)
+            instrumentation.add_time('parse.extract', timer() - middle)
+        else:
+            instrumentation.add_time('parse.decode', timer() - start)
+        yield record
+
+def read_records_with_offsets(mapped_file, start_offset=0, end_offset=None,
+                              selective=False):
+    """
+    To read (timestamp, hashtags) records from a range of the input file in
+    order, with the byte offset after each record (used for checkpoints).
+    Input:
+        mapped_file (MappedFile): input file
+        start_offset (int): byte offset to start from (start of a line)
+        end_offset (int): byte offset to stop at (None: the end of the file)
+        selective (bool): same as parse_line
+    Output:
+        (generator): (offset, (timestamp, hashtags)) for every tweet, where
+                     offset is the start of the next line (control data is
+                     skipped)
+    """
+    for offset, line in mapped_file.lines_with_offsets(start_offset,
+                                                       end_offset):
+        record = parse_line(line, selective)
+        if record is not None:
+            yield offset, record
+
+def make_graph(window_size=60, expiry='heap', stats=(), windows=None,
+               compact=False, expiry_budget=None):
+    """
+    To create the graph for hashtags, and the function that returns values
+    written for each tweet (it takes the graph, which can be replaced later,
+    e.g., by the instrumented or restored one).
+    Input:
+        window_size (int): size of the window
+        expiry, stats, windows, compact, expiry_budget: same as main
+    Output:
+        gr: graph (TimeWindowGraph, MultiWindowGraph, CompactGraph or
+            BudgetedGraph)
+        get_row (function): function that returns a tuple of values for the
+                            given graph
+    """
+    if windows:
+        if stats:
+            raise ValueError("stats cannot be used with more than one window")
+        gr = MultiWindowGraph(windows, expiry=expiry)
+        get_row = lambda gr: gr.average_degrees()
+    elif stats:
+        gr = TimeWindowGraph(window_size=window_size, expiry=expiry,
+                             degree_stats=True)
+        get_row = lambda gr: (gr.average_degree(),) + \
+            gr.degree_histogram.stats(stats)
+    elif compact:
+        gr = CompactGraph(window_size=window_size)
+        get_row = lambda gr: (gr.average_degree(),)
+    elif expiry_budget is not None:
+        gr = BudgetedGraph(window_size=window_size, expiry=expiry,
+                           budget=expiry_budget)
+        get_row = lambda gr: (gr.average_degree(),)
+    else:
+        gr = TimeWindowGraph(window_size=window_size, expiry=expiry)
+        get_row = lambda gr: (gr.average_degree(),)
+    return gr, get_row
+
+def scan_time_steps(task):
+    """
+    To find lines where the maximum timestamp so far increases in a range of
+    the input file (used by run_parts, in worker processes). Only timestamps
+    are extracted (json.loads is used if a line is ambiguous).
+    Input:
+        task (tuple): (input_filename, start_offset, end_offset, selective)
+    Output:
+        (list): (offset of the start of the line, maximum timestamp up to the
+                line in the range) for every increase
+    """
+    input_filename, start_offset, end_offset, selective = task
+    steps = []
+    maximum = 0
+    with MappedFile(input_filename) as f_in:
+        line_end = start_offset
+        for offset, line in f_in.lines_with_offsets(start_offset, end_offset):
+            line_start, line_end = line_end, offset
+            timestamp = scan_timestamp(line)
+            if timestamp is None:
+                record = parse_line(line, selective)
+                if record is None:
+                    continue    # Control data
+                timestamp = record[0]
+            if timestamp > maximum:
+                maximum = timestamp
+                steps.append((line_start, timestamp))
+    return steps
+
+def warm_up_ranges(part_offsets, steps, window_size):
+    """
+    To find where each part has to start replaying tweets (warm-up), and the
+    current time of the graph before that line, so that the graph is the same
+    as a serial run at the start of the part.
+    Tweets whose timestamps are out of the window at the start of the part
+    cannot change the graph any more, and before the first line that raises
+    the maximum timestamp into that window, all timestamps are out of it.
+    Input:
+        part_offsets (list): (start, end) offsets of parts (in order)
+        steps (list): results of scan_time_steps for all parts (in order)
+        window_size (int): size of the (largest) window
+    Output:
+        (list): (offset where the warm-up starts, current time before it) for
+                every part
+    """
+    offsets = []    # Lines where the maximum timestamp increases (file-wide).
+    times = []      # Maximum timestamps up to these lines.
+    for part_steps in steps:
+        for offset, timestamp in part_steps:
+            if not times or timestamp > times[-1]:
+                offsets.append(offset)
+                times.append(timestamp)
+    ranges = []
+    for start, end in part_offsets:
+        index = bisect.bisect_left(offsets, start)  # Increases before start.
+        current_time = times[index - 1] if index > 0 else 0
+        first = bisect.bisect_right(times, current_time - window_size, 0,
+                                    index)
+        if first == index:
+            ranges.append((start, current_time))
+        else:
+            ranges.append((offsets[first], times[first - 1] if first > 0
+                           else 0))
+    return ranges
+
+def process_part(task):
+    """
+    To write average degrees for a part of the input file into its own output
+    file (used by run_parts, in worker processes). Tweets from the warm-up
+    offset to the start of the part are added first, without output.
+    Input:
+        task (tuple): (input_filename, part_filename, warm_up_offset,
+                      start_offset, end_offset, current_time, options), where
+                      options (dict) are keyword arguments of make_graph, and
+                      'selective', 'output_format', 'buffer_size' and
+                      'normalize_cache'
+    Output:
+        (tuple): (hits, misses, evictions) of the hashtag cache, or None if
+                 hashtags are not normalized
+    """
+    (input_filename, part_filename, warm_up_offset, start_offset, end_offset,
+     current_time, options) = task
+    options = dict(options)
+    selective = options.pop('selective')
+    output_format = options.pop('output_format')
+    buffer_size = options.pop('buffer_size')
+    normalize_cache = options.pop('normalize_cache')
+    gr, get_row = make_graph(**options)
+    gr.set_current_time(current_time)
+    normalizer = None
+    if normalize_cache is not None:
+        normalizer = HashtagNormalizer(normalize_cache)
+    with MappedFile(input_filename) as f_in:
+        records = read_records(f_in.lines(warm_up_offset, start_offset),
+                               selective=selective)
+        if normalizer is not None:
+            records = normalize_records(records, normalizer)
+        for timestamp, hashtags in records:
+            gr.add_tweet(timestamp, hashtags)
+        with open(part_filename,
+                  'wb' if is_binary(output_format) else 'w') as f_out:
+            sink = make_sink(f_out, output_format, buffer_size)
+            records = read_records(f_in.lines(start_offset, end_offset),
+                                   selective=selective)
+            if normalizer is not None:
+                records = normalize_records(records, normalizer)
+            for timestamp, hashtags in records:
+                if gr.add_tweet(timestamp, hashtags):
+                    sink.write(get_row(gr))
+            sink.close()
+    if normalizer is None:
+        return None
+    return (normalizer.num_hits, normalizer.num_misses,
+            normalizer.num_evictions)
+
+def run_parts(input_filename, output_filename, num_parts, start_offset=0,
+              end_offset=None, selective=False, output_format='text',
+              buffer_size=8192, normalize_cache=None, **options):
+    """
+    To split the input file into parts (contiguous ranges of lines), process
+    them in parallel (one worker process for each part), and concatenate
+    their outputs. The output is the same as a serial run.
+    (1) Timestamps of all parts are scanned in parallel, to find the maximum
+        timestamp before every part.
+    (2) Each part replays tweets of the window before it (warm-up), and writes
+        its output into a temporary file (output_filename + '.partN').
+    Input:
+        input_filename (str): name of the input file (tweets)
+        output_filename (str): name of the output file (average degrees)
+        num_parts (int): number of parts (worker processes)
+        start_offset, end_offset, selective, output_format, buffer_size: same
+                                                                       as main
+        normalize_cache (int): if not None, hashtags are normalized with a
+                               HashtagNormalizer of this cache size in each
+                               part (default: None)
+        options: keyword arguments of make_graph
+    Output:
+        (HashtagNormalizer): counts of hashtag caches of all parts summed up
+                             (no cached hashtags), or None if hashtags are not
+                             normalized
+    """
+    with MappedFile(input_filename) as f_in:
+        part_offsets = f_in.shard_offsets(num_parts, start_offset, end_offset)
+    window_size = options.get('window_size', 60)
+    if options.get('windows'):
+        window_size = max(options['windows'])
+    options.update(selective=selective, output_format=output_format,
+                   buffer_size=buffer_size, normalize_cache=normalize_cache)
+    part_filenames = ['%s.part%d' % (output_filename, index)
+                      for index in range(len(part_offsets))]
+    pool = multiprocessing.Pool(max(len(part_offsets), 1))
+    try:
+        steps = pool.map(scan_time_steps,
+                         [(input_filename, start, end, selective)
+                          for start, end in part_offsets])
+        ranges = warm_up_ranges(part_offsets, steps, window_size)
+        counts = pool.map(process_part,
+                          [(input_filename, part_filename, warm_up_offset,
+                            start, end, current_time, options)
+                           for part_filename, (start, end), (warm_up_offset,
+                                                             current_time)
+                           in zip(part_filenames, part_offsets, ranges)])
+        pool.close()
+        with open(output_filename,
+                  'wb' if is_binary(output_format) else 'w') as f_out:
+            for part_filename in part_filenames:
+                with open(part_filename, 'rb') as f_part:
+                    shutil.copyfileobj(f_part, f_out)
+    finally:
+        pool.terminate()
+        pool.join()
+        for part_filename in part_filenames:
+            if os.path.exists(part_filename):
+                os.remove(part_filename)
+    if normalize_cache is None:
+        return None
+    normalizer = HashtagNormalizer(normalize_cache)
+    for num_hits, num_misses, num_evictions in counts:
+        normalizer.num_hits += num_hits
+        normalizer.num_misses += num_misses
+        normalizer.num_evictions += num_evictions
+    return normalizer
+
+def main(input_filename, output_filename, expiry='heap', workers=1,
+         chunk_size=1000, selective=False, use_mmap=False, start_offset=0,
+         end_offset=None, output_format='text', buffer_size=8192, stats=(),
+         windows=None, reorder_lateness=None, checkpoint=None,
+         checkpoint_every=100000, resume=False, shards=1, instrument=False,
+         instrument_every=0, offline=False, compact=False,
+         expiry_budget=None, parts=1, normalize=False,
+         normalize_cache=10000):
     """
     Main function to run the program
+    Input:
+        input_filename (str): name of the input file (tweets)
+        output_filename (str): name of the output file (average degrees)
+        expiry (str): data structure to expire old links ('heap', 'wheel' or
+                      'log')
+        workers (int): number of worker processes to parse tweets
+                       (1: parse tweets in this process)
+        chunk_size (int): number of lines sent to a worker at a time
+        selective (bool): if True, extract only the needed fields from lines
+                          (json.loads is used if a line is ambiguous)
+        use_mmap (bool): if True, read the input file through a memory map
+        start_offset (int): byte offset of the input file to start from (the
+                            start of a line) (default: 0)
+        end_offset (int): byte offset of the input file to stop at
+                          (default: None, the end of the file)
+        output_format (str): format of the output file (one of sinks.FORMATS)
+                             (default: 'text')
+        buffer_size (int): number of rows kept before writing them to the
+                           output file
+        stats (list of str): statistics of degrees written after the average
+                             degree (names in degreehist.STATS)
+        windows (list of int): sizes of windows, if average degrees for more
+                               than one window are written (one column for
+                               each window) (default: None)
+        reorder_lateness (int): if not None, tweets are reordered in time
+                                order by a reorder buffer with this lateness
+                                bound (seconds) before they are added to the
+                                graph (default: None)
+        checkpoint (str): name of the checkpoint file, if the state of the
+                          graph and offsets of input/output files are saved
+                          while running (default: None)
+        checkpoint_every (int): number of tweets between checkpoints
+        resume (bool): if True, resume the run from the checkpoint file (the
+                       output file is truncated to the saved size and
+                       appended)
+        shards (int): number of shards (worker processes) keeping links of
+                      the graph (1: the graph is kept in this process)
+        instrument (bool): if True, count events (heap moves, nodes created
+                           and removed, links expired) and time stages of the
+                           hot path, and write the report to the standard
+                           error at the end
+        instrument_every (int): number of tweets between reports (0: the
+                                report at the end only)
+        offline (bool): if True, read all tweets first, and compute average
+                        degrees for all of them at once with NumPy
+                        (offline.average_degree_series)
+        compact (bool): if True, keep links in CompactGraph (arrays instead of
+                        sets and dictionaries, for long windows)
+        expiry_budget (int): if not None, keep links in BudgetedGraph, which
+                             removes at most this number of old links per
+                             tweet (the rest is carried over, so a jump of
+                             the current time does not stall one tweet)
+                             (default: None)
+        parts (int): number of parts of the input file processed in parallel
+                     (run_parts) (1: the file is processed in this process)
+        normalize (bool): if True, hashtags are normalized (NFKC and lower
+                          case) and deduplicated before they are added to the
+                          graph, and counts of the hashtag cache are written
+                          to the standard error at the end
+        normalize_cache (int): maximum number of hashtags in the LRU cache of
+                               canonical tags (default: 10000)
     """
+    if offline and (stats or windows or checkpoint is not None or
+                    shards > 1 or instrument):
+        # Only average degrees of one window are computed offline.
+        raise ValueError("offline cannot be used with stats, windows, "
+                         "checkpoints, shards or instrumentation")
+    if instrument and (windows or shards > 1 or resume):
+        # Only TimeWindowGraph made here is instrumented.
+        raise ValueError("instrumentation cannot be used with windows, shards "
+                         "or resume")
+    if compact and (expiry != 'heap' or stats or windows or
+                    checkpoint is not None or shards > 1 or instrument or
+                    offline):
+        # CompactGraph has its own heap of links, and no histogram of degrees
+        # or state to save.
+        raise ValueError("compact cannot be used with the wheel, stats, "
+                         "windows, checkpoints, shards, instrumentation or "
+                         "offline")
+    if expiry_budget is not None and (stats or windows or
+                                      checkpoint is not None or shards > 1 or
+                                      instrument or offline or compact):
+        # BudgetedGraph keeps no histogram of degrees, and it is not restored
+        # from checkpoints.
+        raise ValueError("expiry budget cannot be used with stats, windows, "
+                         "checkpoints, shards, instrumentation, offline or "
+                         "compact")
+    if parts > 1 and (workers > 1 or reorder_lateness is not None or
+                      output_format == 'rle' or checkpoint is not None or
+                      shards > 1 or instrument or offline):
+        # Parts are processed by worker processes of their own, and outputs
+        # are concatenated (a run of 'rle' cannot span two parts).
+        raise ValueError("parts cannot be used with workers, reordering, the "
+                         "rle format, checkpoints, shards, instrumentation "
+                         "or offline")
+    if shards > 1 and (stats or windows or checkpoint is not None):
+        # Shards keep links only (no histogram of degrees, no smaller windows,
+        # and no state to save).
+        raise ValueError("shards cannot be used with stats, windows or "
+                         "checkpoints")
+    if checkpoint is not None:
+        # Offsets are known only when lines are read in this process, and
+        # other states (reorder buffer, smaller windows, the current run of
+        # 'rle') are not saved.
+        if workers > 1 or reorder_lateness is not None or windows or \
+                output_format == 'rle':
+            raise ValueError("checkpoints cannot be used with workers, "
+                             "reordering, windows or the rle format")
+    elif resume:
+        raise ValueError("resume needs a checkpoint file")
+
     # Size of the window
     window_size = 60   
-    # Creating the graph for hashtag object
-    gr = TimeWindowGraph(window_size=window_size)
-    time_threshold = gr.current_time - window_size
-
-    with open(input_filename, 'r') as f_in: # Opening input file to get tweets
-        with open(output_filename, 'w') as f_out: # Opening output file
-            for line in f_in: # For every tweet
-                json_data = json.loads(line) # dict representing tweet
-
-                # Checking for control data (if there is less than 3 fields).
-                # In those cases, we will skip the data.
-                if len(json_data) < 3:
-                    continue
-
-                # Extract timestamp (int) and a list of hashtags (str, case
-                # sensitive)
-                (timestamp, hashtags) = extract_data(json_data)
-
-                # Check the timestamp first.
-                if timestamp <= time_threshold: # too old for our graph.
-                    continue # do nothing for this tweet.
-                elif timestamp > gr.current_time: # becomes the most recent tweet.
-                    # Set current_time for the graph
-                    # (it will remove old links older than threshold also)
-                    gr.set_current_time(timestamp)
-
-                # New links (for all possible pairs of hashtags) are added here.
-                num_hashtags = len(hashtags)
-                for i in range(num_hashtags):
-                    for j in range(i+1, num_hashtags):
-
-                        # First, check for duplicate hashtags
-                        if hashtags[i] == hashtags[j]:
-                            continue
-
-                        # Second, try to add both nodes (this method will do nothing
-                        # if the given node already exists)
-                        gr.add_node(hashtags[i])
-                        gr.add_node(hashtags[j])
-
-                        # Third, (1) try to find if the link already exists;
-                        # and (2) if so, what the timestamp of that link is.
-                        # Here timestamp (epoch time) is a non-negative
-                        # integer, so -1 indicates there is no link.
-                        timestamp_link = gr.check_link(hashtags[i], hashtags[j])
-                        if timestamp_link < 0: # No link exists.
-                            gr.add_link(hashtags[i], hashtags[j], timestamp)
-                        elif timestamp_link < timestamp: # old link exists.
-                            gr.update_link(hashtags[i], hashtags[j], timestamp)
-
-                # Now writes the degree information to the output file
-                f_out.write("%.2f\n"% gr.average_degree())
+    if parts > 1:
+        normalizer = run_parts(input_filename, output_filename, parts,
+                               start_offset, end_offset, selective,
+                               output_format, buffer_size,
+                               normalize_cache if normalize else None,
+                               window_size=window_size, expiry=expiry,
+                               stats=stats, windows=windows, compact=compact,
+                               expiry_budget=expiry_budget)
+        if normalizer is not None:
+            normalizer.report(sys.stderr)
+        return
+    # Creating the graph for hashtag object, and the function that returns
+    # values written for each tweet.
+    gr, get_row = make_graph(window_size, expiry, stats, windows, compact,
+                             expiry_budget)
+    if instrument:
+        # The graph is replaced by the instrumented one (get_row uses it).
+        instrumentation = Stats()
+        gr = InstrumentedGraph(instrumentation, window_size=window_size,
+                               expiry=expiry, degree_stats=bool(stats))
+        get_row = timed_function(get_row, instrumentation, 'row')
+
+    # Restoring the graph (get_row uses the restored one), and where to
+    # resume reading the input file and writing the output file.
+    output_offset = 0
+    if resume:
+        gr, start_offset, output_offset = load_checkpoint(
+            checkpoint, expiry=expiry, degree_stats=bool(stats))
+
+    # Opening input file to get tweets (a range of bytes can be read only
+    # through a memory map).
+    if use_mmap or start_offset > 0 or end_offset is not None or \
+            checkpoint is not None:
+        f_in = MappedFile(input_filename)
+        lines = f_in.lines(start_offset, end_offset)
+    else:
+        f_in = open(input_filename, 'r')
+        lines = f_in
+
+    with f_in:
+        # Opening output file (the rest of the output is appended when
+        # resuming).
+        if resume:
+            f_out = open(output_filename, 'r+b')
+            f_out.truncate(output_offset)
+            f_out.seek(output_offset)
+        else:
+            f_out = open(output_filename,
+                         'wb' if is_binary(output_format) else 'w')
+        with f_out:
+            sink = make_sink(f_out, output_format, buffer_size)
+            if checkpoint is not None:
+                records = read_records_with_offsets(f_in, start_offset,
+                                                    end_offset, selective)
+            elif instrument and workers <= 1:
+                records = read_records_timed(lines, instrumentation, selective)
+            else:
+                records = read_records(lines, workers, chunk_size, selective)
+            if normalize:
+                # Canonical tags (deduplicated) replace raw hashtags.
+                normalizer = HashtagNormalizer(normalize_cache)
+                records = normalize_records(records, normalizer,
+                                            checkpoint is not None)
+            if instrument:
+                # Reading and parsing tweets (or waiting for worker processes).
+                records = timed_iter(records, instrumentation, 'parse',
+                                     instrument_every)
+                sink = TimedSink(sink, instrumentation)
+            if reorder_lateness is not None:
+                reorder_buffer = ReorderBuffer(lateness=reorder_lateness)
+                records = reorder_records(records, reorder_buffer)
+            if shards > 1:
+                # Links are kept by worker processes (one for each shard), and
+                # the average degree after each tweet in the window is merged
+                # here from batches of tweets.
+                with ShardedGraph(window_size, shards, expiry) as gr:
+                    for average_degree in gr.average_degrees(records,
+                                                             chunk_size):
+                        sink.write((average_degree,))
+            elif offline:
+                for average_degree in average_degree_series(
+                        records, window_size).tolist():
+                    sink.write((average_degree,))
+            else:
+                if checkpoint is not None:
+                    next_checkpoint = checkpoint_every
+                else:
+                    records = itertools.izip(itertools.repeat(None), records)
+                    next_checkpoint = 0     # No checkpoint.
+                num_tweets = 0
+                # For every tweet (offset of the input file for checkpoints,
+                # timestamp (int) and a list of hashtags)
+                for offset, (timestamp, hashtags) in records:
+
+                    # New links (for all possible pairs of hashtags) are added
+                    # here, and the current time of the graph is updated if
+                    # this tweet becomes the most recent one (it will remove
+                    # links older than the window also). If the tweet is too
+                    # old for our graph, nothing is written for this tweet.
+                    if gr.add_tweet(timestamp, hashtags):
+                        # Now writes the degree information to the output file
+                        sink.write(get_row(gr))
+
+                    num_tweets += 1
+                    if num_tweets == next_checkpoint:
+                        # Everything before the offset has to be in the output
+                        # file when the checkpoint is saved.
+                        sink.flush()
+                        f_out.flush()
+                        save_checkpoint(gr, checkpoint, offset, f_out.tell())
+                        next_checkpoint += checkpoint_every
+            sink.close()
+            if checkpoint is not None:
+                f_out.flush()
+                end = f_in.size() if end_offset is None else end_offset
+                save_checkpoint(gr, checkpoint, max(f_in.line_start(end),
+                                                    start_offset),
+                                f_out.tell())
+
+    if instrument:
+        instrumentation.report(sys.stderr)
+    if normalize:
+        normalizer.report(sys.stderr)
+    if reorder_lateness is not None:
+        print >> sys.stderr, "Reorder buffer:", reorder_buffer.num_reordered, \
+            "tweets reordered,", reorder_buffer.num_dropped, "tweets dropped."
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print "Usage: python src/average_degree.py", \
-            "./tweet_input/tweets.txt ./tweet_output/output.txt"
-        sys.exit()
-    main(sys.argv[1], sys.argv[2])
+    parser = argparse.ArgumentParser(
+        usage="python src/average_degree.py [options] "
+              "./tweet_input/tweets.txt ./tweet_output/output.txt")
+    parser.add_argument('input_filename')
+    parser.add_argument('output_filename')
+    parser.add_argument('--expiry', choices=EXPIRY_STRUCTURES, default='heap',
+                        help="data structure to expire old links "
+                             "(default: heap)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of worker processes to parse tweets "
+                             "(default: 1, no worker process)")
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                        help="number of lines sent to a worker at a time "
+                             "(default: 1000)")
+    parser.add_argument('--selective', action='store_true',
+                        help="extract only the needed fields without decoding "
+                             "the whole json")
+    parser.add_argument('--mmap', action='store_true',
+                        help="read the input file through a memory map")
+    parser.add_argument('--start-offset', type=int, default=0,
+                        help="byte offset of the input file to start from "
+                             "(default: 0)")
+    parser.add_argument('--end-offset', type=int, default=None,
+                        help="byte offset of the input file to stop at "
+                             "(default: the end of the file)")
+    parser.add_argument('--output-format', choices=FORMATS, default='text',
+                        help="format of the output file (default: text)")
+    parser.add_argument('--buffer-size', type=int, default=8192,
+                        help="number of rows kept before writing them to the "
+                             "output file (default: 8192)")
+    parser.add_argument('--stats', default='',
+                        help="comma-separated statistics of degrees written "
+                             "after the average degree (%s)" % ",".join(STATS))
+    parser.add_argument('--windows', default='',
+                        help="comma-separated sizes of windows (e.g., "
+                             "10,60,300,3600), one column for each window")
+    parser.add_argument('--reorder-lateness', type=int, default=None,
+                        help="reorder tweets in time order before adding "
+                             "them to the graph, with this lateness bound "
+                             "(seconds); later tweets are dropped")
+    parser.add_argument('--checkpoint', default=None,
+                        help="file to save the state of the graph and "
+                             "offsets of input/output files while running")
+    parser.add_argument('--checkpoint-every', type=int, default=100000,
+                        help="number of tweets between checkpoints "
+                             "(default: 100000)")
+    parser.add_argument('--resume', action='store_true',
+                        help="resume the run from the checkpoint file")
+    parser.add_argument('--instrument', action='store_true',
+                        help="count events and time stages of the hot path, "
+                             "and write the report to the standard error")
+    parser.add_argument('--instrument-every', type=int, default=0,
+                        help="number of tweets between reports (default: 0, "
+                             "the report at the end only)")
+    parser.add_argument('--offline', action='store_true',
+                        help="read all tweets first, and compute average "
+                             "degrees at once with NumPy")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="number of worker processes keeping links of the "
+                             "graph, partitioned by pairs of hashtags "
+                             "(default: 1, no worker process)")
+    parser.add_argument('--compact', action='store_true',
+                        help="keep links in arrays (CompactGraph) to save "
+                             "memory for long windows")
+    parser.add_argument('--expiry-budget', type=int, default=None,
+                        help="remove at most this number of old links per "
+                             "tweet, and carry the rest over (default: all "
+                             "at once)")
+    parser.add_argument('--parts', type=int, default=1,
+                        help="split the input file into this number of "
+                             "parts processed in parallel (default: 1)")
+    parser.add_argument('--normalize', action='store_true',
+                        help="normalize hashtags (NFKC and lower case) and "
+                             "deduplicate them before adding links, and write "
+                             "hit rates of the cache to the standard error")
+    parser.add_argument('--normalize-cache', type=int, default=10000,
+                        help="maximum number of hashtags in the cache of "
+                             "canonical tags (default: 10000)")
+    args = parser.parse_args()
+    stats = [name for name in args.stats.split(',') if name]
+    for name in stats:
+        if name not in STATS:
+            parser.error("unknown statistics: %s" % name)
+    try:
+        windows = [int(size) for size in args.windows.split(',') if size]
+    except ValueError:
+        parser.error("window sizes have to be integers: %s" % args.windows)
+    if stats and windows:
+        parser.error("--stats cannot be used with --windows")
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume needs --checkpoint")
+    main(args.input_filename, args.output_filename, expiry=args.expiry,
+         workers=args.workers, chunk_size=args.chunk_size,
+         selective=args.selective, use_mmap=args.mmap,
+         start_offset=args.start_offset, end_offset=args.end_offset,
+         output_format=args.output_format, buffer_size=args.buffer_size,
+         stats=stats, windows=windows,
+         reorder_lateness=args.reorder_lateness, checkpoint=args.checkpoint,
+         checkpoint_every=args.checkpoint_every, resume=args.resume,
+         shards=args.shards, instrument=args.instrument,
+         instrument_every=args.instrument_every, offline=args.offline,
+         compact=args.compact, expiry_budget=args.expiry_budget,
+         parts=args.parts, normalize=args.normalize,
+         normalize_cache=args.normalize_cache)
@@ -0,0 +1,382 @@
+# Class that represents the hashtag graph with amortized expiry. When the
+# current time jumps forward (e.g., after a gap in the feed), all links out of
+# the window are expired at once, and the tweet that advanced the time stalls
+# until the whole backlog is removed. Here, at most 'budget' links are removed
+# per tweet (or per advance of the current time), and the rest is carried over
+# to later tweets.
+# Links waiting to be removed (pending links) are still in the graph, so the
+# average degree is corrected for them: the number of links with each time
+# value and the number of nodes with each latest time value (the newest time
+# of their links) are counted, and links (nodes) whose times are out of the
+# window are not counted. The average degree is the same as that of
+# TimeWindowGraph for every tweet.
+
+from array import array
+
+from graph import TimeWindowGraph, _pack
+
+_NO_TIME = -1   # Latest time of a node with no link.
+
+class BudgetedGraph(TimeWindowGraph):
+    """
+    TimeWindowGraph that removes at most 'budget' old links per call of
+    add_tweet (or set_current_time).
+    (1) average_degree is exact (pending links and nodes with pending links
+        only are not counted), while num_links and num_nodes include them.
+    (2) Other methods (check_link, add_link, top_degrees, get_state, etc.)
+        remove all pending links first (expire_all), so they see the same
+        graph as TimeWindowGraph.
+    (3) A link added with a time value already out of the window is counted
+        as pending at once.
+    """
+    def __init__(self, window_size=60, expiry='heap', budget=100):
+        """
+        Constructor
+        Input:
+            window_size, expiry: same as TimeWindowGraph
+            budget (int): maximum number of links removed per call
+                          (default: 100)
+        """
+        TimeWindowGraph.__init__(self, window_size, expiry)
+        self.budget = budget
+        self._link_counts = _TimeCounts(-window_size)
+                                    # Number of links per time value.
+        self._node_counts = _TimeCounts(-window_size)
+                                    # Number of nodes per latest time value.
+        self._node_times = array('l')   # Latest time of each node id
+                                        # (_NO_TIME if it has no link).
+        self._linkheap = _CountedExpiry(self._linkheap, self._link_counts)
+
+    def pending_links(self):
+        """
+        Return the number of links out of the window that are not removed yet.
+        """
+        return self._link_counts.num_pending
+
+    def expire_all(self):
+        """
+        Remove all pending links (and nodes with no link as a result).
+        """
+        if self._link_counts.num_pending > 0:
+            self._remove_old_links()
+
+    def add_tweet(self, timestamp, hashtags):
+        """
+        Same as TimeWindowGraph.add_tweet, but at most 'budget' old links are
+        removed (if the current time does not advance, pending links are
+        removed instead).
+        """
+        if timestamp <= self.current_time and \
+                self._link_counts.num_pending > 0:
+            self._remove_old_links(self.budget)
+        if not TimeWindowGraph.add_tweet(self, timestamp, hashtags):
+            return False
+        hashtags = set(hashtags)
+        if len(hashtags) >= 2:
+            node_ids = self._node_ids
+            node_times = self._node_times
+            for hashtag in hashtags:
+                node_id = node_ids[hashtag]
+                if node_times[node_id] < timestamp:
+                    self._set_node_time(node_id, timestamp)
+        return True
+
+    def set_current_time(self, time):
+        """
+        Set the current time if time is non negative, and remove at most
+        'budget' old links.
+        """
+        if time >= 0:
+            self.current_time = int(time)
+            threshold = self.current_time - self.window_size
+            self._link_counts.advance(threshold)
+            self._node_counts.advance(threshold)
+            if self._link_counts.num_pending > 0:
+                self._remove_old_links(self.budget)
+
+    def average_degree(self):
+        num_nodes = self.num_nodes - self._node_counts.num_pending
+        if num_nodes == 0:
+            return 0
+        else:
+            num_links = self.num_links - self._link_counts.num_pending
+            return 2 * num_links/float(num_nodes)
+
+    def check_node(self, node):
+        self.expire_all()
+        return TimeWindowGraph.check_node(self, node)
+
+    def add_node(self, node):
+        self.expire_all()
+        return TimeWindowGraph.add_node(self, node)
+
+    def remove_node(self, node):
+        self.expire_all()
+        node_id = self._node_ids.get(node)
+        if node_id is None:
+            return False
+        neighbor_ids = list(self._graph_structure[node_id])
+        TimeWindowGraph.remove_node(self, node)
+        for node_id2 in neighbor_ids:
+            self._refresh_node_time(node_id2)
+        return True
+
+    def node_id(self, node):
+        self.expire_all()
+        return TimeWindowGraph.node_id(self, node)
+
+    def check_link(self, node1, node2):
+        self.expire_all()
+        return TimeWindowGraph.check_link(self, node1, node2)
+
+    def add_link(self, node1, node2, time=0):
+        self.expire_all()
+        if not TimeWindowGraph.add_link(self, node1, node2, time):
+            return False
+        for node in (node1, node2):
+            node_id = self._node_ids.get(node)
+            if node_id is not None and self._node_times[node_id] < time:
+                self._set_node_time(node_id, time)
+        return True
+
+    def update_link(self, node1, node2, time=0):
+        self.expire_all()
+        if not TimeWindowGraph.update_link(self, node1, node2, time):
+            return False
+        # The time value can be lowered, so latest times are found again.
+        for node in (node1, node2):
+            node_id = self._node_ids.get(node)
+            if node_id is not None:
+                self._refresh_node_time(node_id)
+        return True
+
+    def remove_link(self, node1, node2):
+        self.expire_all()
+        if not TimeWindowGraph.remove_link(self, node1, node2):
+            return False
+        self._refresh_node_time(self._node_ids[node1])
+        self._refresh_node_time(self._node_ids[node2])
+        return True
+
+    def remove_min_link(self):
+        self.expire_all()
+        node_pair, time = TimeWindowGraph.remove_min_link(self)
+        if node_pair is not None:
+            self._refresh_node_time(self._node_ids[node_pair[0]])
+            self._refresh_node_time(self._node_ids[node_pair[1]])
+        return node_pair, time
+
+    def get_state(self):
+        self.expire_all()
+        return TimeWindowGraph.get_state(self)
+
+    def set_state(self, current_time, names, node1s, node2s, times):
+        if not TimeWindowGraph.set_state(self, current_time, names, node1s,
+                                         node2s, times):
+            return False
+        threshold = current_time - self.window_size
+        self._link_counts.advance(threshold)
+        self._node_counts.advance(threshold)
+        self._node_times = array('l', [_NO_TIME]) * len(self._node_names)
+        for node_id in xrange(len(self._node_names)):
+            self._refresh_node_time(node_id)
+        return True
+
+    def write(self):
+        self.expire_all()
+        TimeWindowGraph.write(self)
+
+    def top_degrees(self, k):
+        self.expire_all()
+        return TimeWindowGraph.top_degrees(self, k)
+
+    def neighbors(self, node):
+        self.expire_all()
+        return TimeWindowGraph.neighbors(self, node)
+
+    def component_size(self, node):
+        self.expire_all()
+        return TimeWindowGraph.component_size(self, node)
+
+    # ==== private methods from here on =====================
+    def _intern(self, node):
+        node_id = TimeWindowGraph._intern(self, node)
+        if node_id == len(self._node_times):
+            self._node_times.append(_NO_TIME)
+        else:
+            self._node_times[node_id] = _NO_TIME
+        return node_id
+
+    def _release(self, node_id):
+        self._set_node_time(node_id, _NO_TIME)
+        TimeWindowGraph._release(self, node_id)
+
+    def _set_node_time(self, node_id, time):
+        """
+        Set the latest time of a node (and move it between counts).
+        Input:
+            node_id (int): id of the node
+            time (int): latest time of its links (_NO_TIME if it has no link)
+        """
+        old_time = self._node_times[node_id]
+        if old_time != _NO_TIME:
+            self._node_counts.remove(old_time)
+        if time != _NO_TIME:
+            self._node_counts.add(time)
+        self._node_times[node_id] = time
+
+    def _refresh_node_time(self, node_id):
+        """
+        Find the latest time of a node from its links (O(degree) time).
+        Input:
+            node_id (int): id of the node
+        """
+        links_info = self._graph_structure[node_id]
+        if links_info:
+            time = max([self._linkheap.value(_pack(node_id, node_id2))
+                        for node_id2 in links_info])
+        else:
+            time = _NO_TIME
+        self._set_node_time(node_id, time)
+
+
+class _TimeCounts:
+    """
+    Counts of items (links or nodes) per time value, and the number of items
+    whose times are less than or equal to the threshold (pending items).
+    """
+    def __init__(self, threshold):
+        """
+        Constructor
+        Input:
+            threshold (int): maximum time out of the window
+        """
+        self.threshold = threshold
+        self.num_pending = 0
+        self._counts = {}   # dict (key: time, value: number of items)
+
+    def add(self, time):
+        self._counts[time] = self._counts.get(time, 0) + 1
+        if time <= self.threshold:
+            self.num_pending += 1
+
+    def remove(self, time):
+        count = self._counts[time] - 1
+        if count:
+            self._counts[time] = count
+        else:
+            del self._counts[time]
+        if time <= self.threshold:
+            self.num_pending -= 1
+
+    def advance(self, threshold):
+        """
+        Raise the threshold (items with times in (old threshold, threshold]
+        become pending). O(min(advance, number of distinct times)) time.
+        Input:
+            threshold (int): new threshold (ignored if not greater)
+        """
+        old_threshold = self.threshold
+        if threshold <= old_threshold:
+            return
+        counts = self._counts
+        if threshold - old_threshold <= len(counts):
+            for time in xrange(old_threshold + 1, threshold + 1):
+                self.num_pending += counts.get(time, 0)
+        else:
+            for time, count in counts.iteritems():
+                if old_threshold < time <= threshold:
+                    self.num_pending += count
+        self.threshold = threshold
+
+
+class _CountedExpiry:
+    """
+    Wrapper of a data structure to expire old links (indexedMinPQ, TimeWheel
+    or ExpiryLog) that keeps counts of links per time value.
+    """
+    def __init__(self, expiry, counts):
+        """
+        Constructor
+        Input:
+            expiry: data structure to expire old links
+            counts (_TimeCounts): counts of links
+        """
+        self._expiry = expiry
+        self._counts = counts
+
+    def add(self, key, value):
+        if not self._expiry.add(key, value):
+            return False
+        self._counts.add(value)
+        return True
+
+    def remove(self, key):
+        value = self._expiry.value(key)
+        if value is None:
+            return False
+        self._expiry.remove(key)
+        self._counts.remove(value)
+        return True
+
+    def update(self, key, value):
+        old_value = self._expiry.value(key)
+        if old_value is None:
+            return False
+        self._expiry.update(key, value)
+        self._counts.remove(old_value)
+        self._counts.add(value)
+        return True
+
+    def value(self, key):
+        return self._expiry.value(key)
+
+    def peek_min(self):
+        return self._expiry.peek_min()
+
+    def pop_min(self):
+        key, value = self._expiry.pop_min()
+        if key is not None:
+            self._counts.remove(value)
+        return key, value
+
+    def pop_min_until(self, threshold, limit=None):
+        removed = self._expiry.pop_min_until(threshold, limit)
+        for key, value in removed:
+            self._counts.remove(value)
+        return removed
+
+    def items(self):
+        return self._expiry.items()
+
+    def load(self, keys, values):
+        if not self._expiry.load(keys, values):
+            return False
+        for value in values:
+            self._counts.add(value)
+        return True
+
+    def size(self):
+        return self._expiry.size()
+
+    def write(self):
+        self._expiry.write()
+
+
+def main():
+    """
+    Testing the class
+    """
+    gr = BudgetedGraph(window_size=5, budget=1)
+    gr.add_tweet(1, ['a', 'b', 'c'])
+    gr.add_tweet(2, ['c', 'd'])
+    print gr.num_links, gr.pending_links(), "%.2f" % gr.average_degree()
+    # All links are out of the window, but only one is removed.
+    gr.add_tweet(10, ['e', 'f'])
+    print gr.num_links, gr.pending_links(), "%.2f" % gr.average_degree()
+    gr.add_tweet(10, ['a', 'b'])
+    print gr.num_links, gr.pending_links(), "%.2f" % gr.average_degree()
+    gr.write()
+
+if __name__ == "__main__":
+    main()
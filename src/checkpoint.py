@@ -0,0 +1,110 @@
+# Functions to save the state of TimeWindowGraph (nodes, links with time
+# values, and the current time) to a compact binary snapshot, and to restore
+# it. A snapshot also keeps byte offsets of the input file (where to resume
+# reading tweets) and the output file (how many bytes were written), so that
+# a run can be restarted without replaying the input.
+#
+# Format (native byte order):
+#   header: magic ('TWGC'), version, size of an integer, window size, current
+#           time, input offset, output offset, number of nodes, number of
+#           links, number of bytes of node names
+#   array of lengths of node names (utf-8), node names (concatenated)
+#   three arrays of links (ids of two nodes, and time values)
+
+import os
+import struct
+from array import array
+
+from graph import TimeWindowGraph
+
+_MAGIC = 'TWGC'
+_VERSION = 1
+_HEADER = struct.Struct('=4sii7q')
+
+def save_checkpoint(gr, filename, input_offset=0, output_offset=0):
+    """
+    Save the state of the graph to a file (the file is replaced atomically).
+    Input:
+        gr (TimeWindowGraph): graph
+        filename (str): name of the checkpoint file
+        input_offset (int): byte offset of the input file to resume from
+        output_offset (int): number of bytes written to the output file
+    """
+    names, node1s, node2s, times = gr.get_state()
+    names = [name.encode('utf-8') if isinstance(name, unicode) else name
+             for name in names]
+    lengths = array('l', [len(name) for name in names])
+    data = ''.join(names)
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'wb') as f_out:
+        f_out.write(_HEADER.pack(_MAGIC, _VERSION, lengths.itemsize,
+                                 gr.window_size, gr.current_time,
+                                 input_offset, output_offset, len(names),
+                                 len(times), len(data)))
+        lengths.tofile(f_out)
+        f_out.write(data)
+        node1s.tofile(f_out)
+        node2s.tofile(f_out)
+        times.tofile(f_out)
+    os.rename(temp_filename, filename)
+
+def load_checkpoint(filename, expiry='heap', degree_stats=False):
+    """
+    Restore the state of the graph from a file. Arrays are loaded at once, and
+    the graph is built in time proportional to the number of live links.
+    Input:
+        filename (str): name of the checkpoint file
+        expiry (str): data structure to expire old links ('heap', 'wheel' or
+                      'log')
+        degree_stats (bool): if True, keep the histogram of node degrees
+    Output:
+        gr (TimeWindowGraph): graph
+        input_offset (int): byte offset of the input file to resume from
+        output_offset (int): number of bytes written to the output file
+    """
+    with open(filename, 'rb') as f_in:
+        (magic, version, itemsize, window_size, current_time, input_offset,
+         output_offset, num_nodes, num_links, num_bytes) = \
+            _HEADER.unpack(f_in.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION or \
+                itemsize != array('l').itemsize:
+            raise ValueError("not a valid checkpoint file: %s" % filename)
+        lengths = array('l')
+        lengths.fromfile(f_in, num_nodes)
+        data = f_in.read(num_bytes)
+        arrays = []
+        for _ in range(3):
+            arrays.append(array('l'))
+            arrays[-1].fromfile(f_in, num_links)
+    names = []
+    start = 0
+    for length in lengths:
+        names.append(data[start:start + length].decode('utf-8'))
+        start += length
+
+    gr = TimeWindowGraph(window_size=window_size, expiry=expiry,
+                         degree_stats=degree_stats)
+    gr.set_state(current_time, names, *arrays)
+    return gr, input_offset, output_offset
+
+
+def main():
+    """
+    Testing functions
+    """
+    import sys
+    gr = TimeWindowGraph(window_size=5)
+    gr.add_tweet(1, [u"a", u"b", u"c"])
+    gr.add_tweet(3, [u"b", u"d"])
+    gr.add_tweet(4, [u"caf\xe9", u"a"])
+    gr.write()
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'checkpoint.bin'
+    save_checkpoint(gr, filename, 100, 10)
+    gr, input_offset, output_offset = load_checkpoint(filename)
+    gr.write()
+    print input_offset, output_offset
+    gr.add_tweet(7, [u"d", u"e"])
+    gr.write()
+
+if __name__ == "__main__":
+    main()
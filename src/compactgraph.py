@@ -0,0 +1,441 @@
+# Class for the graph of links in a time window with compact storage, for long
+# windows with millions of live links (TimeWindowGraph keeps each link in two
+# sets and a dictionary, with Python objects for every link).
+# (1) Links are stored once, in arrays (struct of arrays) indexed by link ids:
+#     ids of two nodes, the time value, and the position in the heap. Ids of
+#     removed links are recycled (a free list).
+# (2) A link is found by its two nodes in a hash table of link ids (an array
+#     with open addressing and linear probing), so no key object is kept.
+# (3) The heap to expire old links is an array of link ids ordered by time.
+# (4) Nodes keep their degrees in an array (adjacency is derived from links),
+#     and a node is removed when its degree becomes 0.
+# Arrays take about 35 bytes per live link (about 50 bytes of RSS, instead of
+# about 275 bytes with TimeWindowGraph), and the average degree after every
+# tweet is the same as TimeWindowGraph.
+
+import heapq
+from array import array
+
+_EMPTY = 0  # Empty slot of the hash table (link ids are stored as id + 1).
+_MULTIPLIER1 = 0x9E3779B1   # Multipliers to hash ids of two nodes (odd, so
+_MULTIPLIER2 = 0x85EBCA77   # that products of ids < 2^31 stay below 2^63).
+
+class CompactGraph:
+    """
+    Class for the graph in a time window with compact storage.
+    (1) Time is represented by a non-negative integer (e.g., epoch time), and
+        links older than the window are removed when the current time
+        advances (same as TimeWindowGraph).
+    (2) Links are undirected, with no self-loop and no multiple links. Each
+        link is a record (node id 1 < node id 2, time, position in the heap)
+        in arrays.
+    (3) Nodes are named uniquely (hashable), and interned into dense integer
+        ids (ids of removed nodes are recycled).
+    """
+    def __init__(self, window_size=60):
+        """
+        Constructor
+        Input:
+            window_size (int): size of the window (default: 60)
+        """
+        self.window_size = window_size  # size of the window
+        self.num_links = 0  # Total number of links.
+        self.num_nodes = 0  # Total number of nodes.
+        self.current_time = 0   # Current time in int.
+        # Nodes
+        self._node_ids = {} # dict (key: node, value: id of the node)
+        self._node_names = []   # list (index: id, value: node)
+        self._degrees = array('i')  # array (index: id, value: degree)
+        self._free_ids = array('i') # ids of removed nodes (to be recycled)
+        # Links (index: id of the link)
+        self._node1s = array('i')   # id of the first node (smaller id)
+        self._node2s = array('i')   # id of the second node
+        self._times = array('l')    # time value
+        self._positions = array('i')    # index of self._heap
+        self._free_links = array('i')   # ids of removed links
+        # Heap of link ids ordered by time values (index 0 is not used).
+        self._heap = array('i', [0])
+        # Hash table of link ids + 1 (size: power of 2, at most half full).
+        self._table = array('i', [_EMPTY]) * 16
+        self._mask = 15
+
+    def check_node(self, node):
+        """
+        Check if a node exists in the graph
+        Input:
+            node: ID of a node
+        Output:
+            (bool): True if exists, False if not
+        """
+        return node in self._node_ids
+
+    def check_link(self, node1, node2):
+        """
+        Check if a link exists between node1 and node2.
+        Input:
+            node1: ID of a node
+            node2: ID of a node
+        Output:
+            time (int): -1 if none exists, time value if already exists.
+        """
+        node_id1 = self._node_ids.get(node1)
+        node_id2 = self._node_ids.get(node2)
+        if node_id1 is None or node_id2 is None or node_id1 == node_id2:
+            return -1
+        if node_id1 > node_id2:
+            node_id1, node_id2 = node_id2, node_id1
+        slot = self._find(node_id1, node_id2)
+        if self._table[slot] == _EMPTY:
+            return -1
+        return self._times[self._table[slot] - 1]
+
+    def add_tweet(self, timestamp, hashtags):
+        """
+        Add links for all pairs of (distinct) hashtags in a tweet, or update
+        the time values of links that already exist.
+        Input:
+            timestamp (int): time value of the tweet (non-negative)
+            hashtags (list): IDs of nodes (hashtags) in the tweet
+        Output:
+            (bool): True if the tweet is in the window, False if it is too old
+                    (nothing is changed in that case).
+        """
+        if timestamp <= self.current_time - self.window_size:
+            return False
+        if timestamp > self.current_time:
+            self.set_current_time(timestamp)
+        hashtags = set(hashtags)
+        if len(hashtags) < 2:
+            return True
+        node_ids = self._node_ids
+        node_id_list = []
+        for hashtag in hashtags:
+            node_id = node_ids.get(hashtag)
+            if node_id is None:
+                node_id = self._intern(hashtag)
+            node_id_list.append(node_id)
+        node_id_list.sort()
+        num_ids = len(node_id_list)
+        num_needed = self.num_links + num_ids * (num_ids - 1) / 2
+        if 2 * num_needed > self._mask:
+            self._resize(num_needed)
+        table = self._table
+        mask = self._mask
+        node1s = self._node1s
+        node2s = self._node2s
+        times = self._times
+        for i in xrange(num_ids):
+            node_id1 = node_id_list[i]
+            hash1 = node_id1 * _MULTIPLIER1
+            for j in xrange(i + 1, num_ids):
+                node_id2 = node_id_list[j]
+                # Linear probing from the home slot of the pair.
+                slot = ((hash1 ^ (node_id2 * _MULTIPLIER2)) >> 8) & mask
+                entry = table[slot]
+                while entry != _EMPTY:
+                    link = entry - 1
+                    if node1s[link] == node_id1 and node2s[link] == node_id2:
+                        break
+                    slot = (slot + 1) & mask
+                    entry = table[slot]
+                if entry == _EMPTY:
+                    table[slot] = self._new_link(node_id1, node_id2,
+                                                 timestamp) + 1
+                elif times[link] < timestamp:
+                    times[link] = timestamp
+                    self._bubble_down(self._positions[link])
+        return True
+
+    def set_current_time(self, time):
+        """
+        Set the current time if time is non negative (old links are removed).
+        """
+        if time >= 0:
+            self.current_time = int(time)
+            if self.num_links > 0:
+                self._remove_old_links()
+
+    def average_degree(self):
+        if self.num_nodes == 0:
+            return 0
+        else:
+            return 2 * self.num_links/float(self.num_nodes)
+
+    def neighbors(self, node):
+        """
+        Return neighbors of a node with time values of links. O(E) time
+        (adjacency is not stored).
+        Input:
+            node: ID of a node
+        Output:
+            (list): (ID of a neighbor, time) in descending order of time values
+                    (empty if the node does not exist)
+        """
+        node_id = self._node_ids.get(node)
+        if node_id is None:
+            return []
+        node1s = self._node1s
+        node2s = self._node2s
+        result = []
+        for index in xrange(1, self.num_links + 1):
+            link = self._heap[index]
+            if node1s[link] == node_id:
+                result.append((self._times[link], node2s[link]))
+            elif node2s[link] == node_id:
+                result.append((self._times[link], node1s[link]))
+        result.sort(reverse=True)
+        return [(self._node_names[node_id2], time)
+                for time, node_id2 in result]
+
+    def top_degrees(self, k):
+        """
+        Return the top k nodes by degree, ties in any order. O(N log k) time.
+        Input:
+            k (int): number of nodes
+        Output:
+            (list): (ID of a node, degree) in descending order of degrees
+        """
+        names = self._node_names
+        degrees = [(degree, node_id)
+                   for node_id, degree in enumerate(self._degrees)
+                   if names[node_id] is not None]
+        return [(names[node_id], degree)
+                for degree, node_id in heapq.nlargest(k, degrees)]
+
+    # ==== private methods from here on =====================
+    def _intern(self, node):
+        """
+        Add a node and give it an id (an id of a removed node is recycled).
+        Input:
+            node: ID of a node
+        Output:
+            node_id (int): id of the node
+        """
+        if self._free_ids:
+            node_id = self._free_ids.pop()
+            self._node_names[node_id] = node
+        else:
+            node_id = len(self._node_names)
+            self._node_names.append(node)
+            self._degrees.append(0)
+        self._node_ids[node] = node_id
+        self.num_nodes += 1
+        return node_id
+
+    def _release(self, node_id):
+        """
+        Remove a node (with no link) by its id, and recycle the id.
+        """
+        del self._node_ids[self._node_names[node_id]]
+        self._node_names[node_id] = None
+        self._free_ids.append(node_id)
+        self.num_nodes -= 1
+
+    def _new_link(self, node_id1, node_id2, time):
+        """
+        Store a new link (the slot of the hash table is set by the caller),
+        and put it into the heap.
+        Output:
+            link (int): id of the link
+        """
+        if self._free_links:
+            link = self._free_links.pop()
+            self._node1s[link] = node_id1
+            self._node2s[link] = node_id2
+            self._times[link] = time
+        else:
+            link = len(self._node1s)
+            self._node1s.append(node_id1)
+            self._node2s.append(node_id2)
+            self._times.append(time)
+            self._positions.append(0)
+        self._degrees[node_id1] += 1
+        self._degrees[node_id2] += 1
+        self.num_links += 1
+        self._heap.append(link)
+        self._bubble_up(self.num_links)
+        return link
+
+    def _remove_old_links(self):
+        """
+        Remove links out of the window (and nodes with no link as a result).
+        """
+        threshold = self.current_time - self.window_size
+        heap = self._heap
+        times = self._times
+        node1s = self._node1s
+        node2s = self._node2s
+        degrees = self._degrees
+        while self.num_links > 0 and times[heap[1]] <= threshold:
+            link = heap[1]
+            # Remove the root of the heap.
+            last = heap.pop()
+            self.num_links -= 1
+            if self.num_links > 0:
+                heap[1] = last
+                self._positions[last] = 1
+                self._bubble_down(1)
+            # Remove the link from the hash table and nodes.
+            node_id1 = node1s[link]
+            node_id2 = node2s[link]
+            self._delete_slot(self._find(node_id1, node_id2))
+            self._free_links.append(link)
+            degrees[node_id1] -= 1
+            degrees[node_id2] -= 1
+            if degrees[node_id1] == 0:
+                self._release(node_id1)
+            if degrees[node_id2] == 0:
+                self._release(node_id2)
+
+    def _find(self, node_id1, node_id2):
+        """
+        Return the slot of the hash table for a pair of nodes (the slot of the
+        link, or the empty slot where it would be stored).
+        Input:
+            node_id1 (int): id of a node (smaller id)
+            node_id2 (int): id of a node
+        Output:
+            slot (int): index of self._table
+        """
+        table = self._table
+        mask = self._mask
+        slot = _home(node_id1, node_id2, mask)
+        entry = table[slot]
+        while entry != _EMPTY:
+            if self._node1s[entry - 1] == node_id1 and \
+                    self._node2s[entry - 1] == node_id2:
+                break
+            slot = (slot + 1) & mask
+            entry = table[slot]
+        return slot
+
+    def _delete_slot(self, slot):
+        """
+        Empty a slot of the hash table, and move later entries of the same
+        probe sequence back (no tombstone is left).
+        Input:
+            slot (int): index of self._table
+        """
+        table = self._table
+        mask = self._mask
+        node1s = self._node1s
+        node2s = self._node2s
+        hole = slot
+        slot = (slot + 1) & mask
+        entry = table[slot]
+        while entry != _EMPTY:
+            home = _home(node1s[entry - 1], node2s[entry - 1], mask)
+            # The entry can move to the hole unless its home slot is in
+            # (hole, slot] (cyclically).
+            if (slot - home) & mask >= (slot - hole) & mask:
+                table[hole] = entry
+                hole = slot
+            slot = (slot + 1) & mask
+            entry = table[slot]
+        table[hole] = _EMPTY
+
+    def _resize(self, num_needed):
+        """
+        Double the hash table until it is at most half full with the given
+        number of links, and insert all links again.
+        Input:
+            num_needed (int): number of links to be stored
+        """
+        size = self._mask + 1
+        while size <= 2 * num_needed:
+            size *= 2
+        table = array('i', [_EMPTY]) * size
+        mask = size - 1
+        node1s = self._node1s
+        node2s = self._node2s
+        for index in xrange(1, self.num_links + 1):
+            link = self._heap[index]
+            slot = _home(node1s[link], node2s[link], mask)
+            while table[slot] != _EMPTY:
+                slot = (slot + 1) & mask
+            table[slot] = link + 1
+        self._table = table
+        self._mask = mask
+
+    def _bubble_up(self, index):
+        """
+        If the time of the link is not valid, goes up until valid.
+        Input:
+            index (int): index of self._heap for the link
+        """
+        heap = self._heap
+        positions = self._positions
+        times = self._times
+        link = heap[index]
+        time = times[link]
+        while index > 1:
+            parent = index >> 1
+            parent_link = heap[parent]
+            if times[parent_link] <= time:
+                break
+            heap[index] = parent_link
+            positions[parent_link] = index
+            index = parent
+        heap[index] = link
+        positions[link] = index
+
+    def _bubble_down(self, index):
+        """
+        If the time of the link is not valid, goes down until valid.
+        Input:
+            index (int): index of self._heap for the link
+        """
+        heap = self._heap
+        positions = self._positions
+        times = self._times
+        heap_size = self.num_links
+        link = heap[index]
+        time = times[link]
+        child = index << 1
+        while child <= heap_size:
+            child_link = heap[child]
+            child_time = times[child_link]
+            if child < heap_size:
+                right_link = heap[child + 1]
+                if times[right_link] < child_time:
+                    child += 1
+                    child_link = right_link
+                    child_time = times[right_link]
+            if child_time >= time:
+                break
+            heap[index] = child_link
+            positions[child_link] = index
+            index = child
+            child = index << 1
+        heap[index] = link
+        positions[link] = index
+
+
+def _home(node_id1, node_id2, mask):
+    """
+    Return the home slot of a pair of nodes in the hash table.
+    Input:
+        node_id1 (int): id of a node (smaller id)
+        node_id2 (int): id of a node
+        mask (int): size of the hash table - 1
+    Output:
+        (int): slot
+    """
+    return (((node_id1 * _MULTIPLIER1) ^ (node_id2 * _MULTIPLIER2)) >> 8) & \
+        mask
+
+
+def main():
+    """
+    Testing the class
+    """
+    gr = CompactGraph(window_size=5)
+    for timestamp, hashtags in [(1, ["a", "b"]), (2, ["b", "c"]),
+                                (4, ["c", "d", "e"]), (3, ["a", "e"]),
+                                (7, ["c", "d"]), (1, ["a", "f"])]:
+        if gr.add_tweet(timestamp, hashtags):
+            print "%.2f" % gr.average_degree()
+    print gr.check_link("c", "d"), gr.neighbors("c"), gr.top_degrees(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# Class for the histogram of node degrees. It is updated whenever the degree of
+# a node changes, so that statistics of degrees (maximum, quantiles, number of
+# nodes with a given degree) can be answered without visiting all nodes.
+# Counts are also kept in a Fenwick tree (binary indexed tree), so a quantile
+# can be found in O(log D) time, where D is the maximum degree.
+
+# Names of statistics that can be reported, and how to get them.
+STATS = ['median', 'max', 'p95', 'p99', 'deg1']
+_STAT_FUNCTIONS = {
+    'median': lambda hist: hist.median(),
+    'max': lambda hist: hist.max_degree(),
+    'p95': lambda hist: hist.quantile(0.95),
+    'p99': lambda hist: hist.quantile(0.99),
+    'deg1': lambda hist: hist.count(1),   # Number of nodes with degree 1.
+}
+
+class DegreeHistogram:
+    """
+    Class for the histogram of node degrees.
+    (1) It keeps the number of nodes for each degree (including degree 0).
+    (2) Cumulative counts are kept in a Fenwick tree (index: degree + 1).
+    (3) The maximum degree is kept and updated when the count at the maximum
+        becomes 0.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.num_nodes = 0  # Total number of nodes.
+        self._counts = [0] * 16 # list (index: degree, value: number of nodes)
+        self._tree = [0] * 17   # Fenwick tree for self._counts (index 0 is
+                                # not used).
+        self._max_degree = 0    # Maximum degree (0 if there is no node).
+
+    def add(self, degree=0):
+        """
+        Add a node with the given degree.
+        Input:
+            degree (int): degree of the node (default: 0)
+        """
+        if degree >= len(self._counts):
+            self._grow(degree)
+        self._counts[degree] += 1
+        self._update_tree(degree, 1)
+        self.num_nodes += 1
+        if degree > self._max_degree:
+            self._max_degree = degree
+
+    def remove(self, degree=0):
+        """
+        Remove a node with the given degree.
+        Input:
+            degree (int): degree of the node (default: 0)
+        """
+        self._counts[degree] -= 1
+        self._update_tree(degree, -1)
+        self.num_nodes -= 1
+        self._lower_max_degree()
+
+    def move(self, old_degree, new_degree):
+        """
+        Change the degree of a node.
+        Input:
+            old_degree (int): degree before the change
+            new_degree (int): degree after the change
+        """
+        if new_degree >= len(self._counts):
+            self._grow(new_degree)
+        counts = self._counts
+        counts[old_degree] -= 1
+        counts[new_degree] += 1
+        self._update_tree(old_degree, -1)
+        self._update_tree(new_degree, 1)
+        if new_degree > self._max_degree:
+            self._max_degree = new_degree
+        elif old_degree == self._max_degree:
+            self._lower_max_degree()
+
+    def count(self, degree):
+        """
+        Return the number of nodes with the given degree.
+        Input:
+            degree (int): degree
+        Output:
+            (int): number of nodes
+        """
+        if degree < len(self._counts):
+            return self._counts[degree]
+        else:
+            return 0
+
+    def max_degree(self):
+        """
+        Return the maximum degree (0 if there is no node).
+        """
+        return self._max_degree
+
+    def quantile(self, q):
+        """
+        Return the q-quantile of degrees (nearest rank: the smallest degree
+        such that at least q * (number of nodes) nodes have less than or equal
+        degrees). O(log D) time.
+        Input:
+            q (float): 0 <= q <= 1
+        Output:
+            (int): degree (0 if there is no node)
+        """
+        if self.num_nodes == 0:
+            return 0
+        rank = int(q * self.num_nodes)
+        if rank < q * self.num_nodes or rank == 0:
+            rank += 1   # ceil(q * num_nodes), at least 1.
+        # Find the largest index whose cumulative count is less than rank.
+        tree = self._tree
+        index = 0
+        step = 1
+        while step * 2 < len(tree):
+            step *= 2
+        while step > 0:
+            if index + step < len(tree) and tree[index + step] < rank:
+                index += step
+                rank -= tree[index]
+            step /= 2
+        return index    # index + 1 in the tree is degree index.
+
+    def median(self):
+        """
+        Return the median of degrees (the lower one for even numbers of nodes).
+        """
+        return self.quantile(0.5)
+
+    def stats(self, names):
+        """
+        Return statistics of degrees.
+        Input:
+            names (list of str): names of statistics (in STATS)
+        Output:
+            (tuple): values of statistics (in the same order)
+        """
+        return tuple([_STAT_FUNCTIONS[name](self) for name in names])
+
+    # ==== private methods from here on =====================
+    def _update_tree(self, degree, delta):
+        """
+        Add delta to the count of the given degree in the Fenwick tree.
+        Input:
+            degree (int): degree
+            delta (int): change of the count
+        """
+        tree = self._tree
+        index = degree + 1
+        size = len(tree)
+        while index < size:
+            tree[index] += delta
+            index += index & (-index)
+
+    def _grow(self, degree):
+        """
+        Make the histogram large enough for the given degree (the Fenwick tree
+        is rebuilt).
+        Input:
+            degree (int): degree
+        """
+        size = len(self._counts)
+        while size <= degree:
+            size *= 2
+        self._counts.extend([0] * (size - len(self._counts)))
+        tree = [0] + self._counts
+        for index in range(1, size + 1):
+            parent = index + (index & (-index))
+            if parent <= size:
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _lower_max_degree(self):
+        """
+        Lower the maximum degree while no node has that degree.
+        """
+        while self._max_degree > 0 and self._counts[self._max_degree] == 0:
+            self._max_degree -= 1
+
+
+def main():
+    """
+    Testing the class
+    """
+    hist = DegreeHistogram()
+    for degree in [1, 1, 1, 2, 3, 5, 40]:
+        hist.add(degree)
+    print hist.num_nodes, hist.stats(STATS)
+    hist.move(40, 4)
+    hist.remove(1)
+    print hist.num_nodes, hist.stats(STATS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# Class for the expiry log with lazy deletion. In a live feed, most updates
+# move the time of a link forward to the newest time, so instead of moving the
+# key in a heap (O(logN) per update), a new (key, value) event is appended to a
+# FIFO log, and the latest value of each key is kept in a dictionary. Expiring
+# old datapoints drains the head of the log, and skips stale events (events
+# whose values are not the latest ones). The log is compacted when most of it
+# is stale, so memory is bounded by the number of keys.
+
+from collections import deque
+from itertools import izip
+
+from minpq import indexedMinPQ
+
+_MIN_COMPACT = 1024 # The log is not compacted while it is shorter than this
+                    # (plus twice the number of keys in the log).
+
+class ExpiryLog:
+    """
+    Class for the expiry log.
+    (1) Events (key, value) are appended to a FIFO log (two deques) in the
+        order of values (non-decreasing), and the latest value of each key in
+        the log is kept in a dictionary.
+    (2) An event is stale if its value is not the latest one for the key (the
+        key was updated or removed). Stale events are skipped when they reach
+        the head of the log.
+    (3) A datapoint whose value is less than the value at the tail of the log
+        (e.g., an out-of-order tweet) is kept in an overflow indexedMinPQ.
+    (4) If the log is more than twice as long as the number of keys in the
+        log, stale events are removed at once (compaction).
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._log_keys = deque()    # Keys of events (FIFO).
+        self._log_values = deque()  # Values of events (non-decreasing).
+        self._values = {}   # dict (key: key in the log, value: latest value)
+        self._overflow = indexedMinPQ(dtype='int')
+                            # Datapoints that cannot be appended to the log.
+        self.num_compactions = 0    # Number of compactions of the log.
+
+    def add(self, key, value):
+        """
+        Add a new (key, value) pair. Do nothing, if key exists already.
+        Input:
+            key: key of the datapoint
+            value (int): value (time) of the datapoint.
+        Output:
+            (bool): True if successful, False if not
+        """
+        if key in self._values or self._overflow.value(key) is not None:
+            return False
+        self._insert(key, value)
+        return True
+
+
+    def remove(self, key):
+        """
+        Remove information about (key, value) pair based on key (the event in
+        the log becomes stale).
+        Input:
+            key: key of the datapoint.
+        Output:
+            (bool): True if successful, False if not
+        """
+        if key in self._values:
+            del self._values[key]
+            return True
+        return self._overflow.remove(key)
+
+
+    def update(self, key, value):
+        """
+        Update the value of the given key with the given value (a new event is
+        appended, and the old one becomes stale). O(1) amortized time.
+        Input:
+            key: key of the dataporint
+            value (int): value (time) of the datapoint
+        Output:
+            (bool): True if successful, False if not
+        """
+        old_value = self._values.get(key)
+        if old_value is not None:
+            if old_value == value:
+                return True
+            del self._values[key]
+        elif not self._overflow.remove(key):
+            return False
+        self._insert(key, value)
+        return True
+
+
+    def value(self, key):
+        """
+        Return the value associated the given key
+        Input:
+            key: key of the datapoint
+        """
+        value = self._values.get(key)
+        if value is None:
+            return self._overflow.value(key)   # None if key doesn't exist.
+        return value
+
+
+    def peek_min(self):
+        """
+        Peek the minimum value and return (key, value) pair (stale events at
+        the head of the log are dropped).
+        """
+        self._drop_stale()
+        key, value = self._overflow.peek_min()
+        if self._log_keys and (value is None or self._log_values[0] < value):
+            key, value = self._log_keys[0], self._log_values[0]
+        return key, value
+
+
+    def pop_min(self):
+        """
+        Get the minimum value and its associated key, and remove the datapoint.
+        """
+        key, value = self.peek_min()
+        if key is not None:
+            self.remove(key)
+        return key, value
+
+
+    def pop_min_until(self, threshold, limit=None):
+        """
+        Remove all datapoints whose values are less than or equal to threshold.
+        The head of the log is drained, and stale events are skipped.
+        Input:
+            threshold (int): maximum value to be removed
+            limit (int): maximum number of datapoints removed (None: no limit)
+        Output:
+            (list): (key, value) pairs removed
+        """
+        removed = self._overflow.pop_min_until(threshold, limit)
+        log_keys = self._log_keys
+        log_values = self._log_values
+        values = self._values
+        while log_values and log_values[0] <= threshold and \
+                len(removed) != limit:
+            key = log_keys.popleft()
+            value = log_values.popleft()
+            if values.get(key) == value:
+                del values[key]
+                removed.append((key, value))
+        return removed
+
+
+    def items(self):
+        """
+        Return all (key, value) pairs (in no particular order).
+        Output:
+            (list): (key, value) pairs
+        """
+        return self._values.items() + self._overflow.items()
+
+
+    def load(self, keys, values):
+        """
+        Load (key, value) pairs into an empty log at once (events are sorted
+        by values).
+        Input:
+            keys (list): keys of datapoints (distinct)
+            values (list or array): values (times) of datapoints
+        Output:
+            (bool): True if successful, False if the log is not empty
+        """
+        if self.size() > 0:
+            return False
+        events = sorted(izip(values, keys))
+        self._log_keys = deque([key for value, key in events])
+        self._log_values = deque([value for value, key in events])
+        self._values = dict(izip(keys, values))
+        return True
+
+
+    def size(self):
+        """
+        Returns the size of the log
+        Output:
+            size (int): number of (key, value) pairs.
+        """
+        return len(self._values) + self._overflow.size()
+
+
+    def write(self):
+        """
+        Write the stored data to that standard output (stale events are
+        marked).
+        """
+        for key, value in izip(self._log_keys, self._log_values):
+            if self._values.get(key) == value:
+                print value, key
+            else:
+                print value, key, "(stale)"
+        self._overflow.write()
+
+    # ==== private methods from here on =====================
+    def _insert(self, key, value):
+        """
+        Append an event to the log (or put the datapoint into the overflow
+        priority queue if the value is less than the value at the tail).
+        Input:
+            key: key of the datapoint
+            value (int): value (time) of the datapoint
+        """
+        log_values = self._log_values
+        if log_values and value < log_values[-1]:
+            self._overflow.add(key, value)
+            return
+        self._log_keys.append(key)
+        log_values.append(value)
+        self._values[key] = value
+        if len(log_values) > 2 * len(self._values) + _MIN_COMPACT:
+            self._compact()
+
+    def _drop_stale(self):
+        """
+        Drop stale events at the head of the log.
+        """
+        log_keys = self._log_keys
+        log_values = self._log_values
+        while log_keys and self._values.get(log_keys[0]) != log_values[0]:
+            log_keys.popleft()
+            log_values.popleft()
+
+    def _compact(self):
+        """
+        Remove all stale events from the log (the order is kept). O(length of
+        the log), amortized O(1) per event since more than half are stale.
+        A key can have two events with its latest value (if it went to the
+        overflow and came back with the same value), and only the first one
+        is kept.
+        """
+        values = self._values
+        log_keys = deque()
+        log_values = deque()
+        kept = set()
+        for key, value in izip(self._log_keys, self._log_values):
+            if values.get(key) == value and key not in kept:
+                kept.add(key)
+                log_keys.append(key)
+                log_values.append(value)
+        self._log_keys = log_keys
+        self._log_values = log_values
+        self.num_compactions += 1
+
+
+def main():
+    log = ExpiryLog()
+    log.add('a', 1)
+    log.add('b', 2)
+    log.add('c', 3)
+    log.update('a', 4)  # The event ('a', 1) becomes stale.
+    log.add('d', 2)     # Older than the tail: kept in the overflow.
+    log.write()
+    print log.value('a')
+    print log.peek_min()
+    print log.pop_min_until(3)
+    log.write()
+    print log.pop_min()
+    log.write()
+
+if __name__ == "__main__":
+    main()
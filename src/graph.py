@@ -3,9 +3,28 @@
 # only the latest links based on time. We only keep links for the last 60
 # seconds, which means we have to keep the current time, and links should be
 # also stored in some type of priority queue structures. Basic graph structure
-# will be stored as a dictionary of dictionaries.
+# will be stored as a list of sets of integer node ids.
+
+import heapq
+from array import array
 
 from minpq import indexedMinPQ
+from timewheel import TimeWheel
+from expirylog import ExpiryLog
+from degreehist import DegreeHistogram
+from graphindex import DegreeIndex, ComponentIndex
+try:
+    # Optional C extension (python setup.py build_ext --inplace).
+    from _accel import IntMinPQ, upsert_links, expire_links
+except ImportError:
+    IntMinPQ = None
+
+# Names of data structures to expire old links (make_expiry).
+EXPIRY_STRUCTURES = ['heap', 'wheel', 'log']
+
+ACCELERATED = IntMinPQ is not None  # If True, 'heap' is IntMinPQ of the C
+                                    # extension, and add_tweet and expiry use
+                                    # its loops (False: pure Python).
 
 class TimeWindowGraph:
     """
@@ -20,26 +39,51 @@ class TimeWindowGraph:
     (5) Self-loops (same node as endpoints) and multiple links (more than one
         links connecting the same pair of nodes) are not allowed.
     (6) Nodes are named uniquely (e.g., integer, string), and it is assumed that
-        they are immutable and operator < can be used with them.
+        they are immutable (hashable).
+    (7) Internally, nodes are interned into dense integer ids (ids of removed
+        nodes are recycled), and a link is represented by a single integer
+        made by packing the ids of two nodes.
     """
-    def __init__(self, window_size=60):
+    def __init__(self, window_size=60, expiry='heap', degree_stats=False,
+                 query_index=False):
         """
         Constructor
         Input:
             window_size (int): size of the window (default: 60)
+            expiry (str): data structure to expire old links, 'heap' for
+                          indexedMinPQ, 'wheel' for TimeWheel or 'log' for
+                          ExpiryLog (default: 'heap')
+            degree_stats (bool): if True, keep the histogram of node degrees
+                                 (self.degree_histogram) (default: False)
+            query_index (bool): if True, keep indexes for queries
+                                (top_degrees, component_size) (default:
+                                False)
         """
         # Attributes of this class
         self.window_size = window_size   # size of the window
         self.num_links = 0  # Total number of links.
         self.num_nodes = 0  # Total number of nodes.
         self.current_time = 0   # Current time in int.
-        self._graph_structure = {}   # dict to represent graph structure
-                                    # (key: node, value: set of nodes).
-        self._linkheap = indexedMinPQ(dtype='int')  
-                                    # Indexed minimum priority queue to
-                                    # remove old links efficiently
-                                    # (log(N) time where N: number of links)
-                                    # (key: (node1, node2), value: time)
+        self._node_ids = {} # dict (key: node, value: id of the node)
+        self._node_names = []   # list (index: id, value: node)
+        self._free_ids = [] # ids of removed nodes (to be recycled)
+        self._graph_structure = []  # list to represent graph structure
+                                    # (index: id, value: set of ids, or None
+                                    # if the id is not used).
+        self._linkheap = make_expiry(expiry, window_size)
+                                    # Indexed minimum priority queue (or
+                                    # timing wheel) to remove old links
+                                    # efficiently (key: packed link, value:
+                                    # time)
+        self.degree_histogram = DegreeHistogram() if degree_stats else None
+                                    # Histogram of node degrees (None if it
+                                    # is not kept).
+        self.degree_index = DegreeIndex() if query_index else None
+                                    # Buckets of node ids by degree (None if
+                                    # they are not kept).
+        self.component_index = ComponentIndex() if query_index else None
+                                    # Connected components (None if they are
+                                    # not kept).
 
     def check_node(self, node):
         """
@@ -49,10 +93,7 @@ class TimeWindowGraph:
         Output:
             (bool): True if exists, False if not
         """
-        if node in self._graph_structure:
-            return True
-        else:
-            return False
+        return node in self._node_ids
 
     def add_node(self, node):
         """
@@ -62,9 +103,8 @@ class TimeWindowGraph:
         Output:
             (bool): True if successful, False if not
         """
-        if node not in self._graph_structure:
-            self._graph_structure[node] = set()
-            self.num_nodes += 1
+        if node not in self._node_ids:
+            self._intern(node)
             return True
         else:
             return False
@@ -77,18 +117,28 @@ class TimeWindowGraph:
         Output:
             (bool): True if successful, False if not
         """
-        if node in self._graph_structure:
-            links_info = self._graph_structure[node].copy()
-            if len(links_info) > 0: # If there are links associated with node,
-                                    # we have to remove them first.
-                for node2 in links_info:
-                    self.remove_link(node, node2)
-            del self._graph_structure[node]
-            self.num_nodes -= 1
+        if node in self._node_ids:
+            node_id = self._node_ids[node]
+            for node_id2 in list(self._graph_structure[node_id]):
+                # If there are links associated with node, we have to remove
+                # them first.
+                self._linkheap.remove(_pack(node_id, node_id2))
+                self._unlink(node_id, node_id2)
+            self._release(node_id)
             return True
         else:
             return False
 
+    def node_id(self, node):
+        """
+        Return the (internal) integer id of a node.
+        Input:
+            node: ID of a node
+        Output:
+            (int): id of the node (None if the node does not exist)
+        """
+        return self._node_ids.get(node)
+
     def check_link(self, node1, node2):
         """
         Check if a link exists between node1 and node2.
@@ -98,16 +148,13 @@ class TimeWindowGraph:
         Output:
             time (int): -1 if none exists, time value if already exists.
         """
-        if not self.check_node(node1) or not self.check_node(node2) \
-            or node1 == node2:
+        node_id1 = self._node_ids.get(node1)
+        node_id2 = self._node_ids.get(node2)
+        if node_id1 is None or node_id2 is None or \
+            node_id2 not in self._graph_structure[node_id1]:
             return -1
         else:
-            if node1 in self._graph_structure and \
-                node2 in self._graph_structure[node1]:
-                node_pair = (node1, node2) if node1 < node2 else (node2, node1)
-                return self._linkheap.value(node_pair)
-            else:
-                return -1
+            return self._linkheap.value(_pack(node_id1, node_id2))
 
     def add_link(self, node1, node2, time=0):
         """
@@ -119,15 +166,25 @@ class TimeWindowGraph:
         Output:
             (bool): True if successful, False if not.
         """
-        if not self.check_node(node1) or not self.check_node(node2) or \
-            node1 == node2 or self.check_link(node1, node2) >= 0:
+        node_id1 = self._node_ids.get(node1)
+        node_id2 = self._node_ids.get(node2)
+        if node_id1 is None or node_id2 is None or node_id1 == node_id2 or \
+            node_id2 in self._graph_structure[node_id1]:
             return False
         else:
-            node_pair = (node1, node2) if node1 < node2 else (node2, node1)
-            self._linkheap.add(node_pair, time)
-            self._graph_structure[node1].add(node2)
-            self._graph_structure[node2].add(node1)
+            self._linkheap.add(_pack(node_id1, node_id2), time)
+            self._graph_structure[node_id1].add(node_id2)
+            self._graph_structure[node_id2].add(node_id1)
             self.num_links += 1
+            degree1 = len(self._graph_structure[node_id1])
+            degree2 = len(self._graph_structure[node_id2])
+            if self.degree_histogram is not None:
+                self.degree_histogram.move(degree1 - 1, degree1)
+                self.degree_histogram.move(degree2 - 1, degree2)
+            if self.degree_index is not None:
+                self.degree_index.move(node_id1, degree1 - 1, degree1)
+                self.degree_index.move(node_id2, degree2 - 1, degree2)
+                self.component_index.union(node_id1, node_id2)
             # If the time is greater than the current time, update it
             if time > self.current_time:
                 self.set_current_time(time)
@@ -143,11 +200,13 @@ class TimeWindowGraph:
         Output:
             (bool): True if successful, False if not.
         """
-        if self.check_link(node1, node2) < 0:
+        node_id1 = self._node_ids.get(node1)
+        node_id2 = self._node_ids.get(node2)
+        if node_id1 is None or node_id2 is None or \
+            node_id2 not in self._graph_structure[node_id1]:
             return False
         else:
-            node_pair = (node1, node2) if node1 < node2 else (node2, node1)
-            if self._linkheap.update(node_pair, time):
+            if self._linkheap.update(_pack(node_id1, node_id2), time):
                 # If the time is greater than the current time, update it
                 if time > self.current_time:
                     self.set_current_time(time)
@@ -165,14 +224,14 @@ class TimeWindowGraph:
         Output:
             (bool): True if successful, False if not.
         """
-        if self.check_link(node1, node2) < 0:
+        node_id1 = self._node_ids.get(node1)
+        node_id2 = self._node_ids.get(node2)
+        if node_id1 is None or node_id2 is None or \
+            node_id2 not in self._graph_structure[node_id1]:
             return False
         else:
-            node_pair = (node1, node2) if node1 < node2 else (node2, node1)
-            if self._linkheap.remove(node_pair):
-                self._graph_structure[node1].remove(node2)
-                self._graph_structure[node2].remove(node1)
-                self.num_links -= 1
+            if self._linkheap.remove(_pack(node_id1, node_id2)):
+                self._unlink(node_id1, node_id2)
                 return True
             else:
                 return False
@@ -189,12 +248,152 @@ class TimeWindowGraph:
         if self.num_links == 0:
             return None, None
         else:
-            (node1, node2), time = self._linkheap.pop_min()
-            if time is not None:
-                self._graph_structure[node1].remove(node2)
-                self._graph_structure[node2].remove(node1)
-                self.num_links -= 1
-            return (node1, node2), time
+            link, time = self._linkheap.pop_min()
+            node_id1, node_id2 = _unpack(link)
+            self._unlink(node_id1, node_id2)
+            return (self._node_names[node_id1],
+                    self._node_names[node_id2]), time
+
+
+    def add_tweet(self, timestamp, hashtags):
+        """
+        Add links for all pairs of (distinct) hashtags in a tweet, or update
+        the time values of links that already exist. Duplicate hashtags are
+        removed once, the current time is advanced once, and links are added
+        or updated without validating nodes for every pair.
+        Input:
+            timestamp (int): time value of the tweet (non-negative)
+            hashtags (list): IDs of nodes (hashtags) in the tweet
+        Output:
+            (bool): True if the tweet is in the window, False if it is too old
+                    (nothing is changed in that case).
+        """
+        if timestamp <= self.current_time - self.window_size:
+            return False
+        if timestamp > self.current_time:
+            self.set_current_time(timestamp)
+        hashtags = set(hashtags)
+        if len(hashtags) < 2:
+            return True
+        node_ids = self._node_ids
+        node_id_list = []
+        for hashtag in hashtags:
+            node_id = node_ids.get(hashtag)
+            if node_id is None:
+                node_id = self._intern(hashtag)
+            node_id_list.append(node_id)
+        node_id_list.sort()
+        graph_structure = self._graph_structure
+        linkheap = self._linkheap
+        num_ids = len(node_id_list)
+        num_links = self.num_links
+        degree_histogram = self.degree_histogram
+        degree_index = self.degree_index
+        if degree_histogram is not None or degree_index is not None:
+            # Degrees before adding links.
+            degrees = [len(graph_structure[node_id])
+                       for node_id in node_id_list]
+        if IntMinPQ is not None and type(linkheap) is IntMinPQ:
+            # Same loop in the C extension.
+            num_ids = 0
+            num_links += upsert_links(node_id_list, graph_structure,
+                                      linkheap, timestamp)
+        for i in xrange(num_ids):
+            node_id1 = node_id_list[i]
+            links_info = graph_structure[node_id1]
+            upper = node_id1 << 32
+            for j in xrange(i + 1, num_ids):
+                node_id2 = node_id_list[j]
+                link = upper | node_id2
+                if node_id2 in links_info:
+                    if linkheap.value(link) < timestamp:
+                        linkheap.update(link, timestamp)
+                else:
+                    linkheap.add(link, timestamp)
+                    links_info.add(node_id2)
+                    graph_structure[node_id2].add(node_id1)
+                    num_links += 1
+        if num_links > self.num_links:
+            if degree_histogram is not None or degree_index is not None:
+                for node_id, degree in zip(node_id_list, degrees):
+                    new_degree = len(graph_structure[node_id])
+                    if new_degree > degree:
+                        if degree_histogram is not None:
+                            degree_histogram.move(degree, new_degree)
+                        if degree_index is not None:
+                            degree_index.move(node_id, degree, new_degree)
+            if degree_index is not None:
+                # All hashtags of the tweet are connected.
+                self.component_index.union_all(node_id_list)
+        self.num_links = num_links
+        return True
+
+
+    def get_state(self):
+        """
+        Return the state of the graph as flat lists (e.g., to save it).
+        Nodes are renumbered from 0 (without unused ids), and links are sorted
+        by time values.
+        Output:
+            names (list): IDs of nodes (index: new id of the node)
+            node1s (array of int): new ids of the first nodes of links
+            node2s (array of int): new ids of the second nodes of links
+            times (array of int): time values of links
+        """
+        new_ids = {}    # dict (key: id, value: new id)
+        names = []
+        for node_id, node in enumerate(self._node_names):
+            if self._graph_structure[node_id] is not None:
+                new_ids[node_id] = len(names)
+                names.append(node)
+        links = sorted([(time, link) for link, time in self._linkheap.items()])
+        node1s = array('l', [new_ids[link >> 32] for time, link in links])
+        node2s = array('l', [new_ids[link & 0xFFFFFFFF]
+                             for time, link in links])
+        times = array('l', [time for time, link in links])
+        return names, node1s, node2s, times
+
+
+    def set_state(self, current_time, names, node1s, node2s, times):
+        """
+        Load the state of an empty graph at once (O(V + E) time when links are
+        sorted by time values, without calling add_link for every link).
+        Input:
+            current_time (int): current time
+            names (list): IDs of nodes (index: id of the node)
+            node1s (array of int): ids of the first nodes of links
+            node2s (array of int): ids of the second nodes of links
+            times (array of int): time values of links
+        Output:
+            (bool): True if successful, False if the graph is not empty
+        """
+        if self.num_nodes > 0:
+            return False
+        self.current_time = current_time
+        self._node_names = list(names)
+        self._node_ids = dict(zip(self._node_names,
+                                  xrange(len(self._node_names))))
+        self._free_ids = []
+        graph_structure = [set() for _ in xrange(len(self._node_names))]
+        for node_id1, node_id2 in zip(node1s, node2s):
+            graph_structure[node_id1].add(node_id2)
+            graph_structure[node_id2].add(node_id1)
+        self._graph_structure = graph_structure
+        self._linkheap.load([_pack(node_id1, node_id2)
+                             for node_id1, node_id2 in zip(node1s, node2s)],
+                            times)
+        self.num_nodes = len(self._node_names)
+        self.num_links = len(times)
+        if self.degree_histogram is not None:
+            for links_info in graph_structure:
+                self.degree_histogram.add(len(links_info))
+        if self.degree_index is not None:
+            for node_id, links_info in enumerate(graph_structure):
+                self.degree_index.add(node_id)
+                if links_info:
+                    self.degree_index.move(node_id, 0, len(links_info))
+            self.component_index.rebuild(graph_structure)
+        return True
 
 
     def write(self):
@@ -202,16 +401,86 @@ class TimeWindowGraph:
         Print graph information to the standard output
         """
         print "Nodes (total:", self.num_nodes, "):"
-        print self._graph_structure.keys()
+        print self._node_ids.keys()
         print "Links (total:", self.num_links, "):"
-        for node1 in self._graph_structure:
-            for node2 in self._graph_structure[node1]:
-                if node1 < node2:
-                    print repr(node1), "->", repr(node2), ":", \
-                        self._linkheap.value((node1,node2))
+        for node_id1, links_info in enumerate(self._graph_structure):
+            if links_info is None:
+                continue
+            for node_id2 in links_info:
+                if node_id1 < node_id2:
+                    print repr(self._node_names[node_id1]), "->", \
+                        repr(self._node_names[node_id2]), ":", \
+                        self._linkheap.value(_pack(node_id1, node_id2))
         print "average degree: %.2f" % self.average_degree()
 
 
+    def top_degrees(self, k):
+        """
+        Return the top k nodes by degree (hubs), ties in any order.
+        O(k + D) time with query_index (D: maximum degree), or O(N log k)
+        without it.
+        Input:
+            k (int): number of nodes
+        Output:
+            (list): (ID of a node, degree) in descending order of degrees
+        """
+        names = self._node_names
+        if self.degree_index is not None:
+            return [(names[node_id], degree)
+                    for node_id, degree in self.degree_index.top(k)]
+        degrees = [(len(links_info), node_id) for node_id, links_info
+                   in enumerate(self._graph_structure)
+                   if links_info is not None]
+        return [(names[node_id], degree)
+                for degree, node_id in heapq.nlargest(k, degrees)]
+
+
+    def neighbors(self, node):
+        """
+        Return neighbors of a node with time values of links.
+        Input:
+            node: ID of a node
+        Output:
+            (list): (ID of a neighbor, time) in descending order of time values
+                    (empty if the node does not exist)
+        """
+        node_id1 = self._node_ids.get(node)
+        if node_id1 is None:
+            return []
+        result = [(self._linkheap.value(_pack(node_id1, node_id2)),
+                   self._node_names[node_id2])
+                  for node_id2 in self._graph_structure[node_id1]]
+        result.sort(reverse=True)
+        return [(node2, time) for time, node2 in result]
+
+
+    def component_size(self, node):
+        """
+        Return the number of nodes in the connected component of a node.
+        O(alpha(N)) time with query_index (after links are removed, components
+        of their nodes are searched again once, in O(size of those
+        components) time), or O(size of the component) without it.
+        Input:
+            node: ID of a node
+        Output:
+            (int): size of the component (0 if the node does not exist)
+        """
+        node_id = self._node_ids.get(node)
+        if node_id is None:
+            return 0
+        graph_structure = self._graph_structure
+        if self.component_index is not None:
+            return self.component_index.size(node_id, graph_structure)
+        visited = set([node_id])
+        stack = [node_id]
+        while stack:
+            for node_id2 in graph_structure[stack.pop()]:
+                if node_id2 not in visited:
+                    visited.add(node_id2)
+                    stack.append(node_id2)
+        return len(visited)
+
+
     def average_degree(self):
         if self.num_nodes == 0:
             return 0
@@ -229,31 +498,175 @@ class TimeWindowGraph:
                 self._remove_old_links()
 
 
-    def _remove_old_links(self):
+    def _intern(self, node):
+        """
+        Add a node and give it an id (an id of a removed node is recycled).
+        Input:
+            node: ID of a node
+        Output:
+            node_id (int): id of the node
+        """
+        if self._free_ids:
+            node_id = self._free_ids.pop()
+            self._node_names[node_id] = node
+            self._graph_structure[node_id] = set()
+        else:
+            node_id = len(self._node_names)
+            self._node_names.append(node)
+            self._graph_structure.append(set())
+        self._node_ids[node] = node_id
+        self.num_nodes += 1
+        if self.degree_histogram is not None:
+            self.degree_histogram.add(0)
+        if self.degree_index is not None:
+            self.degree_index.add(node_id)
+            self.component_index.add(node_id)
+        return node_id
+
+
+    def _release(self, node_id):
+        """
+        Remove a node (with no link) by its id, and recycle the id.
+        Input:
+            node_id (int): id of the node
+        """
+        del self._node_ids[self._node_names[node_id]]
+        self._node_names[node_id] = None
+        self._graph_structure[node_id] = None
+        self._free_ids.append(node_id)
+        self.num_nodes -= 1
+        if self.degree_histogram is not None:
+            self.degree_histogram.remove(0)
+        if self.degree_index is not None:
+            self.degree_index.remove(node_id)
+
+
+    def _unlink(self, node_id1, node_id2):
+        """
+        Remove a link (already removed from self._linkheap) from the graph
+        structure by ids of two nodes. Nodes are not removed.
+        Input:
+            node_id1 (int): id of a node
+            node_id2 (int): id of a node
+        """
+        self._graph_structure[node_id1].remove(node_id2)
+        self._graph_structure[node_id2].remove(node_id1)
+        self.num_links -= 1
+        degree1 = len(self._graph_structure[node_id1])
+        degree2 = len(self._graph_structure[node_id2])
+        if self.degree_histogram is not None:
+            self.degree_histogram.move(degree1 + 1, degree1)
+            self.degree_histogram.move(degree2 + 1, degree2)
+        if self.degree_index is not None:
+            self.degree_index.move(node_id1, degree1 + 1, degree1)
+            self.degree_index.move(node_id2, degree2 + 1, degree2)
+            self.component_index.unlink(node_id1, node_id2)
+
+
+    def _remove_old_links(self, limit=None):
         """
         Remove old links if the current time advances and some links are
         out of the window. If a node has no link (degree 0) as a result
         of this operatoin, remove that node, too.
         This method will be called from 'self.set_current_time'.
+        Input:
+            limit (int): maximum number of links removed (None: no limit)
         """
         # If there is no link, no need.
         if self.num_links == 0:
             return
+        # threshold (=current_time - window_size) is not included in the
+        # window.
         threshold = self.current_time - self.window_size
-        (node1, node2), time  = self._linkheap.peek_min()
-        while time <= threshold: # threshold (=current_time - window_size)
-                                 # is not included in the window.
-            (node1, node2), time  = self.remove_min_link()
-            if len(self._graph_structure[node1]) == 0:
-                self.remove_node(node1)
-            if len(self._graph_structure[node2]) == 0:
-                self.remove_node(node2)
-            if self.num_links == 0:
-                break
-            (node1, node2), time  = self._linkheap.peek_min()
+        graph_structure = self._graph_structure
+        degree_histogram = self.degree_histogram
+        degree_index = self.degree_index
+        if IntMinPQ is not None and type(self._linkheap) is IntMinPQ and \
+                degree_histogram is None and degree_index is None:
+            # Same loop in the C extension (nodes with no link are returned).
+            num_removed, node_ids = expire_links(self._linkheap,
+                                                 graph_structure, threshold,
+                                                 limit)
+            self.num_links -= num_removed
+            for node_id in node_ids:
+                self._release(node_id)
+            return
+        for link, time in self._linkheap.pop_min_until(threshold, limit):
+            node_id1 = link >> 32
+            node_id2 = link & 0xFFFFFFFF
+            graph_structure[node_id1].remove(node_id2)
+            graph_structure[node_id2].remove(node_id1)
+            self.num_links -= 1
+            if degree_histogram is not None:
+                degree1 = len(graph_structure[node_id1])
+                degree2 = len(graph_structure[node_id2])
+                degree_histogram.move(degree1 + 1, degree1)
+                degree_histogram.move(degree2 + 1, degree2)
+            if degree_index is not None:
+                degree1 = len(graph_structure[node_id1])
+                degree2 = len(graph_structure[node_id2])
+                degree_index.move(node_id1, degree1 + 1, degree1)
+                degree_index.move(node_id2, degree2 + 1, degree2)
+                self.component_index.unlink(node_id1, node_id2)
+            if len(graph_structure[node_id1]) == 0:
+                self._release(node_id1)
+            if len(graph_structure[node_id2]) == 0:
+                self._release(node_id2)
         return
 
 
+def make_expiry(expiry, window_size, int_keys=True):
+    """
+    Make a data structure to expire old links.
+    Input:
+        expiry (str): 'heap' for indexedMinPQ (log(N) time where N: number of
+                      links), 'wheel' for TimeWheel (one bucket per second,
+                      O(1) time (amortized) per link) or 'log' for ExpiryLog
+                      (events appended to a FIFO log with lazy deletion,
+                      O(1) time (amortized) per update)
+        window_size (int): size of the window
+        int_keys (bool): True if keys are integers (packed links)
+    Output:
+        indexedMinPQ (IntMinPQ if ACCELERATED and int_keys), TimeWheel or
+        ExpiryLog
+    """
+    if expiry == 'heap':
+        if ACCELERATED and int_keys:
+            return IntMinPQ()
+        return indexedMinPQ(dtype='int')
+    elif expiry == 'wheel':
+        return TimeWheel(size=window_size)
+    elif expiry == 'log':
+        return ExpiryLog()
+    else:
+        raise ValueError("unknown expiry structure: %r" % expiry)
+
+def _pack(node_id1, node_id2):
+    """
+    Pack ids of two nodes into a single integer representing the link
+    (the smaller id goes to the upper 32 bits).
+    Input:
+        node_id1 (int): id of a node
+        node_id2 (int): id of a node
+    Output:
+        (int): packed link
+    """
+    if node_id1 < node_id2:
+        return (node_id1 << 32) | node_id2
+    else:
+        return (node_id2 << 32) | node_id1
+
+def _unpack(link):
+    """
+    Unpack a link into ids of two nodes.
+    Input:
+        link (int): packed link
+    Output:
+        (tuple): ids of two nodes
+    """
+    return link >> 32, link & 0xFFFFFFFF
+
+
 def main():
     """
     Testing the class
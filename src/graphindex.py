@@ -0,0 +1,299 @@
+# Classes for indexes of the live graph, updated whenever links are added or
+# removed, so that queries (nodes with the largest degrees, the size of the
+# connected component of a node) do not visit all nodes.
+# (1) DegreeIndex keeps node ids in buckets by degree, so the top K nodes by
+#     degree are found in O(K + D) time, where D is the maximum degree.
+# (2) ComponentIndex keeps connected components in a union-find structure.
+#     Links only join components, so adding links is O(alpha(N)) per link.
+#     Union-find cannot split a component, so removing a link marks both
+#     nodes, and at the next query only components of marked nodes are
+#     searched again (O(size of those components), which is O(N + E) only if
+#     a link of a component spanning the whole graph expires).
+
+from array import array
+
+_MIN_SLOTS = 1024   # Slots of removed nodes kept before the index is rebuilt.
+
+class DegreeIndex:
+    """
+    Class for buckets of node ids by degree.
+    (1) Each bucket is a set of node ids (index: degree, including degree 0).
+    (2) The maximum degree is kept and lowered when its bucket becomes empty.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._buckets = [set()] # list (index: degree, value: set of ids)
+        self._max_degree = 0    # Maximum degree (0 if there is no node).
+
+    def add(self, node_id):
+        """
+        Add a node (with degree 0).
+        Input:
+            node_id (int): id of the node
+        """
+        self._buckets[0].add(node_id)
+
+    def remove(self, node_id):
+        """
+        Remove a node (with degree 0).
+        Input:
+            node_id (int): id of the node
+        """
+        self._buckets[0].remove(node_id)
+
+    def move(self, node_id, old_degree, new_degree):
+        """
+        Change the degree of a node.
+        Input:
+            node_id (int): id of the node
+            old_degree (int): degree before the change
+            new_degree (int): degree after the change
+        """
+        buckets = self._buckets
+        buckets[old_degree].remove(node_id)
+        while len(buckets) <= new_degree:
+            buckets.append(set())
+        buckets[new_degree].add(node_id)
+        if new_degree > self._max_degree:
+            self._max_degree = new_degree
+        else:
+            while self._max_degree > 0 and not buckets[self._max_degree]:
+                self._max_degree -= 1
+
+    def max_degree(self):
+        """
+        Return the maximum degree (0 if there is no node).
+        """
+        return self._max_degree
+
+    def top(self, k):
+        """
+        Return the top k nodes by degree (ties in any order). O(k + D) time.
+        Input:
+            k (int): number of nodes
+        Output:
+            (list): (id of a node, degree) in descending order of degrees
+        """
+        result = []
+        if k <= 0:
+            return result
+        buckets = self._buckets
+        for degree in xrange(self._max_degree, -1, -1):
+            for node_id in buckets[degree]:
+                result.append((node_id, degree))
+                if len(result) == k:
+                    return result
+        return result
+
+
+class ComponentIndex:
+    """
+    Class for connected components (union-find with union by size and path
+    halving).
+    (1) Each node id is given a slot of union-find when it is added (a reused
+        id gets a new slot, so that old slots of the id are not mixed up with
+        the new node), and the parent and the size of the component (for
+        roots) of each slot are stored in arrays.
+    (2) If a link is removed, slots of both nodes are marked as touched. At
+        the next query, only components of live touched nodes are searched in
+        the graph, and their nodes are given a new root. Each live node of a
+        component split by removed links is reachable from one of the touched
+        nodes, so the other components are still correct.
+    (3) Slots of removed nodes are not reused, so the whole index is rebuilt
+        from the graph (O(N + E)) when there are more than twice as many slots
+        as ids (once per O(N) added nodes).
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self._slots = array('l')    # Slot of each id.
+        self._nodes = array('l')    # Id of each slot.
+        self._parent = array('l')   # Parent of each slot (itself for roots).
+        self._size = array('l')     # Size of the component (for roots).
+        self._touched = set()   # Slots of nodes of removed links.
+        self.stale = False  # True if the whole index has to be rebuilt.
+
+    def add(self, node_id):
+        """
+        Add a node (a component of its own).
+        Input:
+            node_id (int): id of the node (an id of a removed node can be
+                           reused)
+        """
+        if self.stale:
+            return  # It will be rebuilt anyway.
+        slot = len(self._parent)
+        if slot > 2 * len(self._slots) + _MIN_SLOTS:
+            # Too many slots of removed nodes.
+            self._clear()
+            return
+        self._parent.append(slot)
+        self._size.append(1)
+        self._nodes.append(node_id)
+        if node_id == len(self._slots):
+            self._slots.append(slot)
+        else:
+            self._slots[node_id] = slot
+
+    def union(self, node_id1, node_id2):
+        """
+        Join components of two nodes (for a link between them).
+        Input:
+            node_id1 (int): id of a node
+            node_id2 (int): id of a node
+        """
+        if self.stale:
+            return  # It will be rebuilt anyway.
+        root1 = self._find(self._slots[node_id1])
+        root2 = self._find(self._slots[node_id2])
+        if root1 == root2:
+            return
+        size = self._size
+        if size[root1] < size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        size[root1] += size[root2]
+
+    def union_all(self, node_ids):
+        """
+        Join components of all given nodes (e.g., hashtags of a tweet).
+        Input:
+            node_ids (list of int): ids of nodes
+        """
+        for node_id in node_ids[1:]:
+            self.union(node_ids[0], node_id)
+
+    def unlink(self, node_id1, node_id2):
+        """
+        Mark nodes of a removed link (their components are searched again at
+        the next query). O(1) time.
+        Input:
+            node_id1 (int): id of a node
+            node_id2 (int): id of a node
+        """
+        if self.stale:
+            return
+        self._touched.add(self._slots[node_id1])
+        self._touched.add(self._slots[node_id2])
+
+    def size(self, node_id, graph_structure):
+        """
+        Return the size of the component of a node. Components of touched
+        nodes are searched again first (O(size of those components)), or the
+        whole index is rebuilt if it is stale.
+        Input:
+            node_id (int): id of the node
+            graph_structure (list): sets of ids of neighbors (index: id, value:
+                                    set, or None if the id is not used)
+        Output:
+            (int): number of nodes in the component
+        """
+        if self.stale:
+            self.rebuild(graph_structure)
+        elif self._touched:
+            self._repair(graph_structure)
+        return self._size[self._find(self._slots[node_id])]
+
+    def rebuild(self, graph_structure):
+        """
+        Rebuild the index from the graph structure. O(N + E) time.
+        Input:
+            graph_structure (list): same as size
+        """
+        self._slots = array('l', [-1]) * len(graph_structure)
+        self._nodes = array('l')
+        self._parent = array('l')
+        self._size = array('l')
+        self._touched = set()
+        self.stale = False
+        for node_id, links_info in enumerate(graph_structure):
+            if links_info is not None:
+                self.add(node_id)
+        for node_id1, links_info in enumerate(graph_structure):
+            if links_info is None:
+                continue
+            for node_id2 in links_info:
+                if node_id1 < node_id2:
+                    self.union(node_id1, node_id2)
+
+    # ==== private methods from here on =====================
+    def _find(self, slot):
+        """
+        Return the root of the component of a slot (with path halving).
+        """
+        parent = self._parent
+        while parent[slot] != slot:
+            parent[slot] = parent[parent[slot]]
+            slot = parent[slot]
+        return slot
+
+    def _repair(self, graph_structure):
+        """
+        Search components of live touched nodes in the graph, and make the
+        slot of the touched node the root of each of them.
+        """
+        slots = self._slots
+        parent = self._parent
+        visited = set()
+        for slot in self._touched:
+            node_id = self._nodes[slot]
+            if slots[node_id] != slot or graph_structure[node_id] is None or \
+                    node_id in visited:
+                continue    # Removed (or reused), or already searched.
+            visited.add(node_id)
+            stack = [node_id]
+            num_nodes = 0
+            while stack:
+                node_id1 = stack.pop()
+                parent[slots[node_id1]] = slot
+                num_nodes += 1
+                for node_id2 in graph_structure[node_id1]:
+                    if node_id2 not in visited:
+                        visited.add(node_id2)
+                        stack.append(node_id2)
+            self._size[slot] = num_nodes
+        self._touched = set()
+
+    def _clear(self):
+        """
+        Drop all slots and mark the index as stale.
+        """
+        self._slots = array('l')
+        self._nodes = array('l')
+        self._parent = array('l')
+        self._size = array('l')
+        self._touched = set()
+        self.stale = True
+
+
+def main():
+    """
+    Testing classes
+    """
+    degrees = DegreeIndex()
+    components = ComponentIndex()
+    for node_id in xrange(5):
+        degrees.add(node_id)
+        components.add(node_id)
+    # Links: 0-1, 0-2, 3-4
+    for node_id1, node_id2 in [(0, 1), (0, 2), (3, 4)]:
+        components.union(node_id1, node_id2)
+    degrees.move(0, 0, 2)
+    degrees.move(1, 0, 1)
+    degrees.move(2, 0, 1)
+    degrees.move(3, 0, 1)
+    degrees.move(4, 0, 1)
+    print degrees.top(3), degrees.max_degree()
+    graph_structure = [set([1, 2]), set([0]), set([0]), set([4]), set([3])]
+    print [components.size(node_id, graph_structure) for node_id in xrange(5)]
+    # Link 0-2 is removed.
+    graph_structure[0].remove(2)
+    graph_structure[2].remove(0)
+    components.unlink(0, 2)
+    print [components.size(node_id, graph_structure) for node_id in xrange(5)]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# Opt-in instrumentation of the hot path (counters and time spent per stage),
+# to find out where a slow run spends its time: reading and parsing tweets,
+# adding (or updating) links, expiring old links, or writing the output.
+# Instrumented versions of classes are subclasses that count and time, and
+# they are used only when instrumentation is enabled, so that nothing is added
+# to the normal path (no hook is called when it is disabled).
+
+import sys
+import time
+
+from minpq import indexedMinPQ
+from timewheel import TimeWheel
+from expirylog import ExpiryLog
+from graph import TimeWindowGraph
+
+timer = time.time   # Timer for stages.
+
+class Stats:
+    """
+    Class for counters and time spent per stage.
+    (1) Counters: number of tweets, heap moves (entries moved by one level
+        while bubbling up or down), nodes created and removed, advances of the
+        current time, and links expired.
+    (2) Links expired per advance are also kept in a histogram with buckets
+        of powers of 2 (0, 1, 2-3, 4-7, ...), to find expiry storms.
+    (3) Time (seconds) is added per stage (e.g., 'parse', 'graph'). A stage
+        named 'stage.part' is a part of 'stage' (e.g., 'graph.expiry').
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.counters = {}  # dict (key: name, value: count)
+        self.times = {}     # dict (key: stage, value: seconds)
+        self.expired_histogram = [] # list (index: bucket, value: number of
+                                    # advances)
+        self.max_expired = 0    # Maximum number of links expired at once.
+        self._start = timer()   # Time when it started.
+
+    def count(self, name, number=1):
+        """
+        Add a number to a counter.
+        Input:
+            name (str): name of the counter
+            number (int): number to add (default: 1)
+        """
+        self.counters[name] = self.counters.get(name, 0) + number
+
+    def add_time(self, stage, seconds):
+        """
+        Add time spent for a stage.
+        Input:
+            stage (str): name of the stage
+            seconds (float): time spent
+        """
+        self.times[stage] = self.times.get(stage, 0.0) + seconds
+
+    def add_expired(self, number):
+        """
+        Record the number of links expired at an advance of the current time.
+        Input:
+            number (int): number of links expired
+        """
+        self.count('advances')
+        self.count('links_expired', number)
+        bucket = _bucket(number)
+        while len(self.expired_histogram) <= bucket:
+            self.expired_histogram.append(0)
+        self.expired_histogram[bucket] += 1
+        if number > self.max_expired:
+            self.max_expired = number
+
+    def report(self, f_out=sys.stderr, title="Instrumentation"):
+        """
+        Write counters, time per stage and the histogram of expired links.
+        Input:
+            f_out (file): file to write (default: standard error)
+            title (str): title of the report
+        """
+        elapsed = timer() - self._start
+        print >> f_out, "%s (%.3f s):" % (title, elapsed)
+        for name in sorted(self.counters):
+            print >> f_out, "  %-16s %12d" % (name, self.counters[name])
+        for stage in sorted(self.times):
+            seconds = self.times[stage]
+            print >> f_out, "  %-16s %12.3f s %6.1f%%" % (
+                stage, seconds, 100.0 * seconds / elapsed if elapsed else 0)
+        if self.expired_histogram:
+            print >> f_out, "  links expired per advance (max: %d):" % \
+                self.max_expired
+            for bucket, number in enumerate(self.expired_histogram):
+                if number > 0:
+                    low = (1 << bucket) >> 1
+                    print >> f_out, "    %8d-%-8d %12d" % (
+                        low, max((1 << bucket) - 1, 0), number)
+
+
+class InstrumentedMinPQ(indexedMinPQ):
+    """
+    indexedMinPQ that counts heap moves.
+    """
+    def __init__(self, stats, dtype='float'):
+        """
+        Constructor
+        Input:
+            stats (Stats): counters
+            dtype (str): type of values ('float' or 'int')
+        """
+        indexedMinPQ.__init__(self, dtype)
+        self.stats = stats
+
+    def _bubble_up(self, index):
+        key_id = self._heap[index]
+        indexedMinPQ._bubble_up(self, index)
+        self.stats.count('heap_moves', _level(index) -
+                         _level(self._position[key_id]))
+
+    def _bubble_down(self, index):
+        key_id = self._heap[index]
+        indexedMinPQ._bubble_down(self, index)
+        self.stats.count('heap_moves', _level(self._position[key_id]) -
+                         _level(index))
+
+
+class InstrumentedGraph(TimeWindowGraph):
+    """
+    TimeWindowGraph that counts nodes created and removed, and links expired
+    per advance of the current time, and times adding tweets ('graph') and
+    expiring old links ('graph.expiry').
+    """
+    def __init__(self, stats, window_size=60, expiry='heap',
+                 degree_stats=False):
+        """
+        Constructor
+        Input:
+            stats (Stats): counters
+            window_size, expiry, degree_stats: same as TimeWindowGraph
+        """
+        TimeWindowGraph.__init__(self, window_size, expiry, degree_stats)
+        self.stats = stats
+        # Heap moves are counted in the priority queue (or the overflow of the
+        # timing wheel or the expiry log).
+        if isinstance(self._linkheap, (TimeWheel, ExpiryLog)):
+            self._linkheap._overflow = InstrumentedMinPQ(stats, dtype='int')
+        else:
+            self._linkheap = InstrumentedMinPQ(stats, dtype='int')
+
+    def add_tweet(self, timestamp, hashtags):
+        start = timer()
+        in_window = TimeWindowGraph.add_tweet(self, timestamp, hashtags)
+        self.stats.add_time('graph', timer() - start)
+        self.stats.count('tweets')
+        return in_window
+
+    def set_current_time(self, time):
+        num_links = self.num_links
+        start = timer()
+        TimeWindowGraph.set_current_time(self, time)
+        self.stats.add_time('graph.expiry', timer() - start)
+        self.stats.add_expired(num_links - self.num_links)
+
+    def _intern(self, node):
+        self.stats.count('nodes_created')
+        return TimeWindowGraph._intern(self, node)
+
+    def _release(self, node_id):
+        self.stats.count('nodes_removed')
+        TimeWindowGraph._release(self, node_id)
+
+
+class TimedSink:
+    """
+    Sink that times writing the output ('output').
+    """
+    def __init__(self, sink, stats):
+        """
+        Constructor
+        Input:
+            sink: sink (e.g., TextSink)
+            stats (Stats): counters
+        """
+        self._sink = sink
+        self.stats = stats
+
+    def write(self, values):
+        start = timer()
+        self._sink.write(values)
+        self.stats.add_time('output', timer() - start)
+
+    def flush(self):
+        start = timer()
+        self._sink.flush()
+        self.stats.add_time('output', timer() - start)
+
+    def close(self):
+        start = timer()
+        self._sink.close()
+        self.stats.add_time('output', timer() - start)
+
+
+def timed_function(function, stats, stage):
+    """
+    Make a function that times the given function.
+    Input:
+        function: function
+        stats (Stats): counters
+        stage (str): name of the stage
+    Output:
+        function
+    """
+    def timed(*args):
+        start = timer()
+        result = function(*args)
+        stats.add_time(stage, timer() - start)
+        return result
+    return timed
+
+def timed_iter(iterable, stats, stage, report_every=0, f_out=sys.stderr):
+    """
+    Time getting items from an iterable (e.g., reading and parsing tweets),
+    and write the report every 'report_every' items.
+    Input:
+        iterable: iterable
+        stats (Stats): counters
+        stage (str): name of the stage
+        report_every (int): number of items between reports (0: no report)
+        f_out (file): file to write reports
+    Output:
+        (generator): same items
+    """
+    iterator = iter(iterable)
+    num_items = 0
+    while True:
+        start = timer()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            stats.add_time(stage, timer() - start)
+            return
+        stats.add_time(stage, timer() - start)
+        yield item
+        num_items += 1
+        if report_every > 0 and num_items % report_every == 0:
+            stats.report(f_out, "After %d tweets" % num_items)
+
+
+def _level(index):
+    """
+    Return the level of an index in the binary heap (root: 0).
+    """
+    return index.bit_length() - 1
+
+def _bucket(number):
+    """
+    Return the bucket of the histogram for a number (0: 0, 1: 1, 2: 2-3,
+    3: 4-7, ...).
+    """
+    return number.bit_length()
+
+
+def main():
+    """
+    Testing classes
+    """
+    stats = Stats()
+    gr = InstrumentedGraph(stats, window_size=5)
+    gr.add_tweet(1, ["a", "b", "c"])
+    gr.add_tweet(2, ["b", "d"])
+    gr.add_tweet(4, ["c", "d", "e"])
+    gr.add_tweet(9, ["a", "e"])
+    stats.report(sys.stdout)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
 # Class for the indexed priority queue. It uses the binary heap structure and a
-# dictionary to keep the index information for given key value. Each datapoint
-# will be (key, value), and the priority will be determined by the value.
+# dictionary to intern keys into integer ids. Each datapoint will be (key,
+# value), and the priority will be determined by the value. The heap itself
+# only stores integer ids, so that heap operations touch contiguous arrays
+# only.
 
-import numpy as np
+from array import array
+
+# Typecodes of array for dtype (names of numpy dtypes are accepted as well,
+# and 'int64' is 'l' (a C long, 64 bits on LP64 platforms)).
+_TYPECODES = {'int': 'l', 'float': 'd', 'int8': 'b', 'int16': 'h',
+              'int32': 'i', 'int64': 'l', 'uint8': 'B', 'uint16': 'H',
+              'uint32': 'I', 'float32': 'f', 'float64': 'd', 'double': 'd'}
 
 class indexedMinPQ:
     """
     Class for the indexed priority queue.
-    (1) It uses the binary heap structure.
-    (2) Two dictionaries to keep the relations between indices and keys value. 
+    (1) It uses the binary heap structure (represented by an array of ids).
+    (2) Keys are interned into integer ids (a dictionary), and positions in
+        the heap and values are stored in arrays indexed by ids.
     (3) Each datapoint will be (key, value) pair, and the priority will be 
         determined by the value.
     """
@@ -17,15 +26,19 @@ class indexedMinPQ:
         Constructor
         Input:
             dtype (str): datatype for values (ex: 'int', 'float') 
-                         (default: 'float')
+                         (default: 'float'), a key of _TYPECODES, or a type
+                         or numpy dtype with one of those names
         """
-        self._array = np.zeros(2, dtype=dtype)  
-                    # numpy array to store values for heap structure
-                    # (initially two elements are needed)
+        self._heap = array('l', [0])    # array of ids for heap structure
+                                        # (index 0 is not used)
         self._heap_size = 0 # Number of data points stored.
-        self._index_to_key = {}  # dict (key: index, value: key of the datapoint)
-                                # where 'index' is the index of self._array.
-        self._key_to_index = {}  # dict (key: key of the datapoint, value: index)
+        self._position = array('l') # array (index: id, value: index of
+                                    # self._heap)
+        self._values = array(_typecode(dtype))  # array (index: id, value:
+                                                # value of the datapoint)
+        self._keys = []     # list (index: id, value: key of the datapoint)
+        self._ids = {}      # dict (key: key of the datapoint, value: id)
+        self._free_ids = [] # ids of removed datapoints (to be recycled)
 
     def add(self, key, value):
         """ 
@@ -37,20 +50,24 @@ class indexedMinPQ:
             (bool): True if successful, False if not
         """
         # Do nothing, if key already exists.
-        if key in self._key_to_index:
+        if key in self._ids:
             return False
-        # Put the new value at the end of the heap.
-        self._array[self._heap_size + 1] = value
+        # Intern the key (recycle an id if possible).
+        if self._free_ids:
+            key_id = self._free_ids.pop()
+            self._keys[key_id] = key
+            self._values[key_id] = value
+        else:
+            key_id = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._position.append(0)
+        self._ids[key] = key_id
+        # Put the new id at the end of the heap.
+        self._heap.append(key_id)
         self._heap_size += 1
-        # Update dicts.
-        self._index_to_key[self._heap_size] = key
-        self._key_to_index[key] = self._heap_size
         # Heapify (it has to go up)
         self._bubble_up(self._heap_size)
-        # Resize self._array to double the size if heap_size reaches 
-        # the size of self._array.
-        if self._heap_size + 1 == len(self._array):
-            self._array = np.resize(self._array, len(self._array) * 2)
         return True
 
 
@@ -63,22 +80,24 @@ class indexedMinPQ:
             (bool): True if successful, False if not
         """
         # Do nothing, if key does not exist.
-        if key not in self._key_to_index:
+        if key not in self._ids:
             return False
-        # Find the index for the key.
-        index = self._key_to_index[key]
-        # Then swap this value with the last value in the heap.
-        self._swap(self._heap_size, index)
-        # Update dicts.
-        del self._key_to_index[self._index_to_key[self._heap_size]]
-        del self._index_to_key[self._heap_size]
+        key_id = self._ids.pop(key)
+        index = self._position[key_id]
+        self._keys[key_id] = None
+        self._free_ids.append(key_id)
+        # Move the last id in the heap to the index of the removed one.
+        last_id = self._heap.pop()
         self._heap_size -= 1
-        # Heapify.
-        self._bubble_down(index)
-        # Resize self._array to half the size if heap_size reaches
-        # a quarter of self._array (Note: it is a quarter, not a half.)
-        if self._heap_size <= len(self._array) / 4 and self._heap_size > 3:
-            self._array = np.resize(self._array, len(self._array)/2)
+        if index <= self._heap_size:
+            self._heap[index] = last_id
+            self._position[last_id] = index
+            # Heapify.
+            if index > 1 and self._values[last_id] < \
+                    self._values[self._heap[index >> 1]]:
+                self._bubble_up(index)
+            else:
+                self._bubble_down(index)
         return True
 
 
@@ -92,16 +111,17 @@ class indexedMinPQ:
             (bool): True if successful, False if not
         """
         # Do nothing, if key does not exist.
-        if key not in self._key_to_index:
+        if key not in self._ids:
             return False
-        # Update the value in self._array.
-        index = self._key_to_index[key]
-        self._array[index] = value
+        # Update the value in self._values.
+        key_id = self._ids[key]
+        old_value = self._values[key_id]
+        self._values[key_id] = value
         # Heapify based on the new value.
-        if value < self._array[self._parent(index)]:
-            self._bubble_up(index)
-        else:
-            self._bubble_down(index)
+        if value < old_value:
+            self._bubble_up(self._position[key_id])
+        elif value > old_value:
+            self._bubble_down(self._position[key_id])
         return True
 
 
@@ -111,8 +131,8 @@ class indexedMinPQ:
         Input:
             key: key of the datapoint
         """
-        if key in self._key_to_index:
-            return self._array[self._key_to_index[key]]
+        if key in self._ids:
+            return self._values[self._ids[key]]
         else:
             return None # If key doesn't exist.
 
@@ -125,7 +145,8 @@ class indexedMinPQ:
             return None, None   # No value to return
         else:
             # Value at the root of heap (minimum).
-            return self._index_to_key[1], self._array[1]   
+            key_id = self._heap[1]
+            return self._keys[key_id], self._values[key_id]
 
 
     def pop_min(self):
@@ -135,13 +156,72 @@ class indexedMinPQ:
         if self._heap_size == 0:
             return None, None   # No value to return
         # (key, value) pair to return.
-        key = self._index_to_key[1]
-        value = self._array[1]
+        key_id = self._heap[1]
+        key = self._keys[key_id]
+        value = self._values[key_id]
         # Remove (key, value) pair.
         self.remove(key)
         return key, value
 
 
+    def pop_min_until(self, threshold, limit=None):
+        """
+        Remove all datapoints whose values are less than or equal to threshold.
+        Input:
+            threshold: maximum value to be removed
+            limit (int): maximum number of datapoints removed (None: no limit)
+        Output:
+            (list): (key, value) pairs removed (in the order of values)
+        """
+        removed = []
+        while self._heap_size > 0 and \
+                self._values[self._heap[1]] <= threshold and \
+                len(removed) != limit:
+            removed.append(self.pop_min())
+        return removed
+
+
+    def items(self):
+        """
+        Return all (key, value) pairs (in the order of the heap).
+        Output:
+            (list): (key, value) pairs
+        """
+        keys = self._keys
+        values = self._values
+        return [(keys[key_id], values[key_id])
+                for key_id in self._heap[1:self._heap_size + 1]]
+
+
+    def load(self, keys, values):
+        """
+        Load (key, value) pairs into an empty priority queue at once (O(N)
+        time if values are sorted, O(NlogN) time if not).
+        Input:
+            keys (list): keys of datapoints (distinct)
+            values (list or array): values of datapoints
+        Output:
+            (bool): True if successful, False if the queue is not empty
+        """
+        if self._heap_size > 0 or self._free_ids:
+            return False
+        num_keys = len(keys)
+        self._keys = list(keys)
+        self._ids = dict(zip(self._keys, xrange(num_keys)))
+        self._values = array(self._values.typecode, values)
+        # A sorted array is a valid binary heap.
+        order = range(num_keys)
+        if any(values[i] > values[i+1] for i in xrange(num_keys - 1)):
+            order.sort(key=self._values.__getitem__)
+        self._heap = array('l', [0])
+        self._heap.extend(order)
+        self._position = array('l', [0]) * num_keys
+        for index in xrange(1, num_keys + 1):
+            self._position[self._heap[index]] = index
+        self._heap_size = num_keys
+        return True
+
+
     def size(self):
         """
         Returns the size of the priority queue
@@ -156,80 +236,83 @@ class indexedMinPQ:
         Write the stored data to that standard output.
         """
         for i in range(1, self._heap_size + 1):
-            print i, self._array[i], self._index_to_key[i]
+            key_id = self._heap[i]
+            print i, self._values[key_id], self._keys[key_id]
 
     # ==== private methods from here on =====================
-    def _swap(self, index1, index2):
-        """
-        Swapping two (key, value) pairs.
-        Input:
-            index1 (int): index of self._array for the first pair
-            index2 (int): index of self._array for the second pair
-        """
-        # swapping values
-        temp = self._array[index1]
-        self._array[index1] = self._array[index2]
-        self._array[index2] = temp
-        # swapping keys
-        key1 = self._index_to_key[index1]
-        key2 = self._index_to_key[index2]
-        self._index_to_key[index1] = key2
-        self._index_to_key[index2] = key1
-        self._key_to_index[key1] = index2
-        self._key_to_index[key2] = index1
-
     def _bubble_up(self, index):
         """
         If the value of the datapoint is not valid, goes up until valid.
+        (Parents are moved down into the hole instead of swapping.)
         Input:
-            index (int): index of the datapoint
+            index (int): index of self._heap for the datapoint
         """
-        while self._parent(index) >= 1 and \
-                self._array[self._parent(index)] > self._array[index]:
-            self._swap(index, self._parent(index))
-            index = self._parent(index)
+        heap = self._heap
+        position = self._position
+        values = self._values
+        key_id = heap[index]
+        value = values[key_id]
+        while index > 1:
+            parent = index >> 1
+            parent_id = heap[parent]
+            if values[parent_id] <= value:
+                break
+            heap[index] = parent_id
+            position[parent_id] = index
+            index = parent
+        heap[index] = key_id
+        position[key_id] = index
 
 
     def _bubble_down(self, index):
         """
         If the value of the datapoint is not valid, goes down until valid.
+        (Children are moved up into the hole instead of swapping.)
         Input:
-            index (int): index of the datapoint
+            index (int): index of self._heap for the datapoint
         """
-        while self._left(index) <= self._heap_size:
-            temp = self._left(index)
-            if temp < self._heap_size and \
-                self._array[temp] > self._array[self._right(index)]:
-                temp += 1
-            if self._array[temp] > self._array[index]:
+        heap = self._heap
+        position = self._position
+        values = self._values
+        heap_size = self._heap_size
+        key_id = heap[index]
+        value = values[key_id]
+        child = index << 1
+        while child <= heap_size:
+            child_id = heap[child]
+            child_value = values[child_id]
+            if child < heap_size:
+                right_id = heap[child + 1]
+                if values[right_id] < child_value:
+                    child += 1
+                    child_id = right_id
+                    child_value = values[right_id]
+            if child_value >= value:
                 break
-            self._swap(index, temp)
-            index = temp
-
-
-    def _parent(self, index):
-        """
-        Get the parent index for the given (key, value) pair.
-        Input:
-            index (int): index of self._array for the given (key, value) pair
-        """
-        return index / 2
+            heap[index] = child_id
+            position[child_id] = index
+            index = child
+            child = index << 1
+        heap[index] = key_id
+        position[key_id] = index
 
-    def _left(self, index):
-        """
-        Get the left-child index for the given (key, value) pair.
-        Input:
-            index (int): index of self._array for the given (key, value) pair
-        """
-        return index * 2
+def _typecode(dtype):
+    """
+    Return the typecode of array for dtype.
+    Input:
+        dtype (str, type or numpy dtype): datatype for values
+    Output:
+        (str): typecode
+    """
+    # int and float (or numpy.int32, etc.) have names, and numpy dtypes are
+    # converted to names by str().
+    name = getattr(dtype, '__name__', None) or str(dtype)
+    typecode = _TYPECODES.get(name)
+    if typecode is None:
+        raise ValueError("unsupported dtype: %r (supported: %s)" %
+                         (dtype, ', '.join(sorted(_TYPECODES))))
+    return typecode
 
-    def _right(self, index):
-        """
-        Get the right-child index for the given (key, value) pair.
-        Input:
-            index (int): index of self._array for the given (key, value) pair
-        """
-        return index * 2 + 1
 
 def main():
     pq = indexedMinPQ(dtype='int')
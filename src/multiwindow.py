@@ -0,0 +1,194 @@
+# Class that represents hashtag graphs for several (nested) window sizes at
+# once (e.g., 10 seconds, 1 minute, 5 minutes and 1 hour), so that one pass
+# over the stream of tweets gives average degrees for all windows. The graph
+# for the largest window (TimeWindowGraph) keeps node ids (interning) and the
+# graph structure, and every smaller window only keeps its own links (with
+# time values, to expire them) and the degrees of nodes in that window.
+
+from graph import TimeWindowGraph, make_expiry
+
+class MultiWindowGraph:
+    """
+    MultiWindowGraph class
+    (1) Window sizes are given as a list of integers, and the largest window
+        is kept by TimeWindowGraph.
+    (2) A link is in a smaller window if its latest time value in that window
+        is greater than (current time - window size). Since windows are
+        nested, links (and nodes) in a smaller window are also in all larger
+        windows.
+    (3) A tweet that is too old for the largest window is ignored. A tweet that
+        is too old for a smaller window only is ignored in that window.
+    """
+    def __init__(self, window_sizes, expiry='heap'):
+        """
+        Constructor
+        Input:
+            window_sizes (list of int): sizes of windows
+            expiry (str): data structure to expire old links ('heap',
+                          'wheel' or 'log') (default: 'heap')
+        """
+        self.window_sizes = list(window_sizes)  # Sizes of windows (in the
+                                                # given order).
+        max_size = max(self.window_sizes)
+        self._graph = TimeWindowGraph(window_size=max_size, expiry=expiry)
+                        # Graph for the largest window.
+        self._windows = []  # Smaller windows (distinct sizes only).
+        self._window_index = {} # dict (key: window size, value: _Window)
+        for size in sorted(set(self.window_sizes)):
+            if size < max_size:
+                window = _Window(size, expiry)
+                self._windows.append(window)
+                self._window_index[size] = window
+        self.current_time = 0   # Current time in int.
+
+    def add_tweet(self, timestamp, hashtags):
+        """
+        Add links for all pairs of (distinct) hashtags in a tweet to every
+        window (see TimeWindowGraph.add_tweet).
+        Input:
+            timestamp (int): time value of the tweet (non-negative)
+            hashtags (list): IDs of nodes (hashtags) in the tweet
+        Output:
+            (bool): True if the tweet is in the largest window, False if it is
+                    too old (nothing is changed in that case).
+        """
+        if timestamp <= self.current_time - self._graph.window_size:
+            return False
+        if timestamp > self.current_time:
+            # Smaller windows have to expire links before node ids of the
+            # largest window are released (and recycled).
+            self.current_time = timestamp
+            for window in self._windows:
+                window.set_current_time(timestamp)
+        self._graph.add_tweet(timestamp, hashtags)
+
+        windows = [window for window in self._windows
+                   if timestamp > self.current_time - window.window_size]
+        hashtags = set(hashtags)
+        if not windows or len(hashtags) < 2:
+            return True
+        node_id_list = sorted([self._graph.node_id(hashtag)
+                               for hashtag in hashtags])
+        links = [(node_id1 << 32) | node_id2
+                 for i, node_id1 in enumerate(node_id_list)
+                 for node_id2 in node_id_list[i+1:]]
+        for window in windows:
+            window.add_links(links, timestamp)
+        return True
+
+    def set_current_time(self, time):
+        """
+        Advance the current time of all windows (old links are removed).
+        Input:
+            time (int): current time (ignored if it is not greater)
+        """
+        if time > self.current_time:
+            self.current_time = time
+            for window in self._windows:
+                window.set_current_time(time)
+            self._graph.set_current_time(time)
+
+    def average_degree(self, window_size):
+        """
+        Return the average degree for a window.
+        Input:
+            window_size (int): size of the window (one of self.window_sizes)
+        Output:
+            (float): average degree
+        """
+        if window_size == self._graph.window_size:
+            return self._graph.average_degree()
+        else:
+            return self._window_index[window_size].average_degree()
+
+    def average_degrees(self):
+        """
+        Return average degrees for all windows.
+        Output:
+            (tuple of float): average degrees (in the order of
+                              self.window_sizes)
+        """
+        return tuple([self.average_degree(window_size)
+                      for window_size in self.window_sizes])
+
+
+class _Window:
+    """
+    Links and degrees of nodes for a smaller window (node ids come from the
+    graph for the largest window).
+    """
+    def __init__(self, window_size, expiry):
+        """
+        Constructor
+        Input:
+            window_size (int): size of the window
+            expiry (str): data structure to expire old links ('heap',
+                          'wheel' or 'log')
+        """
+        self.window_size = window_size
+        self.num_links = 0  # Number of links in the window.
+        self.num_nodes = 0  # Number of nodes (with links) in the window.
+        self._degrees = {}  # dict (key: node id, value: degree in the window)
+        self._linkheap = make_expiry(expiry, window_size)
+                            # (key: packed link, value: time)
+
+    def add_links(self, links, time):
+        """
+        Add links, or update time values of links that already exist.
+        Input:
+            links (list of int): packed links
+            time (int): time value of links
+        """
+        linkheap = self._linkheap
+        degrees = self._degrees
+        for link in links:
+            link_time = linkheap.value(link)
+            if link_time is None:
+                linkheap.add(link, time)
+                self.num_links += 1
+                for node_id in (link >> 32, link & 0xFFFFFFFF):
+                    degree = degrees.get(node_id, 0)
+                    if degree == 0:
+                        self.num_nodes += 1
+                    degrees[node_id] = degree + 1
+            elif link_time < time:
+                linkheap.update(link, time)
+
+    def set_current_time(self, time):
+        """
+        Remove links out of the window for the given current time.
+        Input:
+            time (int): current time
+        """
+        degrees = self._degrees
+        for link, link_time in \
+                self._linkheap.pop_min_until(time - self.window_size):
+            self.num_links -= 1
+            for node_id in (link >> 32, link & 0xFFFFFFFF):
+                degree = degrees[node_id] - 1
+                if degree == 0:
+                    del degrees[node_id]
+                    self.num_nodes -= 1
+                else:
+                    degrees[node_id] = degree
+
+    def average_degree(self):
+        if self.num_nodes == 0:
+            return 0
+        else:
+            return 2 * self.num_links/float(self.num_nodes)
+
+
+def main():
+    """
+    Testing the class
+    """
+    gr = MultiWindowGraph([2, 5])
+    print gr.add_tweet(1, ["a", "b"]), gr.average_degrees()
+    print gr.add_tweet(2, ["b", "c"]), gr.average_degrees()
+    print gr.add_tweet(4, ["c", "d", "e"]), gr.average_degrees()
+    print gr.add_tweet(3, ["a", "e"]), gr.average_degrees()
+    print gr.add_tweet(7, ["c", "d"]), gr.average_degrees()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Class for the normalization of hashtags in front of the graph. Hashtags are
+# case sensitive and may be written with compatibility characters (e.g.,
+# '#Spark', '#spark', and '#Spark' written in full-width letters), so they
+# are mapped to canonical tags (Unicode NFKC, then lower case) before links
+# are added.
+# Normalizing every hashtag of every tweet is expensive, but a few popular
+# hashtags appear in most tweets, so canonical tags are kept in a bounded LRU
+# cache (raw tag -> canonical tag), and hits and misses of the cache are
+# counted.
+
+import unicodedata
+
+_PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3 # Fields of a link of the LRU list.
+
+class HashtagNormalizer:
+    """
+    Class for the normalization of hashtags.
+    (1) The canonical tag of a hashtag is NFKC(hashtag).lower() (Python 2 has
+        no casefold, so lower() is used after NFKC).
+    (2) Canonical tags of recently used hashtags are kept in a dictionary of
+        links of a circular doubly linked list in the order of use (the least
+        recently used one first), and the least recently used one is evicted
+        when the cache is full. (OrderedDict does the same, but it is written
+        in Python in Python 2, and it is about 3 times slower.)
+    (3) Hashtags of a tweet are deduplicated after normalization (e.g.,
+        '#Spark' and '#spark' in one tweet give a single node).
+    """
+    def __init__(self, cache_size=10000):
+        """
+        Constructor
+        Input:
+            cache_size (int): maximum number of hashtags in the cache
+                              (default: 10000)
+        """
+        if cache_size < 1:
+            raise ValueError("cache size has to be positive: %r" % cache_size)
+        self.cache_size = cache_size
+        self.num_hits = 0       # Number of hashtags found in the cache.
+        self.num_misses = 0     # Number of hashtags normalized.
+        self.num_evictions = 0  # Number of hashtags evicted from the cache.
+        self._cache = {}    # dict (key: raw tag, value: link of the list)
+        self._root = []     # Root of the list ([prev, next, key, value]).
+        self._root[:] = [self._root, self._root, None, None]
+
+    def normalize(self, hashtag):
+        """
+        Return the canonical tag of a hashtag.
+        Input:
+            hashtag (unicode or str): raw hashtag (str is decoded as UTF-8)
+        Output:
+            (unicode): canonical tag
+        """
+        root = self._root
+        link = self._cache.get(hashtag)
+        if link is not None:
+            self.num_hits += 1
+            # Move the link to the end (the most recently used one).
+            prev, next = link[_PREV], link[_NEXT]
+            prev[_NEXT] = next
+            next[_PREV] = prev
+        else:
+            self.num_misses += 1
+            if isinstance(hashtag, str):
+                canonical = hashtag.decode('utf-8')
+            else:
+                canonical = hashtag
+            canonical = unicodedata.normalize('NFKC', canonical).lower()
+            if len(self._cache) >= self.cache_size:
+                # Evict the least recently used one.
+                oldest = root[_NEXT]
+                root[_NEXT] = oldest[_NEXT]
+                oldest[_NEXT][_PREV] = root
+                del self._cache[oldest[_KEY]]
+                self.num_evictions += 1
+            link = [None, None, hashtag, canonical]
+            self._cache[hashtag] = link
+        last = root[_PREV]
+        last[_NEXT] = root[_PREV] = link
+        link[_PREV] = last
+        link[_NEXT] = root
+        return link[_VALUE]
+
+    def normalize_all(self, hashtags):
+        """
+        Return canonical tags of hashtags of a tweet (without duplicates).
+        Input:
+            hashtags (list): raw hashtags
+        Output:
+            (list): canonical tags (sorted, distinct)
+        """
+        if not hashtags:
+            return hashtags
+        return sorted(set([self.normalize(hashtag) for hashtag in hashtags]))
+
+    def hit_rate(self):
+        """
+        Return the ratio of hashtags found in the cache (0 if none is looked
+        up).
+        """
+        num_lookups = self.num_hits + self.num_misses
+        if num_lookups == 0:
+            return 0
+        return self.num_hits / float(num_lookups)
+
+    def size(self):
+        """
+        Return the number of hashtags in the cache.
+        """
+        return len(self._cache)
+
+    def report(self, stream):
+        """
+        Write counts of the cache to a stream.
+        Input:
+            stream (file): output stream (e.g., sys.stderr)
+        """
+        print >> stream, "Hashtag cache: %d hits, %d misses (hit rate " \
+            "%.1f%%), %d evictions." % (self.num_hits, self.num_misses,
+                                        100 * self.hit_rate(),
+                                        self.num_evictions)
+
+
+def normalize_records(records, normalizer, with_offsets=False):
+    """
+    Normalize hashtags of (timestamp, hashtags) records.
+    Input:
+        records (iterable): (timestamp, hashtags) records, or (offset,
+                            (timestamp, hashtags)) if with_offsets is True
+        normalizer (HashtagNormalizer): normalizer of hashtags
+        with_offsets (bool): True if records come with offsets
+    Output:
+        (generator): records with canonical tags (in the same order)
+    """
+    normalize_all = normalizer.normalize_all
+    if with_offsets:
+        for offset, (timestamp, hashtags) in records:
+            yield offset, (timestamp, normalize_all(hashtags))
+    else:
+        for timestamp, hashtags in records:
+            yield timestamp, normalize_all(hashtags)
+
+
+def main():
+    """
+    Testing the class
+    """
+    normalizer = HashtagNormalizer(cache_size=3)
+    print normalizer.normalize_all([u'Spark', u'spark', u'\uff33park'])
+    # 'Spark' and 'spark' are cached, and 'Hadoop' evicts the full-width one.
+    print normalizer.normalize_all([u'Spark', u'spark', u'Hadoop'])
+    print normalizer.size(), normalizer.num_hits, normalizer.num_misses, \
+        normalizer.num_evictions
+    print "%.2f" % normalizer.hit_rate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# Offline (batch) engine to compute the average degree after every tweet of a
+# whole file at once with NumPy, instead of updating the graph tweet by tweet.
+# (1) Tweets are read into arrays: timestamps, and (tweet index, node id) rows
+#     for hashtags of tweets with two or more distinct hashtags. Pairs of
+#     hashtags (links) are made from these rows with array operations.
+# (2) With the running maximum T(i) of timestamps (the current time after the
+#     i-th tweet), a tweet is in the window if its timestamp > T(i-1) - window.
+# (3) A link is in the graph after the i-th tweet if and only if the maximum
+#     timestamp of (accepted) tweets up to i with that pair is greater than
+#     T(i) - window, and the same is true for a node (with tweets where the
+#     node has a link). So every occurrence of a pair (or a node) keeps it
+#     alive from that tweet until the next occurrence, or until the current
+#     time reaches (running maximum of its timestamps + window), whichever
+#     comes first. Numbers of links and nodes after every tweet are the
+#     cumulative sums of starts and ends of these intervals.
+# The result is the same as the result of TimeWindowGraph.add_tweet and
+# average_degree (the same floating-point operations).
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None   # The offline engine cannot be used without NumPy.
+
+def average_degree_series(records, window_size=60):
+    """
+    Compute the average degree after every tweet in the window.
+    Input:
+        records (iterable): (timestamp, hashtags) of tweets (in input order)
+        window_size (int): size of the window (default: 60)
+    Output:
+        (numpy.ndarray of float): average degrees (one for each tweet that is
+                                  not too old, in input order)
+    """
+    if np is None:
+        raise ImportError("the offline engine needs NumPy")
+    timestamps, row_tweets, row_nodes, num_nodes = _read(records)
+    num_tweets = len(timestamps)
+    if num_tweets == 0:
+        return np.zeros(0)
+
+    # Current time after each tweet, and tweets in the window (the graph
+    # starts at time 0).
+    current_times = np.maximum.accumulate(np.maximum(timestamps, 0))
+    previous_times = np.zeros(num_tweets, dtype=np.int64)
+    previous_times[1:] = current_times[:-1]
+    accepted = timestamps > previous_times - window_size
+
+    keep = accepted[row_tweets]
+    row_tweets = row_tweets[keep]
+    row_nodes = row_nodes[keep]
+    link_tweets, link_keys = _pairs(row_tweets, row_nodes, num_nodes)
+
+    num_links = _live_counts(link_tweets, link_keys, timestamps,
+                             current_times, window_size)
+    num_nodes = _live_counts(row_tweets, row_nodes, timestamps,
+                             current_times, window_size)
+    degrees = 2 * num_links / np.maximum(num_nodes, 1).astype(np.float64)
+    degrees[num_nodes == 0] = 0.0
+    return degrees[accepted]
+
+
+def _read(records):
+    """
+    Read tweets into arrays.
+    Input:
+        records (iterable): (timestamp, hashtags) of tweets
+    Output:
+        timestamps (numpy.ndarray): timestamp of each tweet
+        row_tweets (numpy.ndarray): tweet index of each row
+        row_nodes (numpy.ndarray): node id of each row (distinct hashtags of
+                                   tweets with two or more distinct hashtags)
+        num_nodes (int): number of distinct hashtags
+    """
+    node_ids = {}   # dict (key: hashtag, value: node id)
+    timestamps = array('l')
+    row_tweets = array('l')
+    row_nodes = array('l')
+    for index, (timestamp, hashtags) in enumerate(records):
+        timestamps.append(timestamp)
+        hashtags = set(hashtags)
+        if len(hashtags) < 2:
+            continue
+        for hashtag in hashtags:
+            node_id = node_ids.get(hashtag)
+            if node_id is None:
+                node_id = node_ids[hashtag] = len(node_ids)
+            row_nodes.append(node_id)
+        row_tweets.extend([index] * len(hashtags))
+    return (_to_numpy(timestamps), _to_numpy(row_tweets),
+            _to_numpy(row_nodes), len(node_ids))
+
+def _to_numpy(values):
+    """
+    Convert an array of integers into a NumPy array (int64). The buffer is
+    copied at once if C long is 64-bit.
+    """
+    if values.itemsize == 8:
+        return np.frombuffer(values, dtype=np.int64).copy()
+    return np.array(values, dtype=np.int64)
+
+def _pairs(row_tweets, row_nodes, num_nodes):
+    """
+    Make all pairs of nodes in each tweet.
+    Input:
+        row_tweets (numpy.ndarray): tweet index of each row (grouped)
+        row_nodes (numpy.ndarray): node id of each row
+        num_nodes (int): number of nodes
+    Output:
+        link_tweets (numpy.ndarray): tweet index of each pair
+        link_keys (numpy.ndarray): key of each pair (node_id1 * num_nodes +
+                                   node_id2, where node_id1 < node_id2)
+    """
+    order = np.lexsort((row_nodes, row_tweets))
+    tweets = row_tweets[order]
+    nodes = row_nodes[order]
+    num_rows = len(nodes)
+    if num_rows == 0:
+        return tweets, nodes
+    # Position of each row in its tweet, and the number of rows after it.
+    starts = np.ones(num_rows, dtype=bool)
+    starts[1:] = tweets[1:] != tweets[:-1]
+    start_indices = np.flatnonzero(starts)
+    sizes = np.diff(np.append(start_indices, num_rows))
+    positions = np.arange(num_rows) - np.repeat(start_indices, sizes)
+    counts = np.repeat(sizes, sizes) - positions - 1
+    # Every row is paired with all rows after it in the same tweet.
+    left = np.repeat(np.arange(num_rows), counts)
+    offsets = np.arange(len(left)) - np.repeat(np.cumsum(counts) - counts,
+                                               counts) + 1
+    right = left + offsets
+    return tweets[left], nodes[left] * num_nodes + nodes[right]
+
+def _live_counts(row_tweets, row_keys, timestamps, current_times,
+                 window_size):
+    """
+    Count keys (links or nodes) in the graph after every tweet.
+    Input:
+        row_tweets (numpy.ndarray): tweet index of each occurrence of a key
+                                    (tweets in the window only)
+        row_keys (numpy.ndarray): key of each occurrence
+        timestamps (numpy.ndarray): timestamp of each tweet
+        current_times (numpy.ndarray): current time after each tweet
+        window_size (int): size of the window
+    Output:
+        (numpy.ndarray): number of keys after each tweet
+    """
+    num_tweets = len(timestamps)
+    if len(row_keys) == 0:
+        return np.zeros(num_tweets, dtype=np.int64)
+    order = np.lexsort((row_tweets, row_keys))
+    keys = row_keys[order]
+    tweets = row_tweets[order]
+    times = timestamps[tweets]
+
+    # Running maximum of timestamps for each key (keys are sorted, and each
+    # key is shifted above all previous keys, so one running maximum works).
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = keys[1:] != keys[:-1]
+    groups = np.cumsum(starts) - 1
+    base = times.min()
+    span = times.max() - base + 1
+    shifts = groups * span
+    latest = np.maximum.accumulate(times - base + shifts) - shifts + base
+
+    # Each occurrence keeps the key until the next occurrence of the same key,
+    # or until the current time reaches latest + window_size.
+    expiries = np.searchsorted(current_times, latest + window_size,
+                               side='left')
+    next_tweets = np.empty(len(keys), dtype=np.int64)
+    next_tweets[:-1] = tweets[1:]
+    next_tweets[-1] = num_tweets
+    next_tweets[np.append(starts[1:], True)] = num_tweets
+    ends = np.minimum(expiries, next_tweets)
+    changes = np.bincount(tweets, minlength=num_tweets + 1) - \
+        np.bincount(ends, minlength=num_tweets + 1)
+    return np.cumsum(changes)[:num_tweets]
+
+
+def main():
+    """
+    Testing the function
+    """
+    records = [(1, ["a", "b"]), (2, ["b", "c"]), (4, ["c", "d", "e"]),
+               (3, ["a", "e"]), (7, ["c", "d"]), (1, ["a", "f"])]
+    for degree in average_degree_series(records, window_size=5):
+        print "%.2f" % degree
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# Class to read huge input files (tweets, one per line) through a memory map.
+# The file is split on newlines into byte ranges without copying it, and
+# lines can be read from any byte offset, so that a run can be resumed (or the
+# file can be split into shards processed in parallel).
+
+import mmap
+
+class MappedFile:
+    """
+    Class for a memory-mapped input file.
+    (1) Lines are found by searching newlines in the memory map, and each line
+        is represented by a byte range (start, end) where end includes the
+        newline.
+    (2) A range of lines [start, end) includes all lines starting in it, so
+        offsets should be the start of a line (or the size of the file).
+    (3) It can be used with 'with' statement.
+    """
+    def __init__(self, filename):
+        """
+        Constructor
+        Input:
+            filename (str): name of the file
+        """
+        self._file = open(filename, 'rb')
+        self._file.seek(0, 2)
+        self._size = self._file.tell()  # Size of the file (bytes).
+        if self._size > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        else:
+            self._map = ''  # An empty file cannot be mapped.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the memory map and the file.
+        """
+        if self._size > 0:
+            self._map.close()
+        self._file.close()
+
+    def size(self):
+        """
+        Returns the size of the file
+        Output:
+            size (int): number of bytes.
+        """
+        return self._size
+
+    def line_ranges(self, start=0, end=None):
+        """
+        Find byte ranges of lines starting in [start, end) (nothing is copied).
+        Input:
+            start (int): byte offset to start (start of a line) (default: 0)
+            end (int): byte offset to stop (default: size of the file)
+        Output:
+            (generator): (start, end) of every line, where end is the offset
+                         after the newline (the start of the next line).
+        """
+        if end is None or end > self._size:
+            end = self._size
+        find = self._map.find
+        while start < end:
+            newline = find('\n', start)
+            if newline < 0:  # Last line without a newline.
+                newline = self._size - 1
+            yield start, newline + 1
+            start = newline + 1
+
+    def lines(self, start=0, end=None):
+        """
+        Read lines starting in [start, end).
+        Input:
+            start (int): byte offset to start (start of a line) (default: 0)
+            end (int): byte offset to stop (default: size of the file)
+        Output:
+            (generator): every line (str, with the newline)
+        """
+        data = self._map
+        for line_start, line_end in self.line_ranges(start, end):
+            yield data[line_start:line_end]
+
+    def lines_with_offsets(self, start=0, end=None):
+        """
+        Read lines starting in [start, end) with their offsets.
+        Input:
+            start (int): byte offset to start (start of a line) (default: 0)
+            end (int): byte offset to stop (default: size of the file)
+        Output:
+            (generator): (offset, line) for every line, where offset is the
+                         offset after the line (a run can be resumed from it)
+        """
+        data = self._map
+        for line_start, line_end in self.line_ranges(start, end):
+            yield line_end, data[line_start:line_end]
+
+    def shard_offsets(self, num_shards, start=0, end=None):
+        """
+        Split the file (or lines starting in [start, end)) into shards
+        (contiguous ranges of lines) with almost the same number of bytes.
+        Input:
+            num_shards (int): number of shards
+            start (int): byte offset to start (start of a line) (default: 0)
+            end (int): byte offset to stop (default: size of the file)
+        Output:
+            (list): (start, end) offsets of shards (empty shards are removed)
+        """
+        if end is None or end > self._size:
+            end = self._size
+        offsets = [start]
+        for i in range(1, num_shards):
+            offset = max(self.line_start(start + (end - start) * i /
+                                         num_shards),
+                         offsets[-1])
+            offsets.append(min(offset, end))
+        offsets.append(end)
+        return [(offsets[i], offsets[i+1]) for i in range(num_shards)
+                if offsets[i] < offsets[i+1]]
+
+    def line_start(self, offset):
+        """
+        Find the start of the first line at or after the given offset.
+        Input:
+            offset (int): byte offset
+        Output:
+            (int): byte offset of the start of a line (or the size of the file)
+        """
+        if offset <= 0:
+            return 0
+        if offset >= self._size:
+            return self._size
+        newline = self._map.find('\n', offset - 1)
+        if newline < 0:
+            return self._size
+        return newline + 1
+
+
+def main():
+    """
+    Testing the class
+    """
+    import sys
+    with MappedFile(sys.argv[1]) as mf:
+        print "size:", mf.size()
+        for start, end in mf.shard_offsets(4):
+            print "shard:", start, end, len(list(mf.line_ranges(start, end)))
+
+if __name__ == "__main__":
+    main()
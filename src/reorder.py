@@ -0,0 +1,113 @@
+# Class for the reorder buffer in front of the graph. Tweets may arrive out of
+# order, so they are kept in a small buffer (a binary heap ordered by time)
+# until no earlier tweet is expected (within the given lateness bound), and
+# then released in time order. Released tweets always have non-decreasing
+# timestamps, so links are added to the graph in time order.
+
+import heapq
+
+class ReorderBuffer:
+    """
+    Class for the reorder buffer.
+    (1) A tweet is released when its timestamp is less than or equal to
+        (the latest timestamp seen so far - lateness).
+    (2) Tweets with the same timestamp are released in the order of arrival.
+    (3) A tweet that arrives after a later tweet has been released (more than
+        'lateness' seconds late) is dropped.
+    (4) It counts tweets that were reordered (arrived after a later tweet, but
+        released in time order) and dropped.
+    """
+    def __init__(self, lateness=5):
+        """
+        Constructor
+        Input:
+            lateness (int): maximum lateness (seconds) of tweets that can be
+                            reordered (default: 5)
+        """
+        self.lateness = lateness
+        self.num_reordered = 0  # Number of tweets reordered.
+        self.num_dropped = 0    # Number of tweets dropped (too late).
+        self._heap = []     # Binary heap of (timestamp, sequence, record).
+        self._sequence = 0  # Sequence number of arrivals (for ties).
+        self._max_time = -1     # Latest timestamp seen so far.
+        self._released_time = -1    # Latest timestamp released so far.
+
+    def push(self, timestamp, record):
+        """
+        Add a tweet, and release tweets that are ready.
+        Input:
+            timestamp (int): timestamp of the tweet
+            record: record of the tweet (e.g., (timestamp, hashtags))
+        Output:
+            (list): records released (in time order)
+        """
+        if timestamp < self._released_time:
+            self.num_dropped += 1
+            return []
+        if timestamp < self._max_time:
+            self.num_reordered += 1
+        else:
+            self._max_time = timestamp
+        heapq.heappush(self._heap, (timestamp, self._sequence, record))
+        self._sequence += 1
+        return self._release(self._max_time - self.lateness)
+
+    def flush(self):
+        """
+        Release all tweets in the buffer.
+        Output:
+            (list): records released (in time order)
+        """
+        return self._release(self._max_time)
+
+    def size(self):
+        """
+        Returns the number of tweets in the buffer
+        """
+        return len(self._heap)
+
+    def _release(self, threshold):
+        """
+        Release tweets whose timestamps are less than or equal to threshold.
+        Input:
+            threshold (int): maximum timestamp to be released
+        Output:
+            (list): records released (in time order)
+        """
+        heap = self._heap
+        released = []
+        while heap and heap[0][0] <= threshold:
+            timestamp, sequence, record = heapq.heappop(heap)
+            released.append(record)
+            self._released_time = timestamp
+        return released
+
+
+def reorder_records(records, reorder_buffer):
+    """
+    Reorder (timestamp, hashtags) records with a reorder buffer.
+    Input:
+        records (iterable): (timestamp, hashtags) records
+        reorder_buffer (ReorderBuffer): reorder buffer
+    Output:
+        (generator): records in time order (records that are too late are
+                     dropped)
+    """
+    for record in records:
+        for released in reorder_buffer.push(record[0], record):
+            yield released
+    for released in reorder_buffer.flush():
+        yield released
+
+
+def main():
+    """
+    Testing the class
+    """
+    buf = ReorderBuffer(lateness=2)
+    for timestamp in [1, 3, 2, 4, 1, 5, 2, 8, 7, 9]:
+        print timestamp, buf.push(timestamp, timestamp)
+    print buf.flush(), buf.num_reordered, buf.num_dropped
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+# Service mode: tweets arrive as newline-delimited json over TCP, a Unix socket
+# or the standard input (e.g., a pipe from a live feed), are added to
+# TimeWindowGraph as they arrive, and the average degree after every tweet is
+# sent back ("%.2f" per line, to the same connection, or to the standard output
+# for the standard input).
+# (1) One event loop (asyncore, select) reads from all connections without
+#     blocking. Lines received at once make a batch, which is parsed by a pool
+#     of worker processes (or in the loop with no worker), so the loop keeps
+#     reading and writing while tweets are parsed.
+# (2) Parsed batches are added to one graph (shared by all connections) in the
+#     order they were received.
+# (3) Backpressure: a connection is not read while too many batches of it are
+#     being parsed, or while too much output is waiting to be sent to it.
+# A stand-in producer (produce) sends a file of tweets to the service and
+# writes the average degrees sent back, to try the service locally.
+#
+# Usage: python src/service.py serve (--tcp HOST:PORT | --unix PATH | --stdin)
+#        python src/service.py produce (--tcp HOST:PORT | --unix PATH)
+#                                      input_file [output_file]
+
+import os
+import sys
+import time
+import socket
+import asyncore
+import argparse
+import functools
+import threading
+import multiprocessing
+
+from graph import TimeWindowGraph, EXPIRY_STRUCTURES
+from budgetedgraph import BudgetedGraph
+from normalize import HashtagNormalizer
+from sinks import format_row
+from average_degree import parse_lines
+
+class TweetService:
+    """
+    Class for the service (the graph, the pool of workers and the event loop).
+    """
+    def __init__(self, window_size=60, expiry='heap', workers=1,
+                 selective=False, max_batches=4, max_output=1 << 20,
+                 expiry_budget=None, normalize=False):
+        """
+        Constructor
+        Input:
+            window_size (int): size of the window (default: 60)
+            expiry (str): data structure to expire old links ('heap',
+                          'wheel' or 'log') (default: 'heap')
+            workers (int): number of worker processes to parse tweets (0:
+                           parse tweets in the event loop) (default: 1)
+            selective (bool): same as average_degree.parse_line
+            max_batches (int): maximum number of batches of a connection being
+                               parsed (default: 4)
+            max_output (int): maximum number of bytes waiting to be sent to a
+                              connection (default: 1MB)
+            expiry_budget (int): if not None, keep links in BudgetedGraph,
+                                 which removes at most this number of old
+                                 links per tweet (default: None)
+            normalize (bool): if True, hashtags are normalized and
+                              deduplicated (HashtagNormalizer) before they
+                              are added to the graph (default: False)
+        """
+        if expiry_budget is not None:
+            self.graph = BudgetedGraph(window_size=window_size, expiry=expiry,
+                                       budget=expiry_budget)
+        else:
+            self.graph = TimeWindowGraph(window_size=window_size,
+                                         expiry=expiry)
+        self.normalizer = HashtagNormalizer() if normalize else None
+        self.max_batches = max_batches
+        self.max_output = max_output
+        self._parse = functools.partial(parse_lines, selective=selective)
+        self._pool = multiprocessing.Pool(workers) if workers > 0 else None
+        self._pending = []  # (channel, result of parsing) in the order of
+                            # batches received.
+        self._map = {}      # Channels of the event loop.
+
+    def listen_tcp(self, host, port):
+        """
+        Accept connections on a TCP port.
+        """
+        _Server(self, self._map, socket.AF_INET, (host, port))
+
+    def listen_unix(self, path):
+        """
+        Accept connections on a Unix socket.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+        _Server(self, self._map, socket.AF_UNIX, path)
+
+    def read_stdin(self, f_out):
+        """
+        Read tweets from the standard input, and write average degrees to the
+        given file.
+        """
+        _PipeChannel(self, self._map, sys.stdin.fileno(), f_out)
+
+    def run(self):
+        """
+        Run the event loop until all channels are closed.
+        """
+        try:
+            while self._map:
+                # Results of parsing are checked often while there are some.
+                asyncore.loop(timeout=0.001 if self._pending else 0.05,
+                              map=self._map, count=1)
+                self._apply_parsed()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Close all channels and stop worker processes.
+        """
+        asyncore.close_all(map=self._map)
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def submit(self, channel, lines):
+        """
+        Parse a batch of lines (in a worker process if there is a pool).
+        Input:
+            channel: channel that received lines
+            lines (list of str): lines (tweets)
+        """
+        if self._pool is None:
+            self._pending.append((channel, self._parse(lines)))
+        else:
+            self._pending.append((channel,
+                                  self._pool.apply_async(self._parse,
+                                                         (lines,))))
+
+    # ==== private methods from here on =====================
+    def _apply_parsed(self):
+        """
+        Add parsed batches to the graph in order, and send average degrees
+        back to channels.
+        """
+        graph = self.graph
+        normalizer = self.normalizer
+        pending = self._pending
+        while pending:
+            channel, result = pending[0]
+            if isinstance(result, list):
+                records = result
+            elif result.ready():
+                try:
+                    records = result.get()
+                except Exception:
+                    # A worker could not parse the batch (e.g., a malformed
+                    # line): only this channel is closed (as a parsing error
+                    # in the event loop does), and its other batches are
+                    # dropped.
+                    channel.handle_error()
+                    pending[:] = [item for item in pending
+                                  if item[0] is not channel]
+                    continue
+            else:
+                break   # The oldest batch is not parsed yet.
+            pending.pop(0)
+            rows = []
+            for record in records:
+                if record is not None and normalizer is not None:
+                    record = (record[0], normalizer.normalize_all(record[1]))
+                # Control data (None) and too old tweets give no output.
+                if record is not None and graph.add_tweet(*record):
+                    rows.append(format_row((graph.average_degree(),)))
+            channel.batch_done(rows)
+
+
+class _LineInput:
+    """
+    Lines received by a channel are split and submitted in batches (mixed
+    into channels).
+    """
+    def _init_input(self, service):
+        self.service = service
+        self._partial = ''  # Last line received (without newline yet).
+        self._in_flight = 0 # Number of batches being parsed.
+        self._eof = False   # True if the input is closed.
+
+    def readable(self):
+        return not self._eof and \
+            self._in_flight < self.service.max_batches and \
+            not self._output_full()
+
+    def handle_read(self):
+        data = self.recv(65536)
+        if not data:
+            return  # handle_close was called.
+        lines = (self._partial + data).split('\n')
+        self._partial = lines.pop()
+        lines = [line for line in lines if line.strip()]
+        if lines:
+            self._submit(lines)
+
+    def handle_close(self):
+        # End of the input: the last line is submitted, and the channel is
+        # closed when all batches are done.
+        self._eof = True
+        if self._partial.strip():
+            self._submit([self._partial])
+        self._partial = ''
+        self._close_if_done()
+
+    def handle_error(self):
+        print >> sys.stderr, "Connection error:", sys.exc_info()[1]
+        self._eof = True
+        self.close()
+
+    def batch_done(self, rows):
+        """
+        Send rows of a batch back (called by the service).
+        Input:
+            rows (list of str): formatted average degrees
+        """
+        self._in_flight -= 1
+        if rows:
+            self._write_rows(rows)
+        self._close_if_done()
+
+    def _submit(self, lines):
+        self._in_flight += 1
+        self.service.submit(self, lines)
+
+
+class _Connection(_LineInput, asyncore.dispatcher):
+    """
+    Connection from a client (tweets in, average degrees out).
+    """
+    def __init__(self, service, socket_map, sock):
+        asyncore.dispatcher.__init__(self, sock, map=socket_map)
+        self._init_input(service)
+        self._output = ''   # Bytes waiting to be sent.
+        self._closed = False
+
+    def writable(self):
+        return len(self._output) > 0
+
+    def handle_write(self):
+        sent = self.send(self._output[:65536])
+        self._output = self._output[sent:]
+        self._close_if_done()
+
+    def close(self):
+        self._closed = True
+        asyncore.dispatcher.close(self)
+
+    def _output_full(self):
+        return len(self._output) >= self.service.max_output
+
+    def _write_rows(self, rows):
+        if not self._closed:    # The client may be gone already.
+            self._output += '\n'.join(rows) + '\n'
+
+    def _close_if_done(self):
+        if self._eof and self._in_flight == 0 and not self._output and \
+                not self._closed:
+            self.close()
+
+
+class _PipeChannel(_LineInput, asyncore.file_dispatcher):
+    """
+    Standard input (tweets in), and a file for average degrees (blocking, so
+    a slow reader of the output slows down reading the input).
+    """
+    def __init__(self, service, socket_map, fd, f_out):
+        asyncore.file_dispatcher.__init__(self, fd, map=socket_map)
+        self._init_input(service)
+        self._f_out = f_out
+
+    def writable(self):
+        return False
+
+    def _output_full(self):
+        return False
+
+    def _write_rows(self, rows):
+        self._f_out.write('\n'.join(rows) + '\n')
+        self._f_out.flush()
+
+    def _close_if_done(self):
+        if self._eof and self._in_flight == 0:
+            self.close()
+
+
+class _Server(asyncore.dispatcher):
+    """
+    Listening socket (TCP or Unix).
+    """
+    def __init__(self, service, socket_map, family, address):
+        asyncore.dispatcher.__init__(self, map=socket_map)
+        self.service = service
+        self._socket_map = socket_map
+        self.create_socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.set_reuse_addr()
+        self.bind(address)
+        self.listen(16)
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is not None:
+            _Connection(self.service, self._socket_map, pair[0])
+
+
+def produce(address, input_filename, f_out, rate=0):
+    """
+    Stand-in producer: send tweets in a file to the service, and write average
+    degrees sent back (received by another thread, so that sending never waits
+    for the output to be read).
+    Input:
+        address: (host, port) for TCP, or the path of a Unix socket
+        input_filename (str): name of the input file (tweets)
+        f_out (file): file to write average degrees
+        rate (float): tweets per second (0: as fast as possible)
+    """
+    family = socket.AF_INET if isinstance(address, tuple) else socket.AF_UNIX
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(address)
+
+    def receive():
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            f_out.write(data)
+    receiver = threading.Thread(target=receive)
+    receiver.start()
+    start = time.time()
+    with open(input_filename, 'r') as f_in:
+        for count, line in enumerate(f_in):
+            if rate > 0:
+                delay = start + count / rate - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            sock.sendall(line)
+    sock.shutdown(socket.SHUT_WR)
+    receiver.join()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='mode')
+    serve_parser = subparsers.add_parser(
+        'serve', help="add tweets to the graph and send average degrees back")
+    produce_parser = subparsers.add_parser(
+        'produce', help="send tweets in a file to the service (stand-in "
+                        "producer)")
+    for sub in (serve_parser, produce_parser):
+        sub.add_argument('--tcp', default=None, help="HOST:PORT")
+        sub.add_argument('--unix', default=None,
+                         help="path of a Unix socket")
+    serve_parser.add_argument('--stdin', action='store_true',
+                              help="read tweets from the standard input, "
+                                   "and write average degrees to the "
+                                   "standard output")
+    serve_parser.add_argument('--expiry', choices=EXPIRY_STRUCTURES,
+                              default='heap')
+    serve_parser.add_argument('--workers', type=int, default=1,
+                              help="number of worker processes to parse "
+                                   "tweets (default: 1, 0: parse in the "
+                                   "event loop)")
+    serve_parser.add_argument('--selective', action='store_true')
+    serve_parser.add_argument('--expiry-budget', type=int, default=None,
+                              help="remove at most this number of old links "
+                                   "per tweet (default: all at once)")
+    serve_parser.add_argument('--normalize', action='store_true',
+                              help="normalize hashtags (NFKC and lower "
+                                   "case), and write hit rates of the cache "
+                                   "to the standard error at the end")
+    produce_parser.add_argument('input', help="input file (tweets)")
+    produce_parser.add_argument('output', nargs='?', default=None,
+                                help="output file (default: standard output)")
+    produce_parser.add_argument('--rate', type=float, default=0,
+                                help="tweets per second (default: 0, as fast "
+                                     "as possible)")
+    args = parser.parse_args()
+    address = None
+    if args.tcp:
+        host, port = args.tcp.rsplit(':', 1)
+        address = (host, int(port))
+    elif args.unix:
+        address = args.unix
+
+    if args.mode == 'produce':
+        if address is None:
+            parser.error("produce needs --tcp or --unix")
+        if args.output is not None:
+            with open(args.output, 'w') as f_out:
+                produce(address, args.input, f_out, args.rate)
+        else:
+            produce(address, args.input, sys.stdout, args.rate)
+        return
+
+    if (address is None) == (not args.stdin):
+        parser.error("serve needs one of --tcp, --unix and --stdin")
+    f_out = sys.stdout
+    if args.stdin:
+        # Messages printed while parsing must not mix with average degrees.
+        sys.stdout = sys.stderr
+    service = TweetService(expiry=args.expiry, workers=args.workers,
+                           selective=args.selective,
+                           expiry_budget=args.expiry_budget,
+                           normalize=args.normalize)
+    if args.stdin:
+        service.read_stdin(f_out)
+    elif args.tcp:
+        service.listen_tcp(*address)
+    else:
+        service.listen_unix(address)
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        pass
+    if service.normalizer is not None:
+        service.normalizer.report(sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# Class that represents the hashtag graph with links partitioned into shards,
+# where each shard is kept by a worker process. With many hashtags in a tweet,
+# adding (or updating) links for all pairs and expiring old links take most of
+# the time, and shards do that work in parallel.
+# A link (pair of hashtags) belongs to one shard by the hash of its smaller
+# hashtag, so the coordinator (this process) splits the pairs of a tweet among
+# shards in O(k) time (k: number of hashtags), and each shard enumerates only
+# its own pairs (the pair work does not grow with the number of shards). Every
+# shard keeps its own links (with time values, to expire them) and degrees of
+# nodes in that shard, and reports, for each tweet, the change of the number of
+# its links and changes of node degrees. The coordinator merges them in the
+# order of tweets, so the average degree is exact for every tweet.
+
+import multiprocessing
+
+from graph import make_expiry
+
+class ShardedGraph:
+    """
+    ShardedGraph class
+    (1) Links are partitioned into shards by hash(hashtag1) of the pair
+        (hashtag1 < hashtag2), and each shard is kept by a worker process.
+    (2) Hashtags of a tweet are deduplicated and sorted once here, and every
+        shard receives the positions of the hashtags it owns (the first ones
+        of its pairs) with the hashtags from the first of them on, and only
+        adds pairs starting at those positions. Tweets are sent to all shards
+        in batches (every shard sees every timestamp, to expire its links).
+        The next batch is split while shards work on the previous one, and it
+        is sent after results of the previous batch are received but before
+        they are merged, so shards and the coordinator work at the same time,
+        and they never send to each other at once (a pipe only holds a
+        limited number of bytes, so both sides would block in sending).
+    (3) The degree of a node is the sum of its degrees in all shards, and the
+        coordinator keeps degrees of nodes (degree > 0) only.
+    (4) A tweet that is too old for the window is ignored (same as
+        TimeWindowGraph.add_tweet).
+    (5) It can be used with 'with' statement (worker processes are stopped at
+        the end).
+    """
+    def __init__(self, window_size=60, num_shards=2, expiry='heap'):
+        """
+        Constructor
+        Input:
+            window_size (int): size of the window (default: 60)
+            num_shards (int): number of shards (worker processes) (default: 2)
+            expiry (str): data structure to expire old links ('heap',
+                          'wheel' or 'log') (default: 'heap')
+        """
+        self.window_size = window_size
+        self.num_shards = num_shards
+        self.num_links = 0  # Total number of links.
+        self.num_nodes = 0  # Total number of nodes.
+        self.current_time = 0   # Current time in int.
+        self._degrees = {}  # dict (key: node, value: degree (> 0))
+        self._connections = []  # Connections (pipes) to worker processes.
+        self._processes = []    # Worker processes.
+        for index in range(num_shards):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_run_shard,
+                args=(worker_connection, index, num_shards, window_size,
+                      expiry))
+            process.daemon = True
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop worker processes.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except IOError:
+                pass    # The worker process is gone already.
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections = []
+        self._processes = []
+
+    def average_degrees(self, tweets, batch_size=1000):
+        """
+        Add tweets, and return the average degree after each tweet.
+        Input:
+            tweets (iterable): (timestamp, hashtags) of tweets
+            batch_size (int): number of tweets sent to shards at a time
+        Output:
+            (generator): average degree after each tweet (tweets that are too
+                         old are skipped)
+        """
+        batch = []
+        pending = None  # Batch sent to shards, but not merged yet.
+        for timestamp, hashtags in tweets:
+            # Too old tweets are dropped here (shards never see them).
+            if timestamp <= self.current_time - self.window_size:
+                continue
+            if timestamp > self.current_time:
+                self.current_time = timestamp
+            batch.append((timestamp, sorted(set(hashtags))))
+            if len(batch) >= batch_size:
+                for average_degree in self._exchange(pending, batch):
+                    yield average_degree
+                pending = batch
+                batch = []
+        for average_degree in self._exchange(pending, batch):
+            yield average_degree
+        if batch:
+            for average_degree in self._exchange(batch, []):
+                yield average_degree
+
+    def average_degree(self):
+        if self.num_nodes == 0:
+            return 0
+        else:
+            return 2 * self.num_links/float(self.num_nodes)
+
+    # ==== private methods from here on =====================
+    def _exchange(self, pending, batch):
+        """
+        Receive results of the pending batch from all shards, send the next
+        batch, and merge the results.
+        Input:
+            pending (list): (timestamp, hashtags) of tweets sent before (None
+                            if there is none)
+            batch (list): (timestamp, hashtags) of tweets to send (hashtags
+                          are sorted and distinct)
+        Output:
+            (generator): average degree after each tweet of the pending batch
+        """
+        parts = self._split(batch) if batch else None
+        if pending is not None:
+            results = [connection.recv() for connection in self._connections]
+        if parts is not None:
+            for connection, part in zip(self._connections, parts):
+                connection.send(part)
+        if pending is not None:
+            for average_degree in self._merge(pending, results):
+                yield average_degree
+
+    def _split(self, batch):
+        """
+        Split a batch of tweets into parts for shards (each shard receives its
+        own part of every tweet).
+        Input:
+            batch (list): (timestamp, hashtags) of tweets (hashtags are sorted
+                          and distinct)
+        Output:
+            parts (list): part of the batch for each shard
+        """
+        num_shards = self.num_shards
+        parts = [[] for _ in xrange(num_shards)]
+        for timestamp, hashtags in batch:
+            # Positions of hashtags owned by each shard (the last hashtag is
+            # not the first one of any pair).
+            starts = [[] for _ in xrange(num_shards)]
+            for i in xrange(len(hashtags) - 1):
+                starts[hash(hashtags[i]) % num_shards].append(i)
+            for part, positions in zip(parts, starts):
+                if positions:
+                    first = positions[0]
+                    part.append((timestamp, hashtags[first:],
+                                 [i - first for i in positions]))
+                else:
+                    part.append((timestamp, (), ()))
+        return parts
+
+    def _merge(self, batch, results):
+        """
+        Merge changes for a batch of tweets from all shards in the order of
+        tweets.
+        Input:
+            batch (list): (timestamp, hashtags) of tweets (sent before)
+            results (list): changes for the batch from each shard
+        Output:
+            (generator): average degree after each tweet
+        """
+        degrees = self._degrees
+        for i in xrange(len(batch)):
+            for changes in results:
+                links_delta, degree_changes = changes[i]
+                self.num_links += links_delta
+                for node, delta in degree_changes:
+                    degree = degrees.get(node, 0)
+                    if degree == 0:
+                        self.num_nodes += 1
+                    degree += delta
+                    if degree == 0:
+                        del degrees[node]
+                        self.num_nodes -= 1
+                    else:
+                        degrees[node] = degree
+            yield self.average_degree()
+
+
+class _Shard:
+    """
+    Links in a shard (kept by a worker process).
+    """
+    def __init__(self, index, num_shards, window_size, expiry):
+        """
+        Constructor
+        Input:
+            index (int): index of the shard
+            num_shards (int): number of shards
+            window_size (int): size of the window
+            expiry (str): data structure to expire old links ('heap',
+                          'wheel' or 'log')
+        """
+        self.index = index
+        self.num_shards = num_shards
+        self.window_size = window_size
+        self.current_time = 0   # Current time in int.
+        self._linkheap = make_expiry(expiry, window_size, int_keys=False)
+                            # (key: (node1, node2), value: time)
+
+    def add_tweets(self, tweets):
+        """
+        Add tweets (links of pairs in this shard only).
+        Input:
+            tweets (list): (timestamp, hashtags, starts) of tweets (in the
+                           window), where hashtags are sorted and distinct,
+                           and links of pairs (hashtags[i], hashtags[j]) for
+                           i in starts and j > i are in this shard
+        Output:
+            (list): (change of the number of links, list of (node, change of
+                    the degree)) for each tweet
+        """
+        linkheap = self._linkheap
+        results = []
+        for timestamp, hashtags, starts in tweets:
+            links_delta = 0
+            degree_changes = {}
+            if timestamp > self.current_time:
+                self.current_time = timestamp
+                for link, time in linkheap.pop_min_until(
+                        timestamp - self.window_size):
+                    links_delta -= 1
+                    for node in link:
+                        degree_changes[node] = degree_changes.get(node, 0) - 1
+            num_hashtags = len(hashtags)
+            for i in starts:
+                for j in xrange(i + 1, num_hashtags):
+                    link = (hashtags[i], hashtags[j])
+                    link_time = linkheap.value(link)
+                    if link_time is None:
+                        linkheap.add(link, timestamp)
+                        links_delta += 1
+                        for node in link:
+                            degree_changes[node] = \
+                                degree_changes.get(node, 0) + 1
+                    elif link_time < timestamp:
+                        linkheap.update(link, timestamp)
+            results.append((links_delta, [item for item in
+                                          degree_changes.iteritems()
+                                          if item[1] != 0]))
+        return results
+
+
+def _run_shard(connection, index, num_shards, window_size, expiry):
+    """
+    Main loop of a worker process: receive batches of tweets and send back
+    changes, until None is received.
+    Input:
+        connection (Connection): connection (pipe) to the coordinator
+        index (int): index of the shard
+        num_shards (int): number of shards
+        window_size (int): size of the window
+        expiry (str): data structure to expire old links
+    """
+    shard = _Shard(index, num_shards, window_size, expiry)
+    while True:
+        tweets = connection.recv()
+        if tweets is None:
+            break
+        connection.send(shard.add_tweets(tweets))
+    connection.close()
+
+
+def main():
+    """
+    Testing the class
+    """
+    tweets = [(1, ["a", "b"]), (2, ["b", "c"]), (4, ["c", "d", "e"]),
+              (3, ["a", "e"]), (7, ["c", "d"])]
+    with ShardedGraph(window_size=5, num_shards=3) as gr:
+        for average_degree in gr.average_degrees(tweets, batch_size=2):
+            print "%.2f" % average_degree, gr.num_nodes, gr.num_links
+
+if __name__ == "__main__":
+    main()
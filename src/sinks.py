@@ -0,0 +1,221 @@
+# Classes to write per-tweet results (e.g., average degrees) to the output
+# file. Every tweet produces one row of values, and rows are buffered and
+# written in batches instead of one small formatted write per tweet.
+# (1) TextSink: "%.2f" for each value (comma-separated), one row per line
+#     (default, the format of the coding challenge).
+# (2) RunLengthSink: same as TextSink, but repeated identical rows are
+#     collapsed into one line with the number of repetitions.
+# (3) BinarySink: fixed-width records of float32 values or centi-integers
+#     (int32, values * 100) in the native byte order, which can be loaded
+#     with numpy.memmap or array.fromfile.
+
+from array import array
+
+FORMATS = ['text', 'rle', 'float32', 'centi']  # Names of output formats.
+
+class TextSink:
+    """
+    Class to write rows as text ("%.2f" for each value, comma-separated).
+    """
+    def __init__(self, f_out, buffer_size=8192):
+        """
+        Constructor
+        Input:
+            f_out (file): output file
+            buffer_size (int): number of rows to keep before writing them
+        """
+        self._f_out = f_out
+        self._buffer_size = buffer_size
+        self._buffer = []   # Formatted rows not written yet.
+
+    def write(self, values):
+        """
+        Write a row.
+        Input:
+            values (tuple of float): values of the row
+        """
+        self._buffer.append(format_row(values))
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def write_line(self, line):
+        """
+        Write a line (already formatted, without the newline).
+        Input:
+            line (str): the line
+        """
+        self._buffer.append(line)
+        if len(self._buffer) >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered rows to the output file.
+        """
+        if self._buffer:
+            self._buffer.append("")
+            self._f_out.write("\n".join(self._buffer))
+            self._buffer = []
+
+    def close(self):
+        """
+        Write buffered rows (the output file is not closed).
+        """
+        self.flush()
+
+
+class RunLengthSink:
+    """
+    Class to write rows as text, where repeated identical rows (after
+    formatting) are collapsed into one line, "row count" (e.g., "1.34 3").
+    """
+    def __init__(self, f_out, buffer_size=8192):
+        """
+        Constructor
+        Input:
+            f_out (file): output file
+            buffer_size (int): number of lines to keep before writing them
+        """
+        self._sink = TextSink(f_out, buffer_size)
+        self._row = None    # Row (formatted) repeated now.
+        self._count = 0     # Number of repetitions of self._row.
+
+    def write(self, values):
+        """
+        Write a row.
+        Input:
+            values (tuple of float): values of the row
+        """
+        row = format_row(values)
+        if row == self._row:
+            self._count += 1
+        else:
+            self._end_run()
+            self._row = row
+            self._count = 1
+
+    def flush(self):
+        """
+        Write buffered lines to the output file (the current run is kept, since
+        it may continue).
+        """
+        self._sink.flush()
+
+    def close(self):
+        """
+        Write the current run and buffered lines (the output file is not
+        closed).
+        """
+        self._end_run()
+        self._row = None
+        self._sink.close()
+
+    def _end_run(self):
+        """
+        Put the current run into the buffer.
+        """
+        if self._count > 0:
+            self._sink.write_line("%s %d" % (self._row, self._count))
+            self._count = 0
+
+
+class BinarySink:
+    """
+    Class to write rows as fixed-width binary records in the native byte order.
+    (1) 'float32': each value is a float32.
+    (2) 'centi': each value is an int32 of value * 100, rounded in the same way
+        as "%.2f" (so it is compatible with the text format).
+    """
+    def __init__(self, f_out, fmt='float32', buffer_size=8192):
+        """
+        Constructor
+        Input:
+            f_out (file): output file (opened in binary mode)
+            fmt (str): 'float32' or 'centi' (default: 'float32')
+            buffer_size (int): number of rows to keep before writing them
+        """
+        if fmt not in ('float32', 'centi'):
+            raise ValueError("unknown binary format: %r" % fmt)
+        self._f_out = f_out
+        self._centi = (fmt == 'centi')
+        self._typecode = 'i' if self._centi else 'f'
+        self._buffer_size = buffer_size
+        self._num_rows = 0  # Number of rows in the buffer.
+        self._buffer = array(self._typecode)
+
+    def write(self, values):
+        """
+        Write a row.
+        Input:
+            values (tuple of float): values of the row
+        """
+        if self._centi:
+            self._buffer.extend([int(("%.2f" % value).replace(".", ""))
+                                 for value in values])
+        else:
+            self._buffer.extend(values)
+        self._num_rows += 1
+        if self._num_rows >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered rows to the output file.
+        """
+        if self._num_rows > 0:
+            self._buffer.tofile(self._f_out)
+            self._buffer = array(self._typecode)
+            self._num_rows = 0
+
+    def close(self):
+        """
+        Write buffered rows (the output file is not closed).
+        """
+        self.flush()
+
+
+_ROW_FORMATS = {}   # dict (key: number of values, value: format string)
+
+def format_row(values):
+    """
+    Format a row as text ("%.2f" for each value, comma-separated).
+    Input:
+        values (tuple of float): values of the row
+    Output:
+        (str): formatted row (without the newline)
+    """
+    row_format = _ROW_FORMATS.get(len(values))
+    if row_format is None:
+        row_format = ",".join(["%.2f"] * len(values))
+        _ROW_FORMATS[len(values)] = row_format
+    return row_format % values
+
+def make_sink(f_out, fmt='text', buffer_size=8192):
+    """
+    Make a sink for the given output format.
+    Input:
+        f_out (file): output file (binary mode for 'float32' and 'centi')
+        fmt (str): one of FORMATS (default: 'text')
+        buffer_size (int): number of rows (or lines) to keep before writing
+    Output:
+        sink: TextSink, RunLengthSink or BinarySink
+    """
+    if fmt == 'text':
+        return TextSink(f_out, buffer_size)
+    elif fmt == 'rle':
+        return RunLengthSink(f_out, buffer_size)
+    elif fmt in ('float32', 'centi'):
+        return BinarySink(f_out, fmt, buffer_size)
+    else:
+        raise ValueError("unknown output format: %r" % fmt)
+
+def is_binary(fmt):
+    """
+    Check if the output format is binary (the output file should be opened in
+    binary mode).
+    Input:
+        fmt (str): one of FORMATS
+    Output:
+        (bool): True if binary, False if not
+    """
+    return fmt in ('float32', 'centi')
@@ -0,0 +1,91 @@
+# Functions to parse the 'created_at' field of tweets. The format is fixed
+# (e.g., "Thu Nov 05 05:05:39 +0000 2015"), so fields are sliced directly and
+# UTC epoch seconds are computed without any locale or timezone lookup.
+# Fields are checked as strictly as time.strptime does (e.g., the day has to
+# exist in the month), so a malformed string raises ValueError.
+# Consecutive tweets almost always have the same (or an adjacent) second, so
+# recently parsed strings are cached.
+
+import calendar
+
+_MONTHS = {'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+           'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12}
+_WEEKDAYS = set(['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'])
+
+_CACHE_SIZE = 16    # Number of recently parsed strings to keep.
+_cache = {}         # dict (key: string, value: timestamp)
+_day_cache = {}     # dict (key: (weekday, month, day, year) string, value:
+                    # epoch seconds at the start of the day)
+
+def parse_created_at(str_time):
+    """
+    Parse the 'created_at' field of a tweet into UTC epoch seconds.
+    Input:
+        str_time (str): time string (e.g., "Thu Nov 05 05:05:39 +0000 2015")
+    Output:
+        timestamp (int): epoch seconds (UTC)
+    """
+    timestamp = _cache.get(str_time)
+    if timestamp is not None:
+        return timestamp
+    if len(str_time) != 30 or str_time[19:26] != ' +0000 ':
+        raise ValueError("time data %r does not match format "
+                         "'%%a %%b %%d %%H:%%M:%%S +0000 %%Y'" % str_time)
+    day = str_time[:10] + str_time[26:30]   # e.g., "Thu Nov 052015"
+    day_start = _day_cache.get(day)
+    if day_start is None:
+        day_start = _parse_day(str_time)
+        _day_cache[day] = day_start
+    try:
+        hour = int(str_time[11:13])
+        minute = int(str_time[14:16])
+        second = int(str_time[17:19])
+    except ValueError:
+        hour = -1
+    # Same ranges as time.strptime (leap seconds 60 and 61 included).
+    if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 61) or \
+            str_time[13] != ':' or str_time[16] != ':':
+        raise ValueError("time data %r does not match format "
+                         "'%%a %%b %%d %%H:%%M:%%S +0000 %%Y'" % str_time)
+    timestamp = day_start + hour * 3600 + minute * 60 + second
+    if len(_cache) >= _CACHE_SIZE:
+        _cache.clear()
+    _cache[str_time] = timestamp
+    return timestamp
+
+def _parse_day(str_time):
+    """
+    Compute epoch seconds at the start of the day for a time string.
+    Input:
+        str_time (str): time string (e.g., "Thu Nov 05 05:05:39 +0000 2015")
+    Output:
+        (int): epoch seconds (UTC) at 00:00:00 of the day
+    """
+    try:
+        month = _MONTHS[str_time[4:7]]
+        day = int(str_time[8:10])
+        year = int(str_time[26:30])
+    except (KeyError, ValueError):
+        month = None
+    if month is None or str_time[:3] not in _WEEKDAYS or \
+            str_time[3] != ' ' or str_time[7] != ' ' or str_time[10] != ' ':
+        raise ValueError("time data %r does not match format "
+                         "'%%a %%b %%d %%H:%%M:%%S +0000 %%Y'" % str_time)
+    if not 1 <= day <= calendar.monthrange(year, month)[1]:
+        raise ValueError("day is out of range for month: %r" % str_time)
+    return calendar.timegm((year, month, day, 0, 0, 0))
+
+def main():
+    """
+    Testing the function
+    """
+    print parse_created_at("Thu Nov 05 05:05:39 +0000 2015")
+    print parse_created_at("Fri Jan 01 00:00:00 +0000 2016")
+    print parse_created_at("Mon Feb 29 12:00:00 +0000 2016")
+    try:
+        parse_created_at("Sat Feb 30 10:00:00 +0000 2016")
+    except ValueError as error:
+        print error
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# Class for the timing wheel. It is a ring of buckets (one bucket per time
+# unit), and each datapoint will be (key, value) where value is an integer
+# time.
+# Keys are moved between buckets when their values are updated, and expiring
+# old datapoints drops whole buckets at once, so it can be used instead of
+# indexedMinPQ when values are integer times inside a fixed-size window.
+
+from minpq import indexedMinPQ
+
+class TimeWheel:
+    """
+    Class for the timing wheel.
+    (1) It uses a ring of buckets (sets of keys), one for each time unit.
+    (2) A bucket holds keys with one time value only; keys whose time cannot
+        share the ring with others (e.g., far older than the window) are kept
+        in an overflow indexedMinPQ.
+    (3) Each datapoint will be (key, value) pair, and value is a non-negative
+        integer (time).
+    (4) Expiring old datapoints costs O(1) amortized per datapoint.
+    """
+    def __init__(self, size=60):
+        """
+        Constructor
+        Input:
+            size (int): number of buckets in the ring (window size)
+                        (default: 60)
+        """
+        self._size = size   # Number of buckets.
+        self._buckets = [set() for _ in range(size)]
+                            # Ring of buckets (set of keys), where the index
+                            # of the bucket is (time % size).
+        self._bucket_time = [-1] * size # Time value for each bucket
+                                        # (-1 if the bucket is empty).
+        self._values = {}   # dict (key: key of the datapoint, value: time)
+        self._cursor = 0    # Every time value stored in the ring is greater
+                            # than or equal to this value.
+        self._overflow = indexedMinPQ(dtype='int')
+                            # Datapoints that cannot be stored in the ring.
+
+    def add(self, key, value):
+        """
+        Add a new (key, value) pair. Do nothing, if key exists already.
+        Input:
+            key: key of the datapoint
+            value (int): value (time) of the datapoint.
+        Output:
+            (bool): True if successful, False if not
+        """
+        if key in self._values:
+            return False
+        self._values[key] = value
+        self._insert(key, value)
+        return True
+
+
+    def remove(self, key):
+        """
+        Remove information about (key, value) pair based on key
+        Input:
+            key: key of the datapoint.
+        Output:
+            (bool): True if successful, False if not
+        """
+        if key not in self._values:
+            return False
+        self._delete(key, self._values.pop(key))
+        return True
+
+
+    def update(self, key, value):
+        """
+        Update the value of the given key with the given value (the key moves
+        to the bucket for the new value).
+        Input:
+            key: key of the dataporint
+            value (int): value (time) of the datapoint
+        Output:
+            (bool): True if successful, False if not
+        """
+        if key not in self._values:
+            return False
+        self._delete(key, self._values[key])
+        self._values[key] = value
+        self._insert(key, value)
+        return True
+
+
+    def value(self, key):
+        """
+        Return the value associated the given key
+        Input:
+            key: key of the datapoint
+        """
+        return self._values.get(key) # None if key doesn't exist.
+
+
+    def peek_min(self):
+        """
+        Peek the minimum value and return (key, value) pair.
+        (O(size) time, since the ring has to be scanned.)
+        """
+        if not self._values:
+            return None, None   # No value to return
+        index = self._min_bucket()
+        key, value = self._overflow.peek_min()
+        if index >= 0 and (value is None or self._bucket_time[index] < value):
+            value = self._bucket_time[index]
+            for key in self._buckets[index]:
+                break   # Any key in the bucket.
+        return key, value
+
+
+    def pop_min(self):
+        """
+        Get the minimum value and its associated key, and remove the datapoint.
+        """
+        key, value = self.peek_min()
+        if key is not None:
+            self.remove(key)
+        return key, value
+
+
+    def pop_min_until(self, threshold, limit=None):
+        """
+        Remove all datapoints whose values are less than or equal to threshold.
+        Buckets are dropped as a whole (a bucket is emptied key by key only if
+        it has more keys than the limit allows).
+        Input:
+            threshold (int): maximum value to be removed
+            limit (int): maximum number of datapoints removed (None: no limit)
+        Output:
+            (list): (key, value) pairs removed
+        """
+        removed = self._overflow.pop_min_until(threshold, limit)
+        for key, value in removed:
+            del self._values[key]
+        if threshold < self._cursor or len(removed) == limit:
+            return removed
+        if threshold - self._cursor < self._size:
+            # Only buckets between the cursor and threshold can be expired.
+            indices = [time % self._size
+                       for time in xrange(self._cursor, threshold + 1)]
+        else:
+            indices = xrange(self._size)
+        for index in indices:
+            value = self._bucket_time[index]
+            if 0 <= value <= threshold:
+                bucket = self._buckets[index]
+                if limit is not None and len(removed) + len(bucket) >= limit:
+                    # The cursor stays, so the rest is expired later.
+                    while len(removed) < limit:
+                        key = bucket.pop()
+                        del self._values[key]
+                        removed.append((key, value))
+                    if not bucket:
+                        self._bucket_time[index] = -1
+                    return removed
+                for key in bucket:
+                    del self._values[key]
+                    removed.append((key, value))
+                self._buckets[index] = set()
+                self._bucket_time[index] = -1
+        self._cursor = threshold + 1
+        return removed
+
+
+    def items(self):
+        """
+        Return all (key, value) pairs (in no particular order).
+        Output:
+            (list): (key, value) pairs
+        """
+        return self._values.items()
+
+
+    def load(self, keys, values):
+        """
+        Load (key, value) pairs into an empty timing wheel at once.
+        Input:
+            keys (list): keys of datapoints (distinct)
+            values (list or array): values (times) of datapoints
+        Output:
+            (bool): True if successful, False if the timing wheel is not empty
+        """
+        if self._values:
+            return False
+        self._values = dict(zip(keys, values))
+        for key, value in self._values.iteritems():
+            self._insert(key, value)
+        return True
+
+
+    def size(self):
+        """
+        Returns the size of the timing wheel
+        Output:
+            size (int): number of (key, value) pairs.
+        """
+        return len(self._values)
+
+
+    def write(self):
+        """
+        Write the stored data to that standard output.
+        """
+        for index in range(self._size):
+            if self._bucket_time[index] >= 0:
+                print index, self._bucket_time[index], \
+                    list(self._buckets[index])
+        self._overflow.write()
+
+    # ==== private methods from here on =====================
+    def _insert(self, key, value):
+        """
+        Put a key into the bucket for the given value (or into the overflow
+        priority queue if that bucket is used by another value).
+        Input:
+            key: key of the datapoint
+            value (int): value (time) of the datapoint
+        """
+        index = value % self._size
+        if self._bucket_time[index] == value:
+            self._buckets[index].add(key)
+        elif self._bucket_time[index] < 0:
+            self._buckets[index].add(key)
+            self._bucket_time[index] = value
+            if value < self._cursor:
+                self._cursor = value
+        else:
+            self._overflow.add(key, value)
+
+    def _delete(self, key, value):
+        """
+        Take a key out of the bucket (or the overflow priority queue).
+        Input:
+            key: key of the datapoint
+            value (int): value (time) of the datapoint
+        """
+        index = value % self._size
+        bucket = self._buckets[index]
+        if self._bucket_time[index] == value and key in bucket:
+            bucket.remove(key)
+            if len(bucket) == 0:
+                self._bucket_time[index] = -1
+        else:
+            self._overflow.remove(key)
+
+    def _min_bucket(self):
+        """
+        Find the index of the non-empty bucket with the minimum value.
+        Output:
+            index (int): index of the bucket (-1 if all buckets are empty)
+        """
+        min_index = -1
+        for index in range(self._size):
+            value = self._bucket_time[index]
+            if value >= 0 and (min_index < 0 or
+                               value < self._bucket_time[min_index]):
+                min_index = index
+        return min_index
+
+
+def main():
+    tw = TimeWheel(size=5)
+    tw.add('a', 5)
+    tw.add('b', 4)
+    tw.add('c', 3)
+    tw.add('d', 2)
+    tw.add('e', 6)
+    tw.write()
+    print tw.value('a')
+    print tw.value('e')
+    tw.update('d', 7)   # Moves 'd' to the bucket for 7 (shared with 2).
+    tw.write()
+    print tw.peek_min()
+    print tw.pop_min_until(4)
+    tw.write()
+    print tw.pop_min()
+    tw.write()
+    tw.remove('e')
+    tw.write()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# Functions to extract the timestamp and hashtags of a tweet directly from the
+# raw line (json), without decoding the whole line. Only 'created_at' and
+# 'entities' -> 'hashtags' -> 'text' are needed, so they are found with
+# precompiled patterns. If a line is ambiguous (e.g., nested tweets with their
+# own hashtags, unexpected field orders), None is returned and the caller has
+# to fall back to json.loads.
+
+import re
+import json
+
+from timeparse import parse_created_at
+
+# A tweet starts with 'created_at' and 'id' (so it has at least 3 fields, and
+# it is not control data).
+_HEAD = re.compile(r'\{"created_at":"([^"\\]{30})","id":\d+,"')
+# 'hashtags' has to be the first field of the top-level 'entities'.
+_ENTITIES = '"entities":{"hashtags":['
+_HASHTAG = r'\{"text":"(?:[^"\\]|\\.)*","indices":\[\d+,\d+\]\}'
+_HASHTAG_ARRAY = re.compile(r'\[(?:%s(?:,%s)*)?\]' % (_HASHTAG, _HASHTAG))
+_HASHTAG_TEXT = re.compile(r'\{"text":"((?:[^"\\]|\\.)*)"')
+
+def scan_tweet(line):
+    """
+    To extract timestamp and a list of hashtags from a line without decoding
+    the whole json.
+    Input:
+        line (str): a line from the input file (a tweet in json format)
+    Output:
+        (tuple): (timestamp, hashtags) as extract_data, or None if the line
+                 cannot be handled here (json.loads has to be used).
+    """
+    head = _HEAD.match(line)
+    if head is None:
+        return None
+    # There has to be only one list of hashtags in the line.
+    index = line.find(_ENTITIES)
+    if index < 0 or line.count('"hashtags":') != 1:
+        return None
+    # 'entities' has to be a field of the tweet itself (depth 1), not of a
+    # nested object.
+    if _depth(line[:index]) != 1:
+        return None
+    start = index + len(_ENTITIES) - 1
+    array = _HASHTAG_ARRAY.match(line, start)
+    if array is None:
+        return None
+
+    hashtags = []
+    for text in _HASHTAG_TEXT.findall(line, start, array.end()):
+        if '\\' in text:
+            hashtags.append(json.loads('"%s"' % text))
+        else:
+            hashtags.append(text.decode('utf-8'))
+    hashtags.sort()
+    return parse_created_at(head.group(1)), hashtags
+
+def scan_timestamp(line):
+    """
+    To extract only the timestamp from a line without decoding the json.
+    Input:
+        line (str): a line from the input file (a tweet in json format)
+    Output:
+        (int): timestamp as extract_data, or None if the line cannot be
+               handled here (json.loads has to be used).
+    """
+    head = _HEAD.match(line)
+    if head is None:
+        return None
+    return parse_created_at(head.group(1))
+
+def _depth(prefix):
+    """
+    Compute the depth of objects and arrays at the end of a prefix of json.
+    Escaped backslashes and quotes are removed first, so that the remaining
+    quotes split the prefix into strings and the others.
+    Input:
+        prefix (str): a prefix of a json (it has to end outside of strings)
+    Output:
+        (int): depth (1 for fields of the top-level object), or -1 if arrays
+               are open.
+    """
+    pieces = prefix.replace('\\\\', '').replace('\\"', '').split('"')
+    outside = ''.join(pieces[::2])  # Pieces outside of strings.
+    if outside.count('[') != outside.count(']'):
+        return -1
+    return outside.count('{') - outside.count('}')
+
+def main():
+    """
+    Testing the function
+    """
+    lines = [
+        '{"created_at":"Thu Nov 05 05:05:39 +0000 2015","id":1,"text":"a",'
+        '"entities":{"hashtags":[{"text":"b","indices":[0,2]},'
+        '{"text":"caf\\u00e9","indices":[3,9]}],"urls":[]}}',
+        '{"created_at":"Thu Nov 05 05:05:40 +0000 2015","id":2,"text":"a",'
+        '"retweeted_status":{"created_at":"Thu Nov 05 05:05:39 +0000 2015",'
+        '"entities":{"hashtags":[{"text":"b","indices":[0,2]}]}},'
+        '"entities":{"hashtags":[{"text":"b","indices":[0,2]}]}}',
+        '{"created_at":"Thu Nov 05 05:05:41 +0000 2015","id":3,"text":"a",'
+        '"quoted_status":{"text":"\\\\\\"{","entities":{"hashtags":[]}}}',
+        '{"limit":{"track":5,"timestamp_ms":"1446218985743"}}']
+    for line in lines:
+        print scan_tweet(line)
+
+if __name__ == "__main__":
+    main()
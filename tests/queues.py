@@ -0,0 +1,83 @@
+# Reference model for classes with the interface of indexedMinPQ (a dict from
+# keys to values), and random operations checked against it. Ties of values
+# may be broken in any order, so only values are compared for pops, and
+# pop_min_until with a limit may remove any datapoints up to the threshold.
+
+import random
+
+def check_random_operations(test, queue, seed, num_ops=300, num_keys=40,
+                            max_step=2):
+    """
+    Apply random operations to a queue and to the model, and check outputs
+    after every operation.
+    Input:
+        test (unittest.TestCase): test case (for assertions)
+        queue: empty queue (indexedMinPQ, TimeWheel, ExpiryLog, ...)
+        seed (int): seed for the random number generator
+        num_ops (int): number of operations
+        num_keys (int): number of distinct keys
+        max_step (int): maximum step of the current time (values are drawn
+                        around the current time, and some are older)
+    """
+    rand = random.Random(seed)
+    model = {}
+    current_time = 0
+    for step in xrange(num_ops):
+        current_time += rand.randint(0, max_step)
+        key = rand.randint(0, num_keys)
+        value = max(0, current_time - rand.choice([0, 0, 0, 1, 5, 20]))
+        op = rand.random()
+        message = (seed, step)
+        if op < 0.35:
+            test.assertEqual(queue.add(key, value), key not in model, message)
+            model.setdefault(key, value)
+        elif op < 0.45:
+            test.assertEqual(queue.remove(key), key in model, message)
+            model.pop(key, None)
+        elif op < 0.7:
+            test.assertEqual(queue.update(key, value), key in model, message)
+            if key in model:
+                model[key] = value
+        elif op < 0.8:
+            key, value = queue.pop_min()
+            if model:
+                test.assertEqual(value, min(model.itervalues()), message)
+                test.assertEqual(model.pop(key), value, message)
+            else:
+                test.assertEqual(key, None, message)
+        elif op < 0.95:
+            threshold = current_time - rand.randint(0, 10)
+            limit = rand.choice([None, 0, 1, 3])
+            popped = list(queue.pop_min_until(threshold, limit))
+            expected = sorted(value for value in model.itervalues()
+                              if value <= threshold)
+            if limit is None:
+                test.assertEqual(sorted(value for _, value in popped),
+                                 expected, message)
+            else:
+                # Any datapoints up to the threshold may be removed first.
+                test.assertEqual(len(popped), min(limit, len(expected)),
+                                 message)
+            for key, value in popped:
+                test.assertTrue(value <= threshold, message)
+                test.assertEqual(model.pop(key), value, message)
+        else:
+            key, value = queue.peek_min()
+            if model:
+                test.assertEqual(value, min(model.itervalues()), message)
+                test.assertEqual(model[key], value, message)
+            else:
+                test.assertEqual(key, None, message)
+        test.assertEqual(queue.size(), len(model), message)
+        test.assertEqual(sorted(queue.items()), sorted(model.items()),
+                         message)
+        for key in xrange(num_keys + 1):
+            test.assertEqual(queue.value(key), model.get(key), message)
+
+def check_load(test, queue, items):
+    """
+    Load items into an empty queue, and check them.
+    """
+    queue.load([key for key, _ in items], [value for _, value in items])
+    test.assertEqual(sorted(queue.items()), sorted(items))
+    test.assertEqual(queue.size(), len(items))
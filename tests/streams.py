@@ -0,0 +1,74 @@
+# Seeded random streams of tweets for tests, and average degrees computed by
+# the baseline path (TimeWindowGraph with add_node/check_link/add_link/
+# update_link for every pair) to compare with.
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from graph import TimeWindowGraph
+
+def random_stream(num_tweets, seed, num_hashtags=50, max_hashtags=6,
+                  late_ratio=0.1, max_lateness=90):
+    """
+    Make a random stream of tweets with out-of-order tweets and gaps.
+    Input:
+        num_tweets (int): number of tweets
+        seed (int): seed for the random number generator
+        num_hashtags (int): number of distinct hashtags
+        max_hashtags (int): maximum number of hashtags in a tweet
+        late_ratio (float): ratio of delayed tweets
+        max_lateness (int): maximum delay in seconds
+    Output:
+        (list): (timestamp, hashtags) for all tweets
+    """
+    rand = random.Random(seed)
+    timestamp = 1446699939
+    stream = []
+    for _ in xrange(num_tweets):
+        r = rand.random()
+        if r < 0.01:
+            timestamp += rand.randint(30, 200)     # Gap in the feed.
+        elif r < 0.3:
+            timestamp += 1
+        if rand.random() < late_ratio:
+            tweet_time = timestamp - rand.randint(0, max_lateness)
+        else:
+            tweet_time = timestamp
+        hashtags = ['h%d' % rand.randint(0, num_hashtags)
+                    for _ in xrange(rand.randint(0, max_hashtags))]
+        stream.append((tweet_time, hashtags))
+    return stream
+
+def baseline_degrees(stream, window_size=60):
+    """
+    Return the average degree after each tweet in the window (tweets that are
+    too old are skipped), adding links pair by pair.
+    Input:
+        stream (list): (timestamp, hashtags) for all tweets
+        window_size (int): size of the window
+    Output:
+        (list of float): average degrees
+    """
+    gr = TimeWindowGraph(window_size=window_size)
+    degrees = []
+    for timestamp, hashtags in stream:
+        if timestamp <= gr.current_time - window_size:
+            continue
+        if timestamp > gr.current_time:
+            gr.set_current_time(timestamp)
+        for i in xrange(len(hashtags)):
+            for j in xrange(i + 1, len(hashtags)):
+                if hashtags[i] == hashtags[j]:
+                    continue
+                gr.add_node(hashtags[i])
+                gr.add_node(hashtags[j])
+                time_link = gr.check_link(hashtags[i], hashtags[j])
+                if time_link < 0:
+                    gr.add_link(hashtags[i], hashtags[j], timestamp)
+                elif time_link < timestamp:
+                    gr.update_link(hashtags[i], hashtags[j], timestamp)
+        degrees.append(gr.average_degree())
+    return degrees
@@ -0,0 +1,149 @@
+# Tests of the optional C extension (src/_accel.c) against indexedMinPQ and
+# the pure Python path of TimeWindowGraph. They are skipped if the extension
+# is not built ("python setup.py build_ext --inplace").
+
+import random
+import unittest
+
+from streams import random_stream, baseline_degrees
+import graph
+from graph import TimeWindowGraph
+from minpq import indexedMinPQ
+try:
+    import _accel
+except ImportError:
+    _accel = None
+
+def upsert_links(node_ids, graph_structure, linkheap, timestamp):
+    """
+    Same as _accel.upsert_links in Python (the loop of add_tweet).
+    """
+    num_added = 0
+    for i in xrange(len(node_ids)):
+        node_id1 = node_ids[i]
+        links_info = graph_structure[node_id1]
+        for node_id2 in node_ids[i + 1:]:
+            link = (node_id1 << 32) | node_id2
+            if node_id2 in links_info:
+                if linkheap.value(link) < timestamp:
+                    linkheap.update(link, timestamp)
+            else:
+                linkheap.add(link, timestamp)
+                links_info.add(node_id2)
+                graph_structure[node_id2].add(node_id1)
+                num_added += 1
+    return num_added
+
+def expire_links(linkheap, graph_structure, threshold, limit=None):
+    """
+    Same as _accel.expire_links in Python (the loop of _remove_old_links).
+    """
+    num_removed = 0
+    node_ids = []
+    for link, time in linkheap.pop_min_until(threshold, limit):
+        node_id1 = link >> 32
+        node_id2 = link & 0xFFFFFFFF
+        graph_structure[node_id1].discard(node_id2)
+        graph_structure[node_id2].discard(node_id1)
+        num_removed += 1
+        for node_id in (node_id1, node_id2):
+            if len(graph_structure[node_id]) == 0:
+                node_ids.append(node_id)
+    return num_removed, node_ids
+
+def run_graph(stream, accelerated, window_size):
+    """
+    Feed a stream into TimeWindowGraph with the given backend, and return
+    average degrees after each tweet (in the window) and the graph.
+    """
+    saved = graph.ACCELERATED
+    graph.ACCELERATED = accelerated
+    try:
+        gr = TimeWindowGraph(window_size=window_size, expiry='heap')
+    finally:
+        graph.ACCELERATED = saved
+    degrees = []
+    for timestamp, hashtags in stream:
+        if gr.add_tweet(timestamp, hashtags):
+            degrees.append(gr.average_degree())
+    return degrees, gr
+
+
+@unittest.skipIf(_accel is None, "the C extension is not built")
+class AccelTest(unittest.TestCase):
+    def test_queue_operations(self):
+        rand = random.Random(0)
+        for trial in xrange(20):
+            pq1 = indexedMinPQ(dtype='int')
+            pq2 = _accel.IntMinPQ()
+            num_keys = rand.choice([10, 100, 10000])
+            for i in xrange(2000):
+                key = rand.randint(0, num_keys) << rand.choice([0, 32])
+                value = rand.randint(0, 100)
+                op = rand.randint(0, 7)
+                if op <= 1:
+                    outputs = pq1.add(key, value), pq2.add(key, value)
+                elif op == 2:
+                    outputs = pq1.remove(key), pq2.remove(key)
+                elif op == 3:
+                    outputs = pq1.update(key, value), pq2.update(key, value)
+                elif op == 4:
+                    outputs = pq1.value(key), pq2.value(key)
+                elif op == 5:
+                    outputs = pq1.pop_min(), pq2.pop_min()
+                elif op == 6:
+                    limit = rand.choice([None, 0, 1, 5])
+                    outputs = (pq1.pop_min_until(value / 4, limit),
+                               pq2.pop_min_until(value / 4, limit))
+                else:
+                    outputs = ((pq1.peek_min(), pq1.size()),
+                               (pq2.peek_min(), pq2.size()))
+                self.assertEqual(outputs[0], outputs[1], (trial, i, op))
+            self.assertEqual(sorted(pq1.items()), sorted(pq2.items()))
+
+    def test_links(self):
+        rand = random.Random(1)
+        for trial in xrange(50):
+            num_ids = rand.choice([3, 20, 200])
+            structures = [[set() for _ in xrange(num_ids)] for _ in xrange(2)]
+            heaps = [indexedMinPQ(dtype='int'), _accel.IntMinPQ()]
+            timestamp = 0
+            for step in xrange(300):
+                if rand.random() < 0.7:
+                    # Out-of-order timestamps update only older links.
+                    timestamp += rand.choice([0, 1, 2])
+                    tweet_time = timestamp - rand.choice([0, 0, 0, 3])
+                    node_ids = sorted(rand.sample(xrange(num_ids),
+                                                  rand.randint(0, 5)
+                                                  if num_ids > 5 else 2))
+                    outputs = (upsert_links(list(node_ids), structures[0],
+                                            heaps[0], tweet_time),
+                               _accel.upsert_links(list(node_ids),
+                                                   structures[1], heaps[1],
+                                                   tweet_time))
+                else:
+                    threshold = timestamp - rand.randint(0, 5)
+                    limit = rand.choice([None, 0, 1, 3])
+                    outputs = (expire_links(heaps[0], structures[0],
+                                            threshold, limit),
+                               _accel.expire_links(heaps[1], structures[1],
+                                                   threshold, limit=limit))
+                self.assertEqual(outputs[0], outputs[1], (trial, step))
+                self.assertEqual(structures[0], structures[1])
+            self.assertEqual(sorted(heaps[0].items()),
+                             sorted(heaps[1].items()))
+
+    def test_graph(self):
+        for seed, window_size in [(2, 60), (3, 10), (4, 1)]:
+            stream = random_stream(3000, seed=seed,
+                                   num_hashtags=[5, 50, 500][seed % 3])
+            degrees1, gr1 = run_graph(stream, False, window_size)
+            degrees2, gr2 = run_graph(stream, True, window_size)
+            self.assertEqual(type(gr2._linkheap), _accel.IntMinPQ)
+            self.assertEqual(degrees1, degrees2)
+            self.assertEqual(degrees2, baseline_degrees(stream, window_size))
+            self.assertEqual(gr1.get_state(), gr2.get_state())
+            self.assertEqual(gr1.num_nodes, gr2.num_nodes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,272 @@
+# Tests of average_degree.main on small streams of tweets.
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from array import array
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+import average_degree
+import graph
+import offline
+from normalize import HashtagNormalizer, normalize_records
+from benchmark.generator import TweetGenerator
+
+def make_tweet(created_at, hashtags):
+    """
+    Make a line of a tweet in json format.
+    """
+    return json.dumps({'created_at': created_at, 'text': '',
+                       'entities': {'hashtags': [{'text': hashtag}
+                                                 for hashtag in hashtags]}})
+
+
+class AverageDegreeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, lines):
+        """
+        Run main on lines of tweets, and return lines of the output.
+        """
+        input_filename = os.path.join(self.directory, 'tweets.txt')
+        output_filename = os.path.join(self.directory, 'output.txt')
+        with open(input_filename, 'w') as f_out:
+            f_out.write('\n'.join(lines) + '\n')
+        average_degree.main(input_filename, output_filename)
+        with open(output_filename) as f_in:
+            return f_in.read().split()
+
+    def test_average_degree(self):
+        lines = [make_tweet('Thu Nov 05 05:05:39 +0000 2015', ['a', 'b']),
+                 make_tweet('Thu Nov 05 05:05:45 +0000 2015', ['b', 'c']),
+                 make_tweet('Thu Nov 05 05:05:45 +0000 2015', ['a', 'a']),
+                 json.dumps({'limit': {'track': 5}})]
+        self.assertEqual(self.run_main(lines), ['1.00', '1.33', '1.33'])
+
+    def test_late_tweet(self):
+        # The third tweet is 60 seconds older than the current time (05:06:40),
+        # so it is out of the window and no output line is written for it.
+        lines = [make_tweet('Thu Nov 05 05:05:39 +0000 2015', ['a', 'b']),
+                 make_tweet('Thu Nov 05 05:06:40 +0000 2015', ['c', 'd']),
+                 make_tweet('Thu Nov 05 05:05:40 +0000 2015', ['a', 'e', 'f']),
+                 make_tweet('Thu Nov 05 05:06:30 +0000 2015', ['c', 'e'])]
+        self.assertEqual(self.run_main(lines), ['1.00', '1.00', '1.33'])
+
+
+class PipelineTest(unittest.TestCase):
+    """
+    Options of main on a synthetic stream (late tweets, control messages and
+    gaps) against the output of main without options.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.input_filename = os.path.join(cls.directory, 'tweets.txt')
+        generator = TweetGenerator(tweets_per_second=20, num_hashtags=300,
+                                   out_of_order=0.1, max_lateness=90,
+                                   control_rate=0.05, gap_every=60,
+                                   gap_length=100, seed=1)
+        generator.write(cls.input_filename, 5000)
+        cls.expected = cls.run_main()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    @classmethod
+    def run_main(cls, **options):
+        """
+        Run main with options, and return the content of the output file.
+        """
+        output_filename = os.path.join(cls.directory, 'output.txt')
+        average_degree.main(cls.input_filename, output_filename, **options)
+        with open(output_filename, 'rb') as f_in:
+            return f_in.read()
+
+    @classmethod
+    def run_lines(cls, lines):
+        """
+        Run main without options on lines of the input file, and return the
+        content of the output file.
+        """
+        input_filename = os.path.join(cls.directory, 'lines.txt')
+        output_filename = os.path.join(cls.directory, 'output.txt')
+        with open(input_filename, 'wb') as f_out:
+            f_out.writelines(lines)
+        average_degree.main(input_filename, output_filename)
+        with open(output_filename, 'rb') as f_in:
+            return f_in.read()
+
+    def test_workers(self):
+        for workers, chunk_size in [(2, 1), (2, 1000), (3, 7)]:
+            self.assertEqual(self.run_main(workers=workers,
+                                           chunk_size=chunk_size),
+                             self.expected)
+
+    def test_read_records(self):
+        with open(self.input_filename) as f_in:
+            lines = f_in.readlines()
+        expected = list(average_degree.read_records(iter(lines)))
+        self.assertEqual(len(expected), 5000)
+        for workers, chunk_size in [(2, 1), (3, 64)]:
+            self.assertEqual(list(average_degree.read_records(
+                iter(lines), workers, chunk_size)), expected)
+
+    def test_selective(self):
+        self.assertEqual(self.run_main(selective=True), self.expected)
+        self.assertEqual(self.run_main(selective=True, workers=2),
+                         self.expected)
+
+    def test_offsets(self):
+        self.assertEqual(self.run_main(use_mmap=True), self.expected)
+        # A run from the start of a line in the middle of the file gives the
+        # same output as a run on the rest of the file.
+        with open(self.input_filename, 'rb') as f_in:
+            lines = f_in.readlines()
+        offset = sum(len(line) for line in lines[:2000])
+        self.assertEqual(self.run_main(start_offset=offset),
+                         self.run_lines(lines[2000:]))
+        end = offset + sum(len(line) for line in lines[2000:3000])
+        self.assertEqual(self.run_main(start_offset=offset, end_offset=end),
+                         self.run_lines(lines[2000:3000]))
+
+    def test_output_formats(self):
+        expected = self.expected.splitlines()
+        self.assertEqual(self.run_main(buffer_size=1), self.expected)
+        rows = []
+        for line in self.run_main(output_format='rle').splitlines():
+            row, count = line.split(' ')
+            rows.extend([row] * int(count))
+        self.assertEqual(rows, expected)
+        values = array('i', self.run_main(output_format='centi'))
+        self.assertEqual(['%d.%02d' % divmod(value, 100) for value in values],
+                         expected)
+        values = array('f', self.run_main(output_format='float32'))
+        self.assertEqual(len(values), len(expected))
+        for value, row in zip(values, expected):
+            self.assertAlmostEqual(value, float(row), delta=0.0051)
+
+    def test_stats(self):
+        # Statistics are written after the average degree.
+        rows = self.run_main(stats=['max', 'deg1']).splitlines()
+        self.assertEqual([row.split(',')[0] for row in rows],
+                         self.expected.splitlines())
+        self.assertTrue(all(len(row.split(',')) == 3 for row in rows))
+
+    def test_windows(self):
+        # One column for each window, in the given order.
+        rows = self.run_main(windows=[10, 60]).splitlines()
+        self.assertEqual([row.split(',')[1] for row in rows],
+                         self.expected.splitlines())
+
+    def test_reorder(self):
+        # Delays are at most 90 seconds, so with the same lateness bound the
+        # output is the one of tweets sorted by time.
+        with open(self.input_filename, 'rb') as f_in:
+            lines = [line for line in f_in
+                     if average_degree.parse_line(line) is not None]
+        lines.sort(key=lambda line: average_degree.parse_line(line)[0])
+        self.assertEqual(self.run_main(reorder_lateness=90),
+                         self.run_lines(lines))
+
+    def test_checkpoint(self):
+        checkpoint = os.path.join(self.directory, 'checkpoint.bin')
+        self.assertEqual(self.run_main(checkpoint=checkpoint,
+                                       checkpoint_every=700), self.expected)
+        # A run stopped in the middle (with a partial row written after the
+        # last checkpoint) is resumed to the same output.
+        with open(self.input_filename, 'rb') as f_in:
+            end_offset = sum(len(line) for line in f_in.readlines()[:2500])
+        self.run_main(checkpoint=checkpoint, checkpoint_every=700,
+                      end_offset=end_offset)
+        output_filename = os.path.join(self.directory, 'output.txt')
+        with open(output_filename, 'ab') as f_out:
+            f_out.write('1.2')
+        self.assertEqual(self.run_main(checkpoint=checkpoint, resume=True),
+                         self.expected)
+
+    def test_instrument(self):
+        # The report is written to the standard error, and the output is the
+        # same.
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            output = self.run_main(instrument=True)
+            report = sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+        self.assertEqual(output, self.expected)
+        self.assertTrue(report.startswith("Instrumentation ("))
+        self.assertTrue("\n  tweets " in report)
+
+    @unittest.skipIf(offline.np is None, "NumPy is not installed")
+    def test_offline(self):
+        self.assertEqual(self.run_main(offline=True), self.expected)
+
+    def test_compact(self):
+        self.assertEqual(self.run_main(compact=True), self.expected)
+
+    def test_expiry(self):
+        for expiry in ['wheel', 'log']:
+            self.assertEqual(self.run_main(expiry=expiry), self.expected)
+
+    def test_expiry_budget(self):
+        for budget in [1, 50]:
+            self.assertEqual(self.run_main(expiry_budget=budget),
+                             self.expected)
+
+    def test_parts(self):
+        for parts in [2, 3, 16]:
+            self.assertEqual(self.run_main(parts=parts), self.expected)
+        self.assertEqual(self.run_main(parts=3, selective=True, expiry='log'),
+                         self.expected)
+        self.assertEqual(array('i', self.run_main(parts=3,
+                                                  output_format='centi')),
+                         array('i', self.run_main(output_format='centi')))
+        for options in [dict(stats=['max']), dict(windows=[10, 60]),
+                        dict(compact=True), dict(expiry_budget=5)]:
+            self.assertEqual(self.run_main(parts=4, **options),
+                             self.run_main(**options))
+        with open(self.input_filename, 'rb') as f_in:
+            lines = f_in.readlines()
+        start = sum(len(line) for line in lines[:1000])
+        end = start + sum(len(line) for line in lines[1000:4000])
+        self.assertEqual(self.run_main(parts=3, start_offset=start,
+                                       end_offset=end),
+                         self.run_lines(lines[1000:4000]))
+
+    def test_normalize(self):
+        # Same as the graph built from records with canonical tags.
+        with open(self.input_filename, 'rb') as f_in:
+            records = list(average_degree.read_records(f_in))
+        gr = graph.TimeWindowGraph(window_size=60)
+        expected = ''.join('%.2f\n' % gr.average_degree()
+                           for timestamp, hashtags in normalize_records(
+                               records, HashtagNormalizer())
+                           if gr.add_tweet(timestamp, hashtags))
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertEqual(self.run_main(normalize=True,
+                                           normalize_cache=50), expected)
+            self.assertEqual(self.run_main(normalize=True, parts=3),
+                             expected)
+            report = sys.stderr.getvalue()
+        finally:
+            sys.stderr = stderr
+        self.assertEqual(report.count("Hashtag cache: "), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# Tests of BudgetedGraph against TimeWindowGraph: the average degree is the
+# same after every tweet while old links are removed at most 'budget' at a
+# time.
+
+import random
+import unittest
+
+from streams import random_stream, baseline_degrees
+from graph import TimeWindowGraph
+from budgetedgraph import BudgetedGraph
+
+def links(gr):
+    """
+    Return nodes and links of a graph by their IDs (node ids are recycled in
+    different orders).
+    """
+    names, node1s, node2s, times = gr.get_state()
+    return set(names), set((frozenset([names[node_id1], names[node_id2]]),
+                            time) for node_id1, node_id2, time
+                           in zip(node1s, node2s, times))
+
+
+class BudgetedGraphTest(unittest.TestCase):
+    def test_random_streams(self):
+        for seed in xrange(30):
+            rand = random.Random(seed)
+            expiry = ['heap', 'wheel', 'log'][seed % 3]
+            window_size = rand.choice([3, 10, 60])
+            budget = rand.choice([1, 2, 5, 50])
+            gr = BudgetedGraph(window_size, expiry, budget)
+            expected = TimeWindowGraph(window_size, expiry)
+            hashtags = ['h%d' % i for i in xrange(rand.choice([5, 30, 200]))]
+            time = 0
+            for step in xrange(1000):
+                r = rand.random()
+                if r < 0.02:
+                    # A gap in the feed: many links become out of the window.
+                    time += rand.randint(window_size // 2, 3 * window_size)
+                elif r < 0.3:
+                    time += 1
+                timestamp = time
+                if rand.random() < 0.1:
+                    timestamp = max(0, time - rand.randint(0, window_size))
+                tweet = [rand.choice(hashtags)
+                         for _ in xrange(rand.randint(0, 6))]
+                num_links = gr.num_links
+                message = 'seed %d, step %d' % (seed, step)
+                self.assertEqual(gr.add_tweet(timestamp, tweet),
+                                 expected.add_tweet(timestamp, tweet),
+                                 message)
+                self.assertEqual(gr.average_degree(),
+                                 expected.average_degree(), message)
+                # At most 'budget' links are removed for a tweet.
+                self.assertTrue(num_links - gr.num_links <= budget, message)
+                self.assertTrue(gr.num_links - gr.pending_links() ==
+                                expected.num_links, message)
+                if rand.random() < 0.02:
+                    # Other methods see the graph without pending links.
+                    node1, node2 = rand.choice(hashtags), rand.choice(hashtags)
+                    self.assertEqual(gr.check_link(node1, node2),
+                                     expected.check_link(node1, node2),
+                                     message)
+                    self.assertEqual(gr.pending_links(), 0, message)
+                    self.assertEqual(gr.remove_node(node1),
+                                     expected.remove_node(node1), message)
+                    self.assertEqual(links(gr), links(expected), message)
+            gr.expire_all()
+            self.assertEqual((gr.num_nodes, gr.num_links, gr.pending_links()),
+                             (expected.num_nodes, expected.num_links, 0))
+
+    def test_gap(self):
+        # After a jump of the current time, all links are pending, and they
+        # are removed 'budget' at a time by the following tweets.
+        gr = BudgetedGraph(window_size=60, budget=10)
+        for timestamp, hashtags in random_stream(2000, seed=5):
+            gr.add_tweet(timestamp, hashtags)
+        num_links = gr.num_links
+        self.assertTrue(num_links > 100)
+        gr.add_tweet(gr.current_time + 1000, [])
+        self.assertEqual(gr.average_degree(), 0)
+        self.assertEqual(gr.pending_links(), num_links - 10)
+        for i in xrange(5):
+            gr.add_tweet(gr.current_time, ['a', 'b'])
+            self.assertEqual(gr.pending_links(), num_links - 20 - 10 * i)
+            self.assertEqual(gr.average_degree(), 1.0)
+
+    def test_baseline(self):
+        stream = random_stream(5000, seed=6)
+        gr = BudgetedGraph(window_size=60, budget=3)
+        self.assertEqual([gr.average_degree() for timestamp, hashtags
+                          in stream if gr.add_tweet(timestamp, hashtags)],
+                         baseline_degrees(stream))
+
+
+if __name__ == "__main__":
+    unittest.main()
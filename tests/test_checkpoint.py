@@ -0,0 +1,74 @@
+# Tests of checkpoints: a graph restored from a checkpoint has the same state
+# as the saved one, and gives the same average degrees for the rest of the
+# stream.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from checkpoint import save_checkpoint, load_checkpoint
+from degreehist import STATS
+from graph import TimeWindowGraph
+from streams import random_stream
+
+
+class CheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'checkpoint.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        stream = random_stream(3000, seed=11)
+        # Non-ASCII hashtags are saved in utf-8.
+        stream = [(timestamp, [hashtag + u'\xe9' if hashtag[-1] == '7'
+                               else unicode(hashtag) for hashtag in hashtags])
+                  for timestamp, hashtags in stream]
+        gr = TimeWindowGraph(window_size=60)
+        for i, (timestamp, hashtags) in enumerate(stream):
+            gr.add_tweet(timestamp, hashtags)
+            if i % 600 != 0:
+                continue
+            save_checkpoint(gr, self.filename, i, 2 * i)
+            for expiry in ['heap', 'wheel', 'log']:
+                restored, input_offset, output_offset = load_checkpoint(
+                    self.filename, expiry=expiry, degree_stats=True)
+                self.assertEqual((input_offset, output_offset), (i, 2 * i))
+                self.assertEqual(restored.get_state(), gr.get_state())
+                self.assertEqual(restored.current_time, gr.current_time)
+                self.assertEqual(restored.window_size, gr.window_size)
+                # The rest of the stream (1000 tweets) gives the same average
+                # degrees (and statistics of degrees) as a graph built from the
+                # whole stream.
+                expected = TimeWindowGraph(window_size=60, degree_stats=True)
+                for timestamp2, hashtags2 in stream[:i + 1]:
+                    expected.add_tweet(timestamp2, hashtags2)
+                for timestamp2, hashtags2 in stream[i + 1:i + 1001]:
+                    self.assertEqual(
+                        restored.add_tweet(timestamp2, hashtags2),
+                        expected.add_tweet(timestamp2, hashtags2))
+                    self.assertEqual(restored.average_degree(),
+                                     expected.average_degree())
+                    self.assertEqual(restored.degree_histogram.stats(STATS),
+                                     expected.degree_histogram.stats(STATS))
+
+    def test_empty_graph(self):
+        save_checkpoint(TimeWindowGraph(window_size=5), self.filename)
+        gr, input_offset, output_offset = load_checkpoint(self.filename)
+        self.assertEqual((gr.num_nodes, gr.num_links, gr.window_size,
+                          input_offset, output_offset), (0, 0, 5, 0, 0))
+
+    def test_invalid_file(self):
+        with open(self.filename, 'wb') as f_out:
+            f_out.write('x' * 100)
+        self.assertRaises(ValueError, load_checkpoint, self.filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
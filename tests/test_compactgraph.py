@@ -0,0 +1,83 @@
+# Tests of CompactGraph against TimeWindowGraph, with hash functions that make
+# many collisions, so that deletions from the hash table (moving entries back
+# along probe sequences) are exercised.
+
+import random
+import unittest
+
+from streams import random_stream, baseline_degrees
+import compactgraph
+from compactgraph import CompactGraph, _EMPTY
+from graph import TimeWindowGraph
+
+# Multipliers of the hash function: the default ones, all pairs in one probe
+# sequence, and (id1 xor id2) (long clusters of different home slots).
+MULTIPLIERS = [(compactgraph._MULTIPLIER1, compactgraph._MULTIPLIER2),
+               (0, 0), (256, 256)]
+
+
+class CompactGraphTest(unittest.TestCase):
+    def tearDown(self):
+        compactgraph._MULTIPLIER1, compactgraph._MULTIPLIER2 = MULTIPLIERS[0]
+
+    def check_table(self, gr):
+        """
+        Check that every link is found from its home slot, and that the hash
+        table has no other entry.
+        """
+        table = gr._table
+        mask = gr._mask
+        links = [gr._heap[index] for index in xrange(1, gr.num_links + 1)]
+        self.assertEqual(sum(1 for entry in table if entry != _EMPTY),
+                         len(links))
+        self.assertTrue(2 * gr.num_links <= mask + 1)
+        for link in links:
+            slot = gr._find(gr._node1s[link], gr._node2s[link])
+            self.assertEqual(table[slot], link + 1)
+
+    def test_random_streams(self):
+        for seed, multipliers in enumerate(MULTIPLIERS * 2):
+            compactgraph._MULTIPLIER1, compactgraph._MULTIPLIER2 = multipliers
+            rand = random.Random(seed)
+            window_size = [5, 60][seed // 3]
+            gr = CompactGraph(window_size=window_size)
+            expected = TimeWindowGraph(window_size=window_size)
+            hashtags = ['h%d' % i for i in xrange(41)]
+            for i, (timestamp, tweet_hashtags) in enumerate(
+                    random_stream(2000, seed, num_hashtags=40)):
+                self.assertEqual(gr.add_tweet(timestamp, tweet_hashtags),
+                                 expected.add_tweet(timestamp, tweet_hashtags))
+                if i % 300 == 0:
+                    # A jump of the current time expires many links at once.
+                    gr.set_current_time(gr.current_time + window_size - 1)
+                    expected.set_current_time(gr.current_time)
+                self.assertEqual(gr.average_degree(),
+                                 expected.average_degree())
+                self.assertEqual((gr.num_nodes, gr.num_links),
+                                 (expected.num_nodes, expected.num_links))
+                if i % 10 != 0:
+                    continue
+                self.check_table(gr)
+                for _ in xrange(20):
+                    node1, node2 = rand.sample(hashtags, 2)
+                    self.assertEqual(gr.check_link(node1, node2),
+                                     expected.check_link(node1, node2))
+                    self.assertEqual(gr.check_node(node1),
+                                     expected.check_node(node1))
+                node = rand.choice(hashtags)
+                self.assertEqual(sorted(gr.neighbors(node)),
+                                 sorted(expected.neighbors(node)))
+                self.assertEqual([degree for _, degree in gr.top_degrees(5)],
+                                 [degree for _, degree
+                                  in expected.top_degrees(5)])
+
+    def test_baseline(self):
+        stream = random_stream(5000, seed=4, num_hashtags=300)
+        gr = CompactGraph(window_size=60)
+        self.assertEqual([gr.average_degree() for timestamp, hashtags
+                          in stream if gr.add_tweet(timestamp, hashtags)],
+                         baseline_degrees(stream))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+# Tests of DegreeHistogram against sorted lists of degrees, and of the
+# histogram kept by TimeWindowGraph against degrees of its links.
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from degreehist import DegreeHistogram, STATS
+from graph import TimeWindowGraph
+from streams import random_stream
+
+def brute_stats(degrees):
+    """
+    Return the values of STATS from a list of degrees (nearest rank).
+    """
+    degrees = sorted(degrees)
+    def quantile(q):
+        if not degrees:
+            return 0
+        rank = max(1, -int(-q * len(degrees) // 1))    # ceil(q * n)
+        return degrees[rank - 1]
+    return (quantile(0.5), degrees[-1] if degrees else 0, quantile(0.95),
+            quantile(0.99), degrees.count(1))
+
+
+class DegreeHistogramTest(unittest.TestCase):
+    def test_random_operations(self):
+        for seed in xrange(20):
+            rand = random.Random(seed)
+            max_degree = rand.choice([3, 20, 100])
+            hist = DegreeHistogram()
+            degrees = []
+            for step in xrange(500):
+                r = rand.random()
+                if r < 0.3 or not degrees:
+                    degree = rand.randint(0, max_degree)
+                    hist.add(degree)
+                    degrees.append(degree)
+                elif r < 0.45:
+                    degree = degrees.pop(rand.randrange(len(degrees)))
+                    hist.remove(degree)
+                else:
+                    i = rand.randrange(len(degrees))
+                    degree = max(0, degrees[i] + rand.randint(-3, 3))
+                    hist.move(degrees[i], degree)
+                    degrees[i] = degree
+                message = 'seed %d, step %d' % (seed, step)
+                self.assertEqual(hist.stats(STATS), brute_stats(degrees),
+                                 message)
+                self.assertEqual(hist.num_nodes, len(degrees), message)
+                self.assertEqual(hist.count(max_degree + 4),
+                                 degrees.count(max_degree + 4), message)
+
+    def test_graph(self):
+        for expiry in ['heap', 'wheel']:
+            gr = TimeWindowGraph(window_size=60, expiry=expiry,
+                                 degree_stats=True)
+            for timestamp, hashtags in random_stream(3000, seed=3):
+                gr.add_tweet(timestamp, hashtags)
+                names, node1s, node2s, times = gr.get_state()
+                degrees = [0] * len(names)
+                for node_id in node1s + node2s:
+                    degrees[node_id] += 1
+                self.assertEqual(gr.degree_histogram.stats(STATS),
+                                 brute_stats(degrees))
+                self.assertEqual(gr.degree_histogram.num_nodes, gr.num_nodes)
+
+
+if __name__ == "__main__":
+    unittest.main()
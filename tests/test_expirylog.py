@@ -0,0 +1,62 @@
+# Tests of ExpiryLog against a dict (also with frequent compaction of the
+# log), and of TimeWindowGraph with expiry='log' against the baseline path.
+
+import random
+import unittest
+
+from queues import check_random_operations, check_load
+from streams import random_stream, baseline_degrees
+from graph import TimeWindowGraph
+import expirylog
+from expirylog import ExpiryLog
+
+class ExpiryLogTest(unittest.TestCase):
+    def setUp(self):
+        self.min_compact = expirylog._MIN_COMPACT
+
+    def tearDown(self):
+        expirylog._MIN_COMPACT = self.min_compact
+
+    def test_random_operations(self):
+        for seed in xrange(100):
+            expirylog._MIN_COMPACT = [0, 4, self.min_compact][seed % 3]
+            check_random_operations(self, ExpiryLog(), seed,
+                                    max_step=[0, 1, 3, 10][seed % 4])
+
+    def test_compaction(self):
+        # Updates to the newest time leave stale events in the log, and the
+        # log is kept at most twice as long as the number of keys (plus
+        # _MIN_COMPACT).
+        expirylog._MIN_COMPACT = 4
+        rand = random.Random(0)
+        log = ExpiryLog()
+        model = {}
+        for time in xrange(3000):
+            key = rand.randint(0, 20)
+            if not log.update(key, time):
+                log.add(key, time)
+            model[key] = time
+            self.assertTrue(len(log._log_keys) <= 2 * log.size() + 5)
+            if time % 500 == 0:
+                for key, value in log.pop_min_until(time - 15):
+                    self.assertEqual(model.pop(key), value)
+        self.assertTrue(log.num_compactions > 0)
+        self.assertEqual(sorted(log.items()), sorted(model.items()))
+
+    def test_load(self):
+        check_load(self, ExpiryLog(), [(1, 3), (2, 3), (3, 0), (4, 9)])
+        log = ExpiryLog()
+        log.add(1, 1)
+        self.assertFalse(log.load([2], [2]))
+
+    def test_graph(self):
+        for seed, window_size in [(1, 60), (2, 10), (3, 1)]:
+            expirylog._MIN_COMPACT = [0, self.min_compact][seed % 2]
+            stream = random_stream(3000, seed=seed)
+            gr = TimeWindowGraph(window_size=window_size, expiry='log')
+            degrees = [gr.average_degree() for timestamp, hashtags in stream
+                       if gr.add_tweet(timestamp, hashtags)]
+            self.assertEqual(degrees, baseline_degrees(stream, window_size))
+
+if __name__ == "__main__":
+    unittest.main()
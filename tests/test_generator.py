@@ -0,0 +1,65 @@
+# Tests of the synthetic tweet generator: json lines are parsed back to the
+# same records, and the stream has the requested shape.
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from average_degree import parse_line
+from benchmark.generator import TweetGenerator
+
+
+class TweetGeneratorTest(unittest.TestCase):
+    def test_lines(self):
+        generator = TweetGenerator(tweets_per_second=7, num_hashtags=200,
+                                   out_of_order=0.2, max_lateness=15,
+                                   control_rate=0.1, seed=4)
+        lines = list(generator.lines(3000))
+        records = [parse_line(line) for line in lines]
+        tweets = [record for record in records if record is not None]
+        # Hashtags are sorted by extract_data.
+        self.assertEqual(tweets, [(timestamp, sorted(hashtags)) for timestamp,
+                                  hashtags in generator.records(3000)])
+        self.assertTrue(200 < len(records) - len(tweets) < 500)
+        # The same parameters give the same stream.
+        self.assertEqual(list(TweetGenerator(
+            tweets_per_second=7, num_hashtags=200, out_of_order=0.2,
+            max_lateness=15, control_rate=0.1, seed=4).lines(3000)), lines)
+        self.assertNotEqual(list(TweetGenerator(
+            tweets_per_second=7, num_hashtags=200, out_of_order=0.2,
+            max_lateness=15, control_rate=0.1, seed=5).lines(3000)), lines)
+
+    def test_timestamps(self):
+        generator = TweetGenerator(tweets_per_second=4, out_of_order=0.3,
+                                   max_lateness=20, gap_every=10,
+                                   gap_length=100, start_time=1000, seed=2)
+        num_late = 0
+        for i, (timestamp, hashtags) in enumerate(generator.records(2000)):
+            second = i // 4
+            expected = 1000 + second + second // 10 * 100
+            self.assertTrue(expected - 20 <= timestamp <= expected)
+            if timestamp < expected:
+                num_late += 1
+            self.assertTrue(len(hashtags) <= 6)
+        self.assertTrue(450 < num_late < 750)
+
+    def test_popularity(self):
+        generator = TweetGenerator(num_hashtags=1000, seed=3)
+        counts = dict((hashtag, 0) for hashtag in generator.hashtags)
+        for _, hashtags in generator.records(20000):
+            for hashtag in hashtags:
+                counts[hashtag] += 1
+        # Popular hashtags come first.
+        top = generator.hashtags[:10]
+        bottom = generator.hashtags[-500:]
+        self.assertTrue(sum(counts[hashtag] for hashtag in top) >
+                        sum(counts[hashtag] for hashtag in bottom))
+        self.assertEqual(len(set(generator.hashtags)), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
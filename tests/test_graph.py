@@ -0,0 +1,159 @@
+# Tests of TimeWindowGraph (hashtags interned into integer ids) against a
+# model of the baseline graph (a dict from pairs of hashtags to times).
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from graph import TimeWindowGraph
+from streams import random_stream, baseline_degrees
+
+class GraphModel:
+    """
+    Model of the baseline graph: links are frozensets of two nodes.
+    """
+    def __init__(self, window_size):
+        self.window_size = window_size
+        self.current_time = 0
+        self.nodes = set()
+        self.links = {}     # dict (key: frozenset of nodes, value: time)
+
+    def remove_link(self, link):
+        del self.links[link]
+
+    def set_current_time(self, time):
+        self.current_time = time
+        for link, link_time in self.links.items():
+            if link_time <= time - self.window_size:
+                del self.links[link]
+                for node in link:
+                    # Nodes left with no link are removed.
+                    if not any(node in other for other in self.links):
+                        self.nodes.discard(node)
+
+
+class GraphTest(unittest.TestCase):
+    def check_state(self, gr, model, message):
+        names, node1s, node2s, times = gr.get_state()
+        self.assertEqual(set(names), model.nodes, message)
+        self.assertEqual(dict((frozenset([names[node_id1], names[node_id2]]),
+                               time) for node_id1, node_id2, time
+                              in zip(node1s, node2s, times)),
+                         model.links, message)
+        self.assertEqual(gr.num_nodes, len(model.nodes), message)
+        self.assertEqual(gr.num_links, len(model.links), message)
+        self.assertEqual(gr.current_time, model.current_time, message)
+
+    def test_random_operations(self):
+        for seed in xrange(40):
+            rand = random.Random(seed)
+            window_size = rand.choice([1, 5, 60])
+            gr = TimeWindowGraph(window_size=window_size,
+                                 expiry=['heap', 'wheel', 'log'][seed % 3])
+            model = GraphModel(window_size)
+            nodes = ['#%d' % i for i in xrange(rand.choice([3, 10, 30]))]
+            time = 0
+            for step in xrange(400):
+                time += rand.choice([0, 0, 1, 2])
+                link_time = max(0, time - rand.randint(0, window_size))
+                node1, node2 = rand.choice(nodes), rand.choice(nodes)
+                link = frozenset([node1, node2])
+                message = (seed, step)
+                op = rand.random()
+                if op < 0.2:
+                    self.assertEqual(gr.add_node(node1),
+                                     node1 not in model.nodes, message)
+                    model.nodes.add(node1)
+                elif op < 0.3:
+                    self.assertEqual(gr.remove_node(node1),
+                                     node1 in model.nodes, message)
+                    model.nodes.discard(node1)
+                    for other in model.links.keys():
+                        if node1 in other:
+                            model.remove_link(other)
+                elif op < 0.6:
+                    expected = node1 in model.nodes and \
+                        node2 in model.nodes and node1 != node2 and \
+                        link not in model.links
+                    self.assertEqual(gr.add_link(node1, node2, link_time),
+                                     expected, message)
+                    if expected:
+                        model.links[link] = link_time
+                        if link_time > model.current_time:
+                            model.set_current_time(link_time)
+                elif op < 0.7:
+                    expected = link in model.links
+                    self.assertEqual(gr.update_link(node1, node2, link_time),
+                                     expected, message)
+                    if expected:
+                        model.links[link] = link_time
+                        if link_time > model.current_time:
+                            model.set_current_time(link_time)
+                elif op < 0.8:
+                    self.assertEqual(gr.remove_link(node1, node2),
+                                     link in model.links, message)
+                    model.links.pop(link, None)
+                elif op < 0.85:
+                    pair, link_time = gr.remove_min_link()
+                    if model.links:
+                        self.assertEqual(link_time,
+                                         min(model.links.itervalues()))
+                        model.remove_link(frozenset(pair))
+                    else:
+                        self.assertEqual(pair, None)
+                elif op < 0.95:
+                    self.assertEqual(gr.check_link(node1, node2),
+                                     model.links.get(link, -1), message)
+                    self.assertEqual(gr.check_node(node1),
+                                     node1 in model.nodes, message)
+                else:
+                    gr.set_current_time(time)
+                    model.set_current_time(time)
+                self.check_state(gr, model, message)
+
+    def test_recycled_ids(self):
+        gr = TimeWindowGraph(window_size=10)
+        for node in ['a', 'b', 'c']:
+            gr.add_node(node)
+        gr.add_link('a', 'b', 1)
+        gr.add_link('b', 'c', 1)
+        node_id = gr.node_id('b')
+        gr.remove_node('b')
+        self.assertEqual(gr.node_id('b'), None)
+        # The id of 'b' is given to the next new node, which has no link.
+        gr.add_node('d')
+        self.assertEqual(gr.node_id('d'), node_id)
+        self.assertEqual(gr.check_link('a', 'd'), -1)
+        self.assertEqual(gr.check_link('d', 'c'), -1)
+        self.assertTrue(gr.add_link('a', 'd', 2))
+        self.assertEqual(gr.check_link('d', 'a'), 2)
+        self.assertEqual((gr.num_nodes, gr.num_links), (3, 1))
+
+    def test_add_tweet(self):
+        gr = TimeWindowGraph(window_size=60)
+        self.assertTrue(gr.add_tweet(100, ['a', 'b', 'a', 'c']))
+        self.assertEqual((gr.num_nodes, gr.num_links), (3, 3))
+        self.assertTrue(gr.add_tweet(90, ['a', 'b']))     # Older link time.
+        self.assertEqual(gr.check_link('a', 'b'), 100)
+        self.assertTrue(gr.add_tweet(161, ['d']))         # Expires all links.
+        self.assertEqual((gr.num_nodes, gr.num_links), (0, 0))
+        self.assertFalse(gr.add_tweet(101, ['a', 'b']))   # Too old.
+        self.assertEqual(gr.current_time, 161)
+
+    def test_add_tweet_stream(self):
+        for seed, window_size in [(1, 60), (2, 10), (3, 1)]:
+            stream = random_stream(3000, seed=seed)
+            for expiry in ['heap', 'wheel', 'log']:
+                gr = TimeWindowGraph(window_size=window_size, expiry=expiry)
+                degrees = [gr.average_degree()
+                           for timestamp, hashtags in stream
+                           if gr.add_tweet(timestamp, hashtags)]
+                self.assertEqual(degrees,
+                                 baseline_degrees(stream, window_size))
+
+
+if __name__ == "__main__":
+    unittest.main()
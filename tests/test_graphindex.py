@@ -0,0 +1,173 @@
+# Tests of query indexes (DegreeIndex and ComponentIndex) against brute force:
+# degrees from a dict, and components searched in the graph.
+
+import random
+import unittest
+
+from streams import random_stream
+import graphindex
+from graphindex import DegreeIndex, ComponentIndex
+from graph import TimeWindowGraph
+
+def link_model(gr):
+    """
+    Return neighbors of every node from the state of a graph.
+    Output:
+        (dict): (key: ID of a node, value: dict (key: ID of a neighbor,
+                value: time of the link))
+    """
+    names, node1s, node2s, times = gr.get_state()
+    model = dict((name, {}) for name in names)
+    for node_id1, node_id2, time in zip(node1s, node2s, times):
+        model[names[node_id1]][names[node_id2]] = time
+        model[names[node_id2]][names[node_id1]] = time
+    return model
+
+def component_sizes(model):
+    """
+    Return the size of the component of every node (depth-first search).
+    """
+    sizes = {}
+    for node in model:
+        if node in sizes:
+            continue
+        component = set([node])
+        stack = [node]
+        while stack:
+            for node2 in model[stack.pop()]:
+                if node2 not in component:
+                    component.add(node2)
+                    stack.append(node2)
+        for node2 in component:
+            sizes[node2] = len(component)
+    return sizes
+
+
+class DegreeIndexTest(unittest.TestCase):
+    def test_random_operations(self):
+        for seed in xrange(20):
+            rand = random.Random(seed)
+            index = DegreeIndex()
+            degrees = {}
+            for step in xrange(500):
+                node_id = rand.randint(0, 30)
+                r = rand.random()
+                if node_id not in degrees:
+                    index.add(node_id)
+                    degrees[node_id] = 0
+                elif r < 0.1 and degrees[node_id] == 0:
+                    index.remove(node_id)
+                    del degrees[node_id]
+                else:
+                    degree = max(0, degrees[node_id] + rand.choice([-1, 1, 3]))
+                    index.move(node_id, degrees[node_id], degree)
+                    degrees[node_id] = degree
+                message = 'seed %d, step %d' % (seed, step)
+                self.assertEqual(index.max_degree(),
+                                 max(degrees.values() + [0]), message)
+                k = rand.randint(0, 10)
+                top = index.top(k)
+                self.assertEqual([degree for _, degree in top],
+                                 sorted(degrees.values(), reverse=True)[:k],
+                                 message)
+                for node_id, degree in top:
+                    self.assertEqual(degrees[node_id], degree, message)
+
+
+class ComponentIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.min_slots = graphindex._MIN_SLOTS
+
+    def tearDown(self):
+        graphindex._MIN_SLOTS = self.min_slots
+
+    def test_index(self):
+        # Links are added and removed at random, and node ids are reused.
+        for seed in xrange(20):
+            rand = random.Random(seed)
+            graphindex._MIN_SLOTS = [0, 3, 1024][seed % 3]
+            index = ComponentIndex()
+            graph_structure = []
+            for step in xrange(400):
+                r = rand.random()
+                free = [node_id for node_id in xrange(len(graph_structure))
+                        if graph_structure[node_id] is None]
+                used = [node_id for node_id in xrange(len(graph_structure))
+                        if graph_structure[node_id] is not None]
+                if r < 0.2 or len(used) < 2:
+                    node_id = free[0] if free else len(graph_structure)
+                    if node_id == len(graph_structure):
+                        graph_structure.append(None)
+                    graph_structure[node_id] = set()
+                    index.add(node_id)
+                elif r < 0.3:
+                    node_id = rand.choice(used)
+                    for node_id2 in graph_structure[node_id]:
+                        graph_structure[node_id2].remove(node_id)
+                        index.unlink(node_id, node_id2)
+                    graph_structure[node_id] = None
+                else:
+                    node_id1, node_id2 = rand.sample(used, 2)
+                    if node_id2 in graph_structure[node_id1]:
+                        graph_structure[node_id1].remove(node_id2)
+                        graph_structure[node_id2].remove(node_id1)
+                        index.unlink(node_id1, node_id2)
+                    else:
+                        graph_structure[node_id1].add(node_id2)
+                        graph_structure[node_id2].add(node_id1)
+                        index.union(node_id1, node_id2)
+                if rand.random() < 0.3:
+                    model = dict((node_id, links_info) for node_id, links_info
+                                 in enumerate(graph_structure)
+                                 if links_info is not None)
+                    sizes = component_sizes(model)
+                    for node_id in model:
+                        self.assertEqual(index.size(node_id, graph_structure),
+                                         sizes[node_id],
+                                         'seed %d, step %d' % (seed, step))
+
+    def test_graph(self):
+        # Queries of a graph with indexes against brute force, also while
+        # the index is rebuilt often (small _MIN_SLOTS).
+        for seed, min_slots in enumerate([0, 3, 1024]):
+            graphindex._MIN_SLOTS = min_slots
+            for expiry in ['heap', 'wheel', 'log']:
+                gr = TimeWindowGraph(window_size=20, expiry=expiry,
+                                     query_index=True)
+                plain = TimeWindowGraph(window_size=20, expiry=expiry)
+                rand = random.Random(seed)
+                stream = random_stream(1500, seed, num_hashtags=60)
+                for i, (timestamp, hashtags) in enumerate(stream):
+                    self.assertEqual(gr.add_tweet(timestamp, hashtags),
+                                     plain.add_tweet(timestamp, hashtags))
+                    if i % 97 == 0 and gr.num_nodes:
+                        node = rand.choice(link_model(gr).keys())
+                        self.assertEqual(gr.remove_node(node),
+                                         plain.remove_node(node))
+                    if i % 5 != 0:
+                        continue
+                    model = link_model(gr)
+                    sizes = component_sizes(model)
+                    degrees = sorted([len(neighbors) for neighbors
+                                      in model.values()], reverse=True)
+                    top = gr.top_degrees(5)
+                    self.assertEqual([degree for _, degree in top],
+                                     degrees[:5])
+                    for node, degree in top:
+                        self.assertEqual(len(model[node]), degree)
+                    for node in rand.sample(model.keys(),
+                                            min(5, len(model))):
+                        self.assertEqual(gr.component_size(node), sizes[node])
+                        self.assertEqual(plain.component_size(node),
+                                         sizes[node])
+                        neighbors = gr.neighbors(node)
+                        self.assertEqual(sorted(neighbors),
+                                         sorted(model[node].items()))
+                        times = [time for _, time in neighbors]
+                        self.assertEqual(times, sorted(times, reverse=True))
+                    self.assertEqual(gr.component_size('missing'), 0)
+                    self.assertEqual(gr.neighbors('missing'), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# Tests of instrumentation: instrumented classes give the same results as the
+# plain ones, and their counters agree with the state of the graph.
+
+import unittest
+from StringIO import StringIO
+
+from queues import check_random_operations
+from streams import random_stream, baseline_degrees
+from instrument import Stats, InstrumentedMinPQ, InstrumentedGraph
+
+
+class InstrumentTest(unittest.TestCase):
+    def test_random_operations(self):
+        for seed in xrange(10):
+            stats = Stats()
+            check_random_operations(self, InstrumentedMinPQ(stats, 'int'),
+                                    seed)
+            self.assertTrue(stats.counters['heap_moves'] > 0)
+
+    def test_heap_moves(self):
+        # Adding decreasing values moves each one up to the root.
+        stats = Stats()
+        queue = InstrumentedMinPQ(stats, 'int')
+        for i in xrange(15):
+            queue.add(i, 100 - i)
+        self.assertEqual(stats.counters['heap_moves'],
+                         sum(i.bit_length() - 1 for i in xrange(1, 16)))
+
+    def test_graph(self):
+        stream = random_stream(3000, seed=8)
+        expected = baseline_degrees(stream)
+        for expiry in ['heap', 'wheel', 'log']:
+            stats = Stats()
+            gr = InstrumentedGraph(stats, window_size=60, expiry=expiry)
+            degrees = []
+            for timestamp, hashtags in stream:
+                if gr.add_tweet(timestamp, hashtags):
+                    degrees.append(gr.average_degree())
+                counters = stats.counters
+                self.assertEqual(counters.get('nodes_created', 0) -
+                                 counters.get('nodes_removed', 0),
+                                 gr.num_nodes)
+            self.assertEqual(degrees, expected)
+            self.assertEqual(stats.counters['tweets'], len(stream))
+            self.assertEqual(sum(stats.expired_histogram),
+                             stats.counters['advances'])
+            if expiry == 'heap':
+                # (The wheel and the log use the heap for far links only.)
+                self.assertTrue(stats.counters['heap_moves'] > 0)
+            self.assertTrue(stats.max_expired > 0)
+            self.assertTrue(stats.max_expired.bit_length() ==
+                            len(stats.expired_histogram) - 1)
+            f_out = StringIO()
+            stats.report(f_out)
+            for name in ['tweets', 'links_expired', 'graph.expiry']:
+                self.assertTrue(name in f_out.getvalue())
+
+    def test_report_empty(self):
+        f_out = StringIO()
+        Stats().report(f_out, "Empty")
+        self.assertTrue(f_out.getvalue().startswith("Empty ("))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+# Tests of indexedMinPQ against a dict, and of its dtypes.
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from queues import check_random_operations, check_load
+from minpq import indexedMinPQ
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class IndexedMinPQTest(unittest.TestCase):
+    def test_random_operations(self):
+        for seed in xrange(50):
+            dtype = ['int', 'float'][seed % 2]
+            check_random_operations(self, indexedMinPQ(dtype=dtype), seed,
+                                    max_step=[0, 1, 5][seed % 3])
+
+    def test_load(self):
+        check_load(self, indexedMinPQ(dtype='int'),
+                   [('a', 3), ('b', 1), ('c', 2), ('d', 1)])
+
+    def test_heap_order(self):
+        pq = indexedMinPQ(dtype='int')
+        for key, value in enumerate([5, 3, 8, 1, 9, 2, 7]):
+            pq.add(key, value)
+        pq.update(4, 0)
+        pq.remove(3)
+        self.assertEqual([pq.pop_min()[1] for _ in xrange(pq.size())],
+                         [0, 2, 3, 5, 7, 8])
+
+    def test_float_values(self):
+        pq = indexedMinPQ()
+        pq.add('a', 1.5)
+        pq.add('b', 0.25)
+        self.assertEqual(pq.pop_min(), ('b', 0.25))
+        self.assertEqual(pq.value('a'), 1.5)
+
+    def test_dtypes(self):
+        for dtype in ['int', 'float', 'int32', 'uint16', 'float32', int,
+                      float]:
+            pq = indexedMinPQ(dtype=dtype)
+            self.assertTrue(pq.add('a', 1))
+            self.assertEqual(pq.value('a'), 1)
+        for dtype in ['complex', 'str', 'int128', None]:
+            self.assertRaises(ValueError, indexedMinPQ, dtype=dtype)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_dtypes(self):
+        for dtype in [np.int32, np.int64, np.float64, np.dtype('float32')]:
+            pq = indexedMinPQ(dtype=dtype)
+            self.assertTrue(pq.add('a', 2))
+            self.assertEqual(pq.value('a'), 2)
+        self.assertRaises(ValueError, indexedMinPQ, dtype=np.complex128)
+
+if __name__ == "__main__":
+    unittest.main()
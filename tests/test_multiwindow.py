@@ -0,0 +1,40 @@
+# Tests of MultiWindowGraph against one TimeWindowGraph for each window size.
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from graph import TimeWindowGraph
+from multiwindow import MultiWindowGraph
+from streams import random_stream
+
+
+class MultiWindowGraphTest(unittest.TestCase):
+    def test_random_streams(self):
+        for seed, expiry in enumerate(['heap', 'wheel', 'log']):
+            window_sizes = [10, 60, 1, 10, 30]
+            mw = MultiWindowGraph(window_sizes, expiry=expiry)
+            graphs = [TimeWindowGraph(window_size=window_size)
+                      for window_size in window_sizes]
+            stream = random_stream(4000, seed, num_hashtags=30)
+            for i, (timestamp, hashtags) in enumerate(stream):
+                added = [gr.add_tweet(timestamp, hashtags) for gr in graphs]
+                # Tweets too old for the largest window (60) are ignored.
+                self.assertEqual(mw.add_tweet(timestamp, hashtags), added[1])
+                if not added[1]:
+                    continue
+                if i % 500 == 0:
+                    # The current time can also jump without a tweet.
+                    mw.set_current_time(timestamp + 5)
+                    for gr in graphs:
+                        gr.set_current_time(timestamp + 5)
+                self.assertEqual(mw.average_degrees(),
+                                 tuple(gr.average_degree() for gr in graphs),
+                                 'seed %d, tweet %d' % (seed, i))
+                self.assertEqual(mw.current_time, graphs[0].current_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
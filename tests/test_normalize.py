@@ -0,0 +1,76 @@
+# Tests of HashtagNormalizer: canonical tags, and the LRU cache against an
+# OrderedDict model.
+
+import os
+import sys
+import random
+import unittest
+import unicodedata
+from collections import OrderedDict
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from normalize import HashtagNormalizer, normalize_records
+
+def canonical(hashtag):
+    return unicodedata.normalize('NFKC', hashtag).lower()
+
+
+class HashtagNormalizerTest(unittest.TestCase):
+    def test_canonical_tags(self):
+        normalizer = HashtagNormalizer(cache_size=2)
+        self.assertEqual(normalizer.normalize_all(
+            [u'Spark', u'spark', u'\uff33park', u'Hadoop']),
+            [u'hadoop', u'spark'])
+        self.assertEqual(normalizer.normalize('Caf\xc3\xa9'), u'caf\xe9')
+        self.assertEqual(normalizer.normalize(u'\ufb01le'), u'file')
+        self.assertEqual(normalizer.normalize_all([]), [])
+        self.assertRaises(ValueError, HashtagNormalizer, 0)
+
+    def test_lru(self):
+        for seed, cache_size in enumerate([1, 3, 10, 100]):
+            rand = random.Random(seed)
+            hashtags = [u'H%d' % i for i in xrange(20)] + \
+                [u'h%d' % i for i in xrange(20)] + \
+                [u'\uff28%d' % i for i in xrange(5)]    # Full-width 'H'.
+            normalizer = HashtagNormalizer(cache_size)
+            model = OrderedDict()   # Least recently used first.
+            num_hits = num_evictions = 0
+            for step in xrange(2000):
+                # A few popular hashtags are used most of the time.
+                hashtag = hashtags[min(rand.randint(0, len(hashtags) - 1),
+                                       rand.randint(0, len(hashtags) - 1))]
+                self.assertEqual(normalizer.normalize(hashtag),
+                                 canonical(hashtag))
+                if hashtag in model:
+                    num_hits += 1
+                    del model[hashtag]
+                elif len(model) == cache_size:
+                    model.popitem(last=False)
+                    num_evictions += 1
+                model[hashtag] = True
+                self.assertEqual(normalizer.size(), len(model))
+                self.assertEqual(set(normalizer._cache), set(model))
+            self.assertEqual(normalizer.num_hits, num_hits)
+            self.assertEqual(normalizer.num_misses, 2000 - num_hits)
+            self.assertEqual(normalizer.num_evictions, num_evictions)
+            self.assertEqual(normalizer.hit_rate(), num_hits / 2000.0)
+        stream = StringIO()
+        normalizer.report(stream)
+        self.assertTrue(stream.getvalue().startswith("Hashtag cache: %d hits"
+                                                     % num_hits))
+
+    def test_normalize_records(self):
+        records = [(1, [u'A', u'a', u'b']), (2, []), (3, [u'B'])]
+        self.assertEqual(list(normalize_records(records,
+                                                HashtagNormalizer())),
+                         [(1, [u'a', u'b']), (2, []), (3, [u'b'])])
+        self.assertEqual(list(normalize_records(enumerate(records),
+                                                HashtagNormalizer(), True)),
+                         [(0, (1, [u'a', u'b'])), (1, (2, [])),
+                          (2, (3, [u'b']))])
+
+
+if __name__ == "__main__":
+    unittest.main()
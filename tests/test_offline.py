@@ -0,0 +1,60 @@
+# Tests of the offline engine (average_degree_series) against the streaming
+# graph. They are skipped if NumPy is not installed.
+
+import random
+import unittest
+
+from streams import random_stream, baseline_degrees
+from graph import TimeWindowGraph
+import offline
+from offline import average_degree_series
+
+def stream_degrees(records, window_size):
+    """
+    Return average degrees of TimeWindowGraph.add_tweet for tweets in the
+    window.
+    """
+    gr = TimeWindowGraph(window_size=window_size)
+    return [gr.average_degree() for timestamp, hashtags in records
+            if gr.add_tweet(timestamp, hashtags)]
+
+
+@unittest.skipIf(offline.np is None, "NumPy is not installed")
+class OfflineTest(unittest.TestCase):
+    def test_random_streams(self):
+        for seed in xrange(3):
+            stream = random_stream(3000, seed)
+            self.assertEqual(average_degree_series(stream).tolist(),
+                             baseline_degrees(stream))
+
+    def test_small_streams(self):
+        # Short windows, repeated hashtags, timestamps at 0 and tweets older
+        # than the window.
+        rand = random.Random(1)
+        for trial in xrange(300):
+            window_size = rand.choice([1, 2, 5, 60])
+            records = []
+            time = rand.randint(0, 3)
+            for _ in xrange(rand.randint(0, 100)):
+                time += rand.choice([0, 0, 1, 2, 7])
+                timestamp = time
+                if rand.random() < 0.2:
+                    timestamp -= rand.randint(0, 2 * window_size)
+                if rand.random() < 0.03:
+                    timestamp = 0
+                records.append((max(timestamp, 0),
+                                [str(rand.randint(0, 12))
+                                 for _ in xrange(rand.randint(0, 5))]))
+            self.assertEqual(
+                average_degree_series(records, window_size).tolist(),
+                stream_degrees(records, window_size),
+                'trial %d' % trial)
+
+    def test_empty(self):
+        self.assertEqual(average_degree_series([]).tolist(), [])
+        self.assertEqual(average_degree_series([(5, []), (6, ['a'])]).tolist(),
+                         [0.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
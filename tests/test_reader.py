@@ -0,0 +1,72 @@
+# Tests of MappedFile (line ranges, offsets and shards) against reading the
+# file with readlines.
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from reader import MappedFile
+
+
+class MappedFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, content):
+        """
+        Write content to a file, and return the name of the file.
+        """
+        filename = os.path.join(self.directory, 'input.txt')
+        with open(filename, 'wb') as f_out:
+            f_out.write(content)
+        return filename
+
+    def check(self, content):
+        """
+        Check lines, offsets and shards of a file against its content.
+        """
+        lines = content.splitlines(True)
+        offsets = [0]   # Start of each line (and the size of the file).
+        for line in lines:
+            offsets.append(offsets[-1] + len(line))
+        with MappedFile(self.write(content)) as mf:
+            self.assertEqual(mf.size(), len(content))
+            self.assertEqual(list(mf.lines()), lines)
+            self.assertEqual(list(mf.lines_with_offsets()),
+                             zip(offsets[1:], lines))
+            for i, start in enumerate(offsets):
+                for j in xrange(i, len(offsets)):
+                    self.assertEqual(list(mf.lines(start, offsets[j])),
+                                     lines[i:j])
+            for offset in xrange(len(content) + 2):
+                expected = min(start for start in offsets if start >= offset) \
+                    if offset <= len(content) else len(content)
+                self.assertEqual(mf.line_start(offset), expected)
+            for num_shards in xrange(1, len(lines) + 3):
+                shards = mf.shard_offsets(num_shards)
+                self.assertTrue(len(shards) <= num_shards)
+                self.assertEqual(''.join(''.join(mf.lines(start, end))
+                                         for start, end in shards), content)
+                for start, end in shards:
+                    self.assertTrue(start < end)
+                    self.assertTrue(start in offsets and end in offsets)
+
+    def test_lines(self):
+        self.check('a\nbc\n\ndef\n')
+        self.check('a\nbc\n\ndef')     # Last line without a newline.
+        self.check('\n\n\n')
+        self.check('x' * 100 + '\n' + 'y\n' * 10)
+
+    def test_empty(self):
+        self.check('')
+
+
+if __name__ == "__main__":
+    unittest.main()
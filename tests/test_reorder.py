@@ -0,0 +1,49 @@
+# Tests of ReorderBuffer: released tweets are in time order, and a tweet is
+# dropped only if it is later than the lateness bound.
+
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from reorder import ReorderBuffer, reorder_records
+from streams import random_stream
+
+
+class ReorderBufferTest(unittest.TestCase):
+    def test_random_streams(self):
+        for seed in xrange(20):
+            rand = random.Random(seed)
+            lateness = rand.choice([0, 1, 5, 30])
+            buf = ReorderBuffer(lateness=lateness)
+            stream = [(timestamp, i) for i, (timestamp, hashtags) in
+                      enumerate(random_stream(1000, seed, max_lateness=40))]
+            released = []
+            for i, (timestamp, index) in enumerate(stream):
+                num_dropped = buf.num_dropped
+                released.extend(buf.push(timestamp, (timestamp, index)))
+                latest = max([-1] + [record[0] for record in stream[:i]])
+                if timestamp >= latest - lateness:
+                    # Within the lateness bound: never dropped.
+                    self.assertEqual(buf.num_dropped, num_dropped)
+            released.extend(buf.flush())
+            self.assertEqual(buf.size(), 0)
+            # Released in time order, and in the order of arrival for ties.
+            self.assertEqual(released, sorted(released))
+            kept = set(released)
+            self.assertEqual(buf.num_dropped, len(stream) - len(kept))
+            self.assertEqual(buf.num_reordered, sum(
+                1 for i, record in enumerate(stream) if record in kept and
+                any(other[0] > record[0] for other in stream[:i])))
+
+    def test_reorder_records(self):
+        # With a lateness bound as large as any delay, nothing is dropped.
+        stream = random_stream(3000, seed=7, max_lateness=40)
+        reordered = list(reorder_records(stream, ReorderBuffer(lateness=40)))
+        self.assertEqual(reordered, sorted(stream, key=lambda r: r[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# Tests of the service mode: tweets sent through the standard input or a Unix
+# socket give the same average degrees as average_degree.main.
+
+import os
+import sys
+import time
+import socket
+import shutil
+import tempfile
+import unittest
+import subprocess
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+import average_degree
+from service import produce
+from benchmark.generator import TweetGenerator
+
+SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                       'src', 'service.py')
+
+
+class ServiceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.input_filename = os.path.join(cls.directory, 'tweets.txt')
+        generator = TweetGenerator(tweets_per_second=20, num_hashtags=300,
+                                   out_of_order=0.1, max_lateness=90,
+                                   control_rate=0.05, seed=2)
+        generator.write(cls.input_filename, 3000)
+        output_filename = os.path.join(cls.directory, 'output.txt')
+        average_degree.main(cls.input_filename, output_filename)
+        with open(output_filename, 'rb') as f_in:
+            cls.expected = f_in.read()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_stdin(self):
+        for options in [['--workers', '0'], ['--workers', '2'],
+                        ['--workers', '2', '--selective']]:
+            with open(self.input_filename, 'rb') as f_in:
+                output = subprocess.check_output(
+                    [sys.executable, SERVICE, 'serve', '--stdin'] + options,
+                    stdin=f_in)
+            self.assertEqual(output, self.expected)
+
+    def test_unix_socket(self):
+        path = os.path.join(self.directory, 'service.sock')
+        server = subprocess.Popen([sys.executable, SERVICE, 'serve',
+                                   '--unix', path, '--workers', '2'])
+        try:
+            for _ in xrange(100):
+                # Wait until the service accepts connections (an empty
+                # connection gives no output).
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(path)
+                    break
+                except socket.error:
+                    time.sleep(0.05)
+                finally:
+                    probe.close()
+            f_out = StringIO()
+            produce(path, self.input_filename, f_out)
+            self.assertEqual(f_out.getvalue(), self.expected)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# Tests of ShardedGraph against the baseline TimeWindowGraph.
+
+import threading
+import unittest
+import multiprocessing
+
+from streams import random_stream, baseline_degrees
+from shardedgraph import ShardedGraph
+
+class ShardedGraphTest(unittest.TestCase):
+    def check(self, stream, num_shards, batch_size, window_size=60,
+              timeout=120):
+        gr = ShardedGraph(window_size=window_size, num_shards=num_shards)
+        degrees = []
+        thread = threading.Thread(
+            target=lambda: degrees.extend(gr.average_degrees(stream,
+                                                             batch_size)))
+        thread.daemon = True
+        thread.start()
+        thread.join(timeout)
+        if thread.is_alive():
+            # A deadlock between the coordinator and shards: terminating
+            # worker processes unblocks the coordinator.
+            for process in multiprocessing.active_children():
+                process.terminate()
+            thread.join()
+            gr.close()
+            self.fail("no result in %d seconds" % timeout)
+        gr.close()
+        self.assertEqual(degrees, baseline_degrees(stream, window_size))
+
+    def test_batch_sizes(self):
+        stream = random_stream(3000, seed=1)
+        for num_shards in [2, 3]:
+            for batch_size in [1, 7, 1000, 5000]:
+                self.check(stream, num_shards, batch_size)
+
+    def test_small_window(self):
+        self.check(random_stream(2000, seed=2, num_hashtags=10), 4, 50,
+                   window_size=1)
+
+    def test_large_batch(self):
+        # Results of a batch are much larger than the buffer of a pipe, so the
+        # coordinator must not send the next batch while shards are sending.
+        stream = random_stream(60000, seed=3, num_hashtags=5000,
+                               max_hashtags=8)
+        self.check(stream, 2, 20000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# Tests of output sinks: every format is decoded and compared with the rows
+# formatted by "%.2f".
+
+import os
+import sys
+import random
+import tempfile
+import unittest
+from array import array
+from StringIO import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from sinks import TextSink, RunLengthSink, BinarySink, format_row, make_sink
+
+def random_rows(num_rows, num_values, seed):
+    """
+    Make rows of average degrees (with runs of identical rows).
+    """
+    rng = random.Random(seed)
+    rows = []
+    while len(rows) < num_rows:
+        row = tuple(rng.randint(0, 1000) / float(rng.randint(1, 300))
+                    for _ in xrange(num_values))
+        rows.extend([row] * rng.choice([1, 1, 2, 5]))
+    return rows[:num_rows]
+
+
+class SinkTest(unittest.TestCase):
+    def write_rows(self, sink, rows, flush_every=0):
+        for i, row in enumerate(rows):
+            sink.write(row)
+            if flush_every and i % flush_every == 0:
+                sink.flush()
+        sink.close()
+
+    def test_text(self):
+        for num_values in [1, 3]:
+            rows = random_rows(500, num_values, num_values)
+            expected = ''.join(format_row(row) + '\n' for row in rows)
+            for buffer_size, flush_every in [(1, 0), (7, 0), (8192, 0),
+                                             (7, 3), (8192, 50)]:
+                f_out = StringIO()
+                self.write_rows(TextSink(f_out, buffer_size), rows,
+                                flush_every)
+                self.assertEqual(f_out.getvalue(), expected)
+        self.assertEqual(format_row((1.005, 2.0, 0.125)), '1.00,2.00,0.12')
+
+    def test_run_length(self):
+        rows = random_rows(500, 2, 0)
+        for buffer_size, flush_every in [(1, 0), (5, 0), (8192, 7)]:
+            f_out = StringIO()
+            self.write_rows(RunLengthSink(f_out, buffer_size), rows,
+                            flush_every)
+            decoded = []
+            previous = None
+            for line in f_out.getvalue().splitlines():
+                row, count = line.split(' ')
+                self.assertNotEqual(row, previous)  # Runs are maximal.
+                self.assertTrue(int(count) > 0)
+                decoded.extend([row] * int(count))
+                previous = row
+            self.assertEqual(decoded, [format_row(row) for row in rows])
+
+    def test_binary(self):
+        rows = random_rows(500, 2, 1)
+        with tempfile.TemporaryFile() as f_out:
+            self.write_rows(BinarySink(f_out, 'centi', 7), rows, 11)
+            f_out.seek(0)
+            values = array('i', f_out.read())
+        self.assertEqual(['%d.%02d' % divmod(value, 100) for value in values],
+                         [('%.2f' % value) for row in rows for value in row])
+        with tempfile.TemporaryFile() as f_out:
+            self.write_rows(BinarySink(f_out, 'float32', 7), rows)
+            f_out.seek(0)
+            values = array('f', f_out.read())
+        self.assertEqual(values, array('f', [value for row in rows
+                                             for value in row]))
+
+    def test_make_sink(self):
+        f_out = StringIO()
+        self.assertTrue(isinstance(make_sink(f_out), TextSink))
+        self.assertTrue(isinstance(make_sink(f_out, 'rle'), RunLengthSink))
+        self.assertTrue(isinstance(make_sink(f_out, 'centi'), BinarySink))
+        self.assertRaises(ValueError, make_sink, f_out, 'csv')
+        self.assertRaises(ValueError, BinarySink, f_out, 'text')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# Tests of parse_created_at against time.strptime.
+
+import os
+import sys
+import time
+import calendar
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from timeparse import parse_created_at
+
+FORMAT = "%a %b %d %H:%M:%S +0000 %Y"
+
+def strptime_timestamp(str_time):
+    """
+    Parse a time string with time.strptime (the baseline) into UTC epoch
+    seconds.
+    """
+    return calendar.timegm(time.strptime(str_time, FORMAT))
+
+
+class ParseCreatedAtTest(unittest.TestCase):
+    def check_days(self, year, month, day, num_days=3, step=600):
+        """
+        Compare both parsers every 'step' seconds from the given day on.
+        """
+        begin = calendar.timegm((year, month, day, 0, 0, 0))
+        for timestamp in xrange(begin, begin + num_days * 86400, step):
+            str_time = time.strftime(FORMAT, time.gmtime(timestamp))
+            self.assertEqual(parse_created_at(str_time),
+                             strptime_timestamp(str_time), str_time)
+            self.assertEqual(parse_created_at(str_time), timestamp)
+
+    def test_year_boundaries(self):
+        for year in [2014, 2015, 2016]:
+            self.check_days(year, 12, 30)   # Dec 30 to Jan 1.
+
+    def test_leap_days(self):
+        self.check_days(2016, 2, 28)    # Feb 28, Feb 29 and Mar 1.
+        self.check_days(2015, 2, 27)    # No Feb 29.
+        self.check_days(2000, 2, 28)
+        self.check_days(2100, 2, 27)
+
+    def test_dst_changes(self):
+        # US: Mar 8 and Nov 1, 2015. Europe: Mar 29 and Oct 25, 2015.
+        for month, day in [(3, 7), (10, 31), (3, 28), (10, 24)]:
+            self.check_days(2015, month, day, num_days=2, step=60)
+
+    def test_seconds(self):
+        self.check_days(2015, 11, 5, num_days=1, step=1)
+        for str_time in ["Thu Nov 05 23:59:60 +0000 2015",
+                         "Thu Nov 05 23:59:61 +0000 2015"]:
+            self.assertEqual(parse_created_at(str_time),
+                             strptime_timestamp(str_time))
+
+    def test_invalid(self):
+        for str_time in ["Sat Feb 30 10:00:00 +0000 2016",
+                         "Sun Feb 29 10:00:00 +0000 2015",
+                         "Thu Apr 31 10:00:00 +0000 2015",
+                         "Thu Nov 00 10:00:00 +0000 2015",
+                         "Thu Nov 05 24:00:00 +0000 2015",
+                         "Thu Nov 05 10:60:00 +0000 2015",
+                         "Thu Nov 05 10:00:62 +0000 2015",
+                         "Thu Nov 05 -1:00:00 +0000 2015",
+                         "Thu Xyz 05 10:00:00 +0000 2015",
+                         "Xyz Nov 05 10:00:00 +0000 2015",
+                         "Thu Nov 05 10:00:00 +0100 2015",
+                         "Thu Nov 05 10-00-00 +0000 2015",
+                         "Thu Nov 05 10:00:00 +0000 15"]:
+            self.assertRaises(ValueError, strptime_timestamp, str_time)
+            self.assertRaises(ValueError, parse_created_at, str_time)
+        # A valid string of the same day is cached first.
+        parse_created_at("Mon Feb 29 10:00:00 +0000 2016")
+        self.assertRaises(ValueError, parse_created_at,
+                          "Xyz Feb 29 10:00:00 +0000 2016")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+# Tests of TimeWheel against a dict, and of TimeWindowGraph with
+# expiry='wheel' against the baseline path.
+
+import unittest
+
+from queues import check_random_operations, check_load
+from streams import random_stream, baseline_degrees
+from graph import TimeWindowGraph
+from timewheel import TimeWheel
+
+class TimeWheelTest(unittest.TestCase):
+    def test_random_operations(self):
+        for seed in xrange(100):
+            check_random_operations(self, TimeWheel(size=[1, 7, 60][seed % 3]),
+                                    seed, max_step=[0, 1, 3, 10][seed % 4])
+
+    def test_load(self):
+        check_load(self, TimeWheel(size=5), [(1, 3), (2, 3), (3, 0), (4, 9)])
+        wheel = TimeWheel(size=5)
+        wheel.add(1, 1)
+        self.assertFalse(wheel.load([2], [2]))
+
+    def test_graph(self):
+        for seed, window_size in [(1, 60), (2, 10), (3, 1)]:
+            stream = random_stream(3000, seed=seed)
+            gr = TimeWindowGraph(window_size=window_size, expiry='wheel')
+            degrees = [gr.average_degree() for timestamp, hashtags in stream
+                       if gr.add_tweet(timestamp, hashtags)]
+            self.assertEqual(degrees, baseline_degrees(stream, window_size))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# Tests of the selective extraction (scan_tweet) against json.loads and
+# extract_data.
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'src'))
+from tweetscan import scan_tweet, scan_timestamp
+from average_degree import parse_line
+from benchmark.generator import TweetGenerator
+
+HEAD = '{"created_at":"Thu Nov 05 05:05:39 +0000 2015","id":1,"id_str":"1",'
+
+
+class ScanTweetTest(unittest.TestCase):
+    def check(self, line, handled=None):
+        """
+        Check that scan_tweet gives the same record as json.loads, or None.
+        """
+        record = scan_tweet(line)
+        if handled is not None:
+            self.assertEqual(record is not None, handled, line)
+        if record is not None:
+            self.assertEqual(record, parse_line(line), line)
+            self.assertEqual(scan_timestamp(line), record[0])
+
+    def test_generated(self):
+        generator = TweetGenerator(num_hashtags=500, control_rate=0.05,
+                                   seed=2)
+        num_handled = 0
+        for line in generator.lines(3000):
+            self.check(line)
+            if scan_tweet(line) is not None:
+                num_handled += 1
+        # Most lines are handled without json.loads.
+        self.assertTrue(num_handled > 2500)
+
+    def test_tricky_lines(self):
+        tail = '"user":{"id":5},"entities":%s}'
+        entities = '{"hashtags":[%s],"urls":[]}' % ','.join(
+            '{"text":%s,"indices":[0,1]}' % json.dumps(text)
+            for text in [u'caf\xe9', u'a"b', u'back\\slash', u'Spark'])
+        # Escapes in hashtags are decoded.
+        self.check(HEAD + '"text":"x",' + tail % entities, handled=True)
+        # A text that looks like a list of hashtags.
+        self.check(HEAD + '"text":"\\"entities\\":{\\"hashtags\\":[",' +
+                   tail % '{"hashtags":[],"urls":[]}')
+        # A retweet with its own hashtags.
+        nested = '"retweeted_status":{"created_at":"Thu Nov 05 05:05:38 ' \
+            '+0000 2015","id":2,"entities":{"hashtags":[{"text":"old",' \
+            '"indices":[0,4]}]}},'
+        self.check(HEAD + nested + tail % '{"hashtags":[{"text":"new",' \
+                   '"indices":[0,4]}]}', handled=False)
+        # 'hashtags' is not the first field of 'entities'.
+        self.check(HEAD + tail % '{"urls":[],"hashtags":[{"text":"a",' \
+                   '"indices":[0,2]}]}', handled=False)
+        # Control data and a tweet without 'created_at' first.
+        self.check('{"limit":{"track":5,"timestamp_ms":"1446218985743"}}',
+                   handled=False)
+        self.check('{"id":1,"created_at":"Thu Nov 05 05:05:39 +0000 2015",' +
+                   tail % '{"hashtags":[]}', handled=False)
+
+
+if __name__ == "__main__":
+    unittest.main()